@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmarks SolrSession query methods against a local stub Solr server.
+
+Reports throughput (requests/sec), p50/p99 latency of each call and memory
+allocated per retrieved document. Run from the repository root:
+
+    python -m benchmarks.run_benchmarks --latency 0.005 --doc-size 1000
+"""
+
+import argparse
+import json
+import random
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from bookops_bpl_solr import SolrSession
+
+from .stub_solr import StubSolr
+
+
+Scenario = Tuple[str, Callable[[SolrSession], Any]]
+
+
+def _isbn13(number: int) -> str:
+    """Creates valid ISBN-13 with 978 prefix from a number"""
+    digits = f"978{number:09d}"
+    total = sum(
+        int(digit) * (1 if position % 2 == 0 else 3)
+        for position, digit in enumerate(digits)
+    )
+    return digits + str((10 - total % 10) % 10)
+
+
+def _upc(number: int) -> str:
+    """Creates valid UPC-A from a number"""
+    digits = f"0{number:010d}"
+    total = sum(
+        int(digit) * (3 if position % 2 == 0 else 1)
+        for position, digit in enumerate(digits)
+    )
+    return digits + str((10 - total % 10) % 10)
+
+
+def _count_docs(result: Any) -> int:
+    """Counts documents retrieved by a query method call"""
+    if isinstance(result, dict):
+        if "docs" in result:
+            return len(result["docs"])
+        return sum(1 for doc in result.values() if doc is not None)
+    if isinstance(result, list):
+        return len(result)
+    return len(result.json()["response"]["docs"])
+
+
+def scenarios(bulk_size: int, rows: int) -> List[Scenario]:
+    """
+    Builds benchmarked calls of single-request and bulk query methods
+
+    Args:
+        bulk_size:              number of identifiers passed to bulk methods
+        rows:                   number of documents retrieved by paging methods
+    """
+    rng = random.Random(0)
+    isbns = [_isbn13(rng.randrange(10**9)) for _ in range(bulk_size)]
+    upcs = [_upc(rng.randrange(10**10)) for _ in range(bulk_size)]
+    bibs = [f"b{10000000 + n}" for n in range(bulk_size)]
+    return [
+        ("search_bibNo", lambda s: s.search_bibNo("b123456789")),
+        ("search_controlNo", lambda s: s.search_controlNo("ocn437048096")),
+        ("search_isbns", lambda s: s.search_isbns(isbns[:10])),
+        ("search_reserveId", lambda s: s.search_reserveId("8CD53ED9-CEBD-4F78")),
+        ("search_upcs", lambda s: s.search_upcs(upcs[:10])),
+        ("find_expired_econtent", lambda s: s.find_expired_econtent(rows=100)),
+        ("search_bibNos", lambda s: s.search_bibNos(bibs)),
+        ("bulk_search_isbns", lambda s: s.bulk_search_isbns(isbns)),
+        (
+            "bulk_search_isbns[terms]",
+            lambda s: s.bulk_search_isbns(isbns, query_parser="terms", as_filter=True),
+        ),
+        ("bulk_search_upcs", lambda s: s.bulk_search_upcs(upcs)),
+        (
+            "iter_query",
+            lambda s: list(s.iter_query({"q": "*:*", "rows": 100}))[:rows],
+        ),
+    ]
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """Returns percentile of values using nearest-rank method"""
+    ordered = sorted(values)
+    rank = max(int(round(percent / 100 * len(ordered))) - 1, 0)
+    return ordered[rank]
+
+
+def run_scenario(
+    session: SolrSession,
+    stub: StubSolr,
+    call: Callable[[SolrSession], Any],
+    iterations: int,
+) -> Dict[str, float]:
+    """
+    Measures a query method call
+
+    Args:
+        session:                session sending requests to the stub server
+        stub:                   running stub server
+        call:                   benchmarked call
+        iterations:             number of timed calls
+
+    Returns:
+        dictionary of measurements
+    """
+    call(session)  # warm up connection pool
+
+    latencies = []
+    requests_before = stub.requests
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        call(session)
+        latencies.append(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+    requests_sent = stub.requests - requests_before
+
+    tracemalloc.start()
+    snapshot_before = tracemalloc.take_snapshot()
+    result = call(session)
+    snapshot_after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(
+        stat.size_diff
+        for stat in snapshot_after.compare_to(snapshot_before, "filename")
+    )
+    docs = _count_docs(result)
+
+    return {
+        "calls_per_sec": iterations / elapsed,
+        "requests_per_sec": requests_sent / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "docs": docs,
+        "bytes_per_doc": allocated / docs if docs else 0.0,
+    }
+
+
+def run(
+    iterations: int = 50,
+    latency: float = 0.0,
+    doc_size: int = 500,
+    bulk_size: int = 500,
+    rows: int = 1000,
+    only: Optional[Iterable[str]] = None,
+    json_decoder: str = "auto",
+) -> Dict[str, Dict[str, float]]:
+    """
+    Runs benchmarks against a local stub Solr server
+
+    Args:
+        iterations:             number of timed calls of each method
+        latency:                server latency in seconds
+        doc_size:               approximate size of each document in bytes
+        bulk_size:              number of identifiers passed to bulk methods
+        rows:                   number of documents retrieved by paging methods
+        only:                   names of scenarios to run; all by default
+        json_decoder:           JSON decoder of the session
+
+    Returns:
+        dictionary of scenario names and their measurements
+    """
+    results = {}
+    stub = StubSolr(latency=latency, doc_size=doc_size, num_found=rows)
+    with (
+        stub as endpoint,
+        SolrSession("benchmark_key", endpoint, json_decoder=json_decoder) as session,
+    ):
+        for name, call in scenarios(bulk_size, rows):
+            if only and name not in only:
+                continue
+            results[name] = run_scenario(session, stub, call, iterations)
+    return results
+
+
+def format_table(results: Dict[str, Dict[str, float]]) -> str:
+    """Formats benchmark results as a text table"""
+    header = (
+        f"{'method':<26}{'calls/s':>10}{'req/s':>10}{'p50 ms':>10}"
+        f"{'p99 ms':>10}{'docs':>8}{'B/doc':>10}"
+    )
+    lines = [header, "-" * len(header)]
+    for name, data in results.items():
+        lines.append(
+            f"{name:<26}{data['calls_per_sec']:>10.1f}{data['requests_per_sec']:>10.1f}"
+            f"{data['p50_ms']:>10.2f}{data['p99_ms']:>10.2f}{data['docs']:>8}"
+            f"{data['bytes_per_doc']:>10.0f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds")
+    parser.add_argument("--doc-size", type=int, default=500, help="bytes")
+    parser.add_argument("--bulk-size", type=int, default=500)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--only", nargs="*", help="scenarios to run")
+    parser.add_argument(
+        "--json-decoder", default="auto", choices=["auto", "json", "orjson", "msgspec"]
+    )
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run(
+        iterations=args.iterations,
+        latency=args.latency,
+        doc_size=args.doc_size,
+        bulk_size=args.bulk_size,
+        rows=args.rows,
+        only=args.only,
+        json_decoder=args.json_decoder,
+    )
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(format_table(results))
+
+
+if __name__ == "__main__":
+    main()
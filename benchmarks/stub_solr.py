@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+
+"""
+Local HTTP stand-in for BPL Solr serving synthetic JSON responses with
+configurable latency and payload size. Used by benchmarks.
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import re
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+
+TERMS_QUERY = re.compile(r"\{!terms f=(\w+)\}(.*)$")
+FIELD_QUERY = re.compile(r"(\w+):\(?([^()]*?)\)?$")
+
+
+def parse_identifiers(queries: List[str]) -> Tuple[Optional[str], List[str]]:
+    """
+    Finds a query for identifiers in a field (`field:(a OR b)`, `field:a OR b`
+    or `{!terms f=field}a,b`) among the main and filter queries
+
+    Returns:
+        tuple of field and list of identifiers, or (None, []) if none found
+    """
+    for query in queries:
+        match = TERMS_QUERY.match(query)
+        if match:
+            return match.group(1), match.group(2).split(",")
+        if " AND " in query or query in ("*:*", "ss_type:catalog"):
+            continue
+        match = FIELD_QUERY.match(query)
+        if match:
+            return match.group(1), match.group(2).split(" OR ")
+    return None, []
+
+
+class StubSolr:
+    """
+    Threaded HTTP server imitating BPL Solr select handler. Identifier queries
+    return one document per identifier; any other query matches `num_found`
+    documents paged with `start`/`rows` or `cursorMark`.
+
+    Example:
+        with StubSolr(latency=0.01, doc_size=1000) as endpoint:
+            with SolrSession("key", endpoint) as session:
+                session.search_isbns(["9780810984912"])
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        doc_size: int = 500,
+        num_found: int = 1000,
+        port: int = 0,
+    ):
+        """
+        Args:
+            latency:                seconds the server waits before responding
+            doc_size:               approximate size of each document in bytes
+            num_found:              number of documents matching non-identifier
+                                    queries
+            port:                   port to listen on; 0 picks a free port
+        """
+        self.latency = latency
+        self.doc_size = doc_size
+        self.num_found = num_found
+        self.port = port
+        self.requests = 0
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> str:
+        return self.start()
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+    @property
+    def endpoint(self) -> str:
+        if self._server is None:
+            raise RuntimeError("Stub Solr server is not running.")
+        return f"http://127.0.0.1:{self._server.server_port}/select"
+
+    def start(self) -> str:
+        """Starts server in a background thread and returns its endpoint"""
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # headers and body are written separately
+            disable_nagle_algorithm = True
+
+            def do_GET(self) -> None:
+                self.respond(parse_qs(urlparse(self.path).query))
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", 0))
+                self.respond(parse_qs(self.rfile.read(length).decode("utf-8")))
+
+            def respond(self, params: Dict[str, List[str]]) -> None:
+                body = stub.response_body(params)
+                if stub.latency:
+                    time.sleep(stub.latency)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self.endpoint
+
+    def stop(self) -> None:
+        """Stops server"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def make_doc(
+        self, doc_id: int, field: Optional[str] = None, value: str = ""
+    ) -> Dict:
+        """Creates synthetic document of about `doc_size` bytes"""
+        doc: Dict[str, Any] = {
+            "id": str(doc_id),
+            "title": "",
+            "author_raw": "Author, Example",
+            "publishYear": 2020,
+            "material_type": "Book",
+            "call_number": "FIC EXAMPLE",
+            "isbn": ["9780810984912", "0810984911"],
+            "language": ["English"],
+        }
+        if field == "id":
+            doc["id"] = value
+        elif field is not None:
+            doc[field] = [value]
+        padding = self.doc_size - len(json.dumps(doc))
+        doc["title"] = "x" * max(padding, 0)
+        return doc
+
+    def response_body(self, params: Dict[str, List[str]]) -> bytes:
+        """Builds JSON response for query parameters"""
+        with self._lock:
+            self.requests += 1
+
+        rows = int(params.get("rows", ["10"])[0])
+        start = int(params.get("start", ["0"])[0])
+        field, identifiers = parse_identifiers(
+            params.get("q", []) + params.get("fq", [])
+        )
+
+        body: Dict[str, Any] = {
+            "responseHeader": {"status": 0, "QTime": 1},
+        }
+        if field is not None:
+            # ids derived from identifiers stay the same across batches
+            docs = [
+                self.make_doc(
+                    10000000 + zlib.crc32(identifier.encode()) % 90000000,
+                    field,
+                    identifier,
+                )
+                for identifier in identifiers
+            ]
+            num_found = len(docs)
+            docs = docs[start : start + rows]
+        else:
+            num_found = self.num_found
+            cursor_mark = params.get("cursorMark", [None])[0]
+            if cursor_mark is not None:
+                start = 0 if cursor_mark == "*" else int(cursor_mark)
+            end = min(start + rows, num_found)
+            docs = [self.make_doc(10000000 + n) for n in range(start, end)]
+            if cursor_mark is not None:
+                body["nextCursorMark"] = str(end) if end > start else cursor_mark
+
+        body["response"] = {"numFound": num_found, "start": start, "docs": docs}
+        return json.dumps(body).encode("utf-8")
@@ -4,3 +4,13 @@ __title__ = "bookops-bpl-solr"
 
 from .session import SolrSession  # noqa: F401
 from .session import BookopsSolrError  # noqa: F401
+from .session import SolrQuery  # noqa: F401
+from .async_session import AsyncSolrSession  # noqa: F401
+from .export import SolrExport  # noqa: F401
+from .harvest import DeltaHarvester  # noqa: F401
+from .cache import MemoryCache, SQLiteCache  # noqa: F401
+from .metrics import SessionMetrics  # noqa: F401
+from .limiters import AdaptiveLimiter  # noqa: F401
+from .identifiers import match_identifiers, normalize_isbn, normalize_upc  # noqa: F401
+from .transport import RecordingAdapter, ReplayAdapter  # noqa: F401
+from .results import SolrDoc, SolrResult, iter_docs  # noqa: F401
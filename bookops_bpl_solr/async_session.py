@@ -0,0 +1,433 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module provides AsyncSolrSession class for asynchronous requests to
+BPL Solr platform. Requires optional `httpx` package:
+
+    python -m pip install "bookops-bpl-solr[async]"
+"""
+
+import asyncio
+import sys
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None  # type: ignore[assignment]
+
+from .balancing import Endpoint
+from .cache import cache_key
+from .coalescing import AsyncSingleFlight
+from .limiters import OVERLOAD_STATUSES, AdaptiveLimiter
+from .session import BookopsSolrError, SolrQuery, _SolrSessionBase
+
+
+class AsyncSolrSession(_SolrSessionBase):
+    """
+    An asyncio session class that wraps requests to BPL Solr platform.
+    Mirrors query methods of `SolrSession` and limits the number of requests
+    in flight at any time to `concurrency`.
+
+    Example:
+        async with AsyncSolrSession(
+            authorization="your_client_key", endpoint="solr_endpoint"
+        ) as session:
+            responses = await asyncio.gather(
+                *[session.search_bibNo(bid) for bid in bids]
+            )
+    """
+
+    def __init__(
+        self,
+        authorization: str,
+        endpoint: Union[str, List[str]],
+        agent: Optional[str] = None,
+        timeout: Union[int, float, Tuple[int, int], Tuple[float, float], None] = (
+            3,
+            3,
+        ),
+        concurrency: int = 10,
+        transport: Optional[Any] = None,
+        coalesce: bool = False,
+        json_decoder: str = "auto",
+        balancing: str = "least_outstanding",
+        eject_after: int = 3,
+        eject_seconds: float = 30.0,
+        concurrency_limiter: Optional[AdaptiveLimiter] = None,
+    ):
+        """
+        Args:
+            authorization:          Client-Key
+            endpoint:               endpoint's URL, or a list of URLs of
+                                    replicas requests are spread across
+            agent:                  "User-agent" parameter to be passed in the request
+                                    header; usage strongly encouraged
+            timeout:                how long to wait for server to send data before
+                                    giving up; default value is 3 seconds
+            concurrency:            maximum number of requests in flight
+            transport:              custom `httpx.AsyncBaseTransport` instance
+            coalesce:               when True, identical requests sent concurrently
+                                    are sent to BPL Solr once and all callers
+                                    receive the same response object
+            json_decoder:           JSON decoder of responses parsed by query
+                                    methods; see `SolrSession`
+            balancing:              'least_outstanding' or 'latency' selection
+                                    of endpoint; see `SolrSession`
+            eject_after:            number of consecutive failed requests after
+                                    which an endpoint is ejected
+            eject_seconds:          how long an ejected endpoint receives no
+                                    requests
+            concurrency_limiter:    optional `AdaptiveLimiter` instance
+                                    adjusting the number of requests in flight,
+                                    up to `concurrency`, to observed latency,
+                                    QTime and overload responses; waiting tasks
+                                    are woken by releases of this session only,
+                                    so the limiter should not be shared with
+                                    a `SolrSession`
+        """
+        if httpx is None:
+            raise BookopsSolrError(
+                "AsyncSolrSession requires httpx package. "
+                "Install it with: pip install bookops-bpl-solr[async]"
+            )
+
+        self._set_session_args(authorization, endpoint, agent)
+        self._set_json_decoder(json_decoder)
+        self._set_balancer(balancing, eject_after, eject_seconds)
+        self._set_concurrency_limiter(concurrency_limiter)
+        self.timeout = timeout
+
+        if not isinstance(concurrency, int) or concurrency < 1:
+            raise BookopsSolrError("Concurrency argument must be a positive integer.")
+        self.concurrency = concurrency
+
+        self._semaphore = asyncio.Semaphore(concurrency)
+        # notified when a slot of the concurrency limiter is freed
+        self._limiter_released = asyncio.Condition()
+        self._client = httpx.AsyncClient(
+            headers={"Client-Key": self.authorization, "User-Agent": self.agent},
+            timeout=self._prep_timeout(timeout),
+            limits=httpx.Limits(
+                max_connections=concurrency, max_keepalive_connections=concurrency
+            ),
+            transport=transport,
+        )
+        self.single_flight = AsyncSingleFlight() if coalesce else None
+
+    async def __aenter__(self) -> "AsyncSolrSession":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Closes underlying connection pool"""
+        await self._client.aclose()
+
+    def _prep_timeout(
+        self,
+        timeout: Union[int, float, Tuple[int, int], Tuple[float, float], None],
+    ) -> "httpx.Timeout":
+        """
+        Translates requests style timeout (single value or (connect, read) tuple)
+        to `httpx.Timeout`
+        """
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return httpx.Timeout(read, connect=connect)
+        return httpx.Timeout(timeout)
+
+    async def _send_request(
+        self, payload: Union[Dict, SolrQuery, None] = None
+    ) -> "httpx.Response":
+        """
+        Prepares and sends GET request with given parameters (payload) to BPL Solr.
+        Can be used for ad hoc searches not provided in AsyncSolrSession
+        direct query methods.
+        Passed payload overrides default values.
+        Payloads that would exceed `MAX_URL_LENGTH` are sent as a form-encoded
+        POST request. When the session coalesces requests, a request identical
+        to one already in flight waits for and returns its response.
+
+        Args:
+            payload:                query parameters as dictionary or
+                                    `SolrQuery` instance
+
+        Returns:
+            `httpx.Response` instance
+        """
+        if not isinstance(payload, (dict, SolrQuery)) or not payload:
+            raise BookopsSolrError("Missing or invalid payload argument.")
+
+        payload = self._merge_with_payload_defaults(payload)
+        params = {k: v for k, v in payload.items() if v is not None}
+
+        if self.single_flight is None:
+            return await self._fetch(params)
+        return await self.single_flight.do(
+            cache_key(self.endpoint, params), lambda: self._fetch(params)
+        )
+
+    async def _fetch(self, params: Dict) -> "httpx.Response":
+        """
+        Sends request with already merged parameters to BPL Solr. When
+        the session has several endpoints, a request failing with a timeout,
+        connection error or one of `FAILOVER_STATUSES` is sent again to another
+        endpoint, until each has been tried.
+
+        Args:
+            params:                 query parameters as dictionary
+
+        Returns:
+            `httpx.Response` instance
+        """
+        # endpoints that failed the request
+        failed: Set[str] = set()
+        async with self._semaphore:
+            while True:
+                slot = False
+                endpoint: Optional[Endpoint] = None
+                # (replica failed, overloaded) of a completed attempt
+                outcome: Optional[Tuple[bool, bool]] = None
+                response = None
+                started = time.perf_counter()
+                try:
+                    if self.concurrency_limiter is not None:
+                        async with self._limiter_released:
+                            await self._limiter_released.wait_for(
+                                self.concurrency_limiter.try_acquire
+                            )
+                        slot = True
+                    endpoint = self.balancer.acquire(exclude=failed)
+                    started = time.perf_counter()
+                    try:
+                        if self._is_url_too_long(params):
+                            response = await self._client.post(
+                                endpoint.url, data=params
+                            )
+                        else:
+                            response = await self._client.get(
+                                endpoint.url, params=params
+                            )
+                    except (httpx.TimeoutException, httpx.TransportError) as exc:
+                        outcome = (True, isinstance(exc, httpx.TimeoutException))
+                        if self._fail_over(endpoint.url, failed):
+                            continue
+                        raise BookopsSolrError(f"Connection error: {sys.exc_info()[0]}")
+
+                    except Exception:
+                        raise BookopsSolrError(f"Unexpected error: {sys.exc_info()[0]}")
+
+                    replica_failed = response.status_code in self.FAILOVER_STATUSES
+                    outcome = (
+                        replica_failed,
+                        response.status_code in OVERLOAD_STATUSES,
+                    )
+                    if replica_failed and self._fail_over(endpoint.url, failed):
+                        await response.aclose()
+                        continue
+                    return response
+                finally:
+                    await self._release(
+                        endpoint,
+                        slot,
+                        time.perf_counter() - started,
+                        outcome,
+                        response,
+                    )
+
+    async def _release(
+        self,
+        endpoint: Optional[Endpoint],
+        slot: bool,
+        seconds: float,
+        outcome: Optional[Tuple[bool, bool]],
+        response: Optional["httpx.Response"] = None,
+    ) -> None:
+        """
+        Frees endpoint and limiter slot of a request attempt, records its
+        outcome and wakes tasks waiting for a slot of the concurrency limiter.
+        Only releases of this session wake its tasks; see `AdaptiveLimiter`.
+        """
+        self._release_attempt(endpoint, slot, seconds, outcome, response)
+        if slot:
+            async with self._limiter_released:
+                self._limiter_released.notify_all()
+
+    async def search_bibNo(
+        self,
+        keyword: Union[str, int],
+        default_response_fields: bool = True,
+        response_fields: Union[str, List[str], None] = None,
+    ) -> "httpx.Response":
+        """
+        Retrieves documents with matching id (Sierra bib #).
+        See `SolrSession.search_bibNo` for details.
+        """
+        payload = self._bibNo_payload(keyword, default_response_fields, response_fields)
+        return await self._send_request(payload)
+
+    async def search_controlNo(
+        self,
+        keyword: str,
+        default_response_fields: bool = True,
+        response_fields: Union[str, List[str], None] = None,
+    ) -> "httpx.Response":
+        """
+        Retrieves documents with matching control number (001 MARC tag).
+        See `SolrSession.search_controlNo` for details.
+        """
+        payload = self._controlNo_payload(
+            keyword, default_response_fields, response_fields
+        )
+        return await self._send_request(payload)
+
+    async def search_isbns(
+        self,
+        keywords: List[str],
+        default_response_fields: bool = True,
+        response_fields: Union[str, List[str], None] = None,
+        query_parser: str = "lucene",
+        as_filter: bool = False,
+        normalize: bool = False,
+    ) -> "httpx.Response":
+        """
+        Retrieves documents with matching ISBNs.
+        See `SolrSession.search_isbns` for details.
+        """
+        payload = self._isbns_payload(
+            keywords,
+            default_response_fields,
+            response_fields,
+            query_parser,
+            as_filter,
+            normalize,
+        )
+        return await self._send_request(payload)
+
+    async def search_reserveId(
+        self,
+        keyword: str,
+        default_response_fields: bool = True,
+        response_fields: Union[str, List[str], None] = None,
+    ) -> "httpx.Response":
+        """
+        Retrieves documents with matching reserve ID.
+        See `SolrSession.search_reserveId` for details.
+        """
+        payload = self._reserveId_payload(
+            keyword, default_response_fields, response_fields
+        )
+        return await self._send_request(payload)
+
+    async def search_upcs(
+        self,
+        keywords: List[str],
+        default_response_fields: bool = True,
+        response_fields: Union[str, List[str], None] = None,
+        query_parser: str = "lucene",
+        as_filter: bool = False,
+        normalize: bool = False,
+    ) -> "httpx.Response":
+        """
+        Retrieves documents with matching UPCs.
+        See `SolrSession.search_upcs` for details.
+        """
+        payload = self._upcs_payload(
+            keywords,
+            default_response_fields,
+            response_fields,
+            query_parser,
+            as_filter,
+            normalize,
+        )
+        return await self._send_request(payload)
+
+    async def find_expired_econtent(
+        self,
+        rows: int = 50,
+        result_page: int = 0,
+        default_response_fields: bool = True,
+        response_fields: Union[str, List[str], None] = None,
+    ) -> "httpx.Response":
+        """
+        Retrieves Overdrive e-content documents that expired and library has no longer
+        access to. See `SolrSession.find_expired_econtent` for details.
+        """
+        payload = self._expired_econtent_payload(
+            rows, result_page, default_response_fields, response_fields
+        )
+        return await self._send_request(payload)
+
+    async def count_query(
+        self,
+        query: str = "*:*",
+        filters: Union[str, List[str], None] = None,
+    ) -> int:
+        """
+        Counts documents matching a query without retrieving them.
+        See `SolrSession.count_query` for details.
+        """
+        payload = self._count_payload(query, filters)
+        return self._parse_count(await self._send_request(payload))
+
+    async def count_expired_econtent(self) -> int:
+        """
+        Counts Overdrive e-content documents that expired and library has no longer
+        access to. See `SolrSession.count_expired_econtent` for details.
+        """
+        return await self.count_query(self.EXPIRED_ECONTENT_QUERY)
+
+    async def facet_query(
+        self,
+        fields: Union[str, List[str]],
+        query: str = "*:*",
+        filters: Union[str, List[str], None] = None,
+        limit: int = 100,
+        mincount: int = 1,
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        Counts documents matching a query by values of fields.
+        See `SolrSession.facet_query` for details.
+        """
+        payload = self._facet_payload(fields, query, filters, limit, mincount)
+        return self._parse_facets(await self._send_request(payload))
+
+    async def facet_material_types(
+        self,
+        query: str = "*:*",
+        filters: Union[str, List[str], None] = None,
+    ) -> Dict[str, int]:
+        """
+        Counts documents matching a query by `material_type`.
+        See `SolrSession.facet_material_types` for details.
+        """
+        facets = await self.facet_query("material_type", query, filters, -1)
+        return facets.get("material_type", {})
+
+    async def facet_eproviders(
+        self,
+        query: str = "*:*",
+        filters: Union[str, List[str], None] = None,
+    ) -> Dict[str, int]:
+        """
+        Counts documents matching a query by e-content provider.
+        See `SolrSession.facet_eproviders` for details.
+        """
+        facets = await self.facet_query("eprovider", query, filters, -1)
+        return facets.get("eprovider", {})
+
+    async def stats_query(
+        self,
+        fields: Union[str, List[str]],
+        query: str = "*:*",
+        filters: Union[str, List[str], None] = None,
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Retrieves statistics of fields of documents matching a query.
+        See `SolrSession.stats_query` for details.
+        """
+        payload = self._stats_payload(fields, query, filters)
+        return self._parse_stats(await self._send_request(payload))
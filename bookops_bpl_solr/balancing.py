@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module provides selection of BPL Solr replicas for requests with passive
+health tracking
+"""
+
+import itertools
+import threading
+import time
+from typing import Any, Collection, Dict, List, Optional
+
+
+STRATEGIES = ("least_outstanding", "latency")
+
+
+class Endpoint:
+    """State of a single BPL Solr replica"""
+
+    __slots__ = (
+        "url",
+        "outstanding",
+        "latency",
+        "requests",
+        "failures",
+        "consecutive_failures",
+        "ejected_until",
+    )
+
+    def __init__(self, url: str):
+        self.url = url
+        self.outstanding = 0
+        # exponentially weighted moving average of response times in seconds
+        self.latency: Optional[float] = None
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+
+    def __repr__(self) -> str:
+        return f"Endpoint({self.url!r})"
+
+
+class EndpointPool:
+    """
+    Thread-safe selector of BPL Solr replicas. Each request goes to the healthy
+    replica with the fewest requests in flight ('least_outstanding'), or with
+    the lowest expected wait, its average response time multiplied by
+    the number of requests in flight plus one ('latency'); ties are broken in
+    turn. A replica failing `eject_after` requests in a row is ejected for
+    `eject_seconds`, then tried again.
+    """
+
+    # weight of the latest response time in the latency moving average
+    LATENCY_DECAY = 0.3
+
+    def __init__(
+        self,
+        urls: List[str],
+        strategy: str = "least_outstanding",
+        eject_after: int = 3,
+        eject_seconds: float = 30.0,
+    ):
+        """
+        Args:
+            urls:                   endpoints of replicas
+            strategy:               'least_outstanding' or 'latency'
+            eject_after:            number of consecutive failures after which
+                                    a replica is ejected
+            eject_seconds:          how long an ejected replica receives no
+                                    requests unless all replicas are ejected
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy: {strategy}.")
+        self.endpoints = [Endpoint(url) for url in urls]
+        self.strategy = strategy
+        self.eject_after = eject_after
+        self.eject_seconds = eject_seconds
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    def _cost(self, endpoint: Endpoint) -> float:
+        if self.strategy == "latency":
+            # replicas without measured latency are tried first
+            return (endpoint.latency or 0.0) * (endpoint.outstanding + 1)
+        return endpoint.outstanding
+
+    def acquire(self, exclude: Collection[str] = ()) -> Endpoint:
+        """
+        Selects replica for a request and counts the request as outstanding
+
+        Args:
+            exclude:                urls of replicas that already failed
+                                    the request; used only when no other
+                                    replica is left
+
+        Returns:
+            `Endpoint` instance to be passed to `release`
+        """
+        with self._lock:
+            now = time.monotonic()
+            candidates = [e for e in self.endpoints if e.url not in exclude]
+            if not candidates:
+                candidates = self.endpoints
+            healthy = [e for e in candidates if e.ejected_until <= now]
+            if healthy:
+                # rotate start of the list so ties are broken in turn
+                shift = next(self._turn) % len(healthy)
+                healthy = healthy[shift:] + healthy[:shift]
+                endpoint = min(healthy, key=self._cost)
+            else:
+                # all replicas are ejected; try the one that recovers first
+                endpoint = min(candidates, key=lambda e: e.ejected_until)
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+            return endpoint
+
+    def release(self, endpoint: Endpoint, seconds: float, failed: bool) -> None:
+        """
+        Records outcome of a request sent to a replica
+
+        Args:
+            endpoint:               replica returned by `acquire`
+            seconds:                duration of the request
+            failed:                 True if the request failed with connection
+                                    error, timeout or server error
+        """
+        with self._lock:
+            endpoint.outstanding -= 1
+            if failed:
+                endpoint.failures += 1
+                endpoint.consecutive_failures += 1
+                if endpoint.consecutive_failures >= self.eject_after:
+                    endpoint.ejected_until = time.monotonic() + self.eject_seconds
+                    endpoint.consecutive_failures = 0
+                return
+            endpoint.consecutive_failures = 0
+            endpoint.ejected_until = 0.0
+            if endpoint.latency is None:
+                endpoint.latency = seconds
+            else:
+                endpoint.latency += self.LATENCY_DECAY * (seconds - endpoint.latency)
+
+    def cancel(self, endpoint: Endpoint) -> None:
+        """
+        Frees replica acquired for a request that did not complete, without
+        recording its outcome
+
+        Args:
+            endpoint:               replica returned by `acquire`
+        """
+        with self._lock:
+            endpoint.outstanding -= 1
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns:
+            dictionary keyed by replica url with number of outstanding requests,
+            average latency in seconds, number of sent requests and failures,
+            and whether the replica is ejected
+        """
+        now = time.monotonic()
+        with self._lock:
+            return {
+                e.url: {
+                    "outstanding": e.outstanding,
+                    "latency": e.latency,
+                    "requests": e.requests,
+                    "failures": e.failures,
+                    "ejected": e.ejected_until > now,
+                }
+                for e in self.endpoints
+            }
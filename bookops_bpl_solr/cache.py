@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module provides response caches that can be passed to SolrSession
+"""
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+import json
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, NamedTuple, Optional
+
+import requests
+
+
+ZERO_HITS_PATTERN = re.compile(rb'"numFound"\s*:\s*0\s*[,}]')
+
+
+class CachedResponse(NamedTuple):
+    status_code: int
+    url: str
+    headers: Dict[str, str]
+    content: bytes
+    expires: float
+
+
+def cache_key(endpoint: str, payload: Dict) -> str:
+    """
+    Creates cache key from endpoint and merged query parameters. Parameters
+    are sorted, so the order in which they were passed does not matter.
+
+    Args:
+        endpoint:               endpoint's URL
+        payload:                query parameters merged with defaults
+
+    Returns:
+        key as string
+    """
+    params = {k: v for k, v in payload.items() if v is not None}
+    return f"{endpoint}?{json.dumps(params, sort_keys=True, default=str)}"
+
+
+class BaseCache(ABC):
+    """
+    Base class of SolrSession response caches. Only successful (HTTP 200)
+    responses are cached. Responses with zero hits are cached for
+    `negative_ttl` seconds, all other for `ttl` seconds. Storage backends
+    implement `_load`, `_store`, `clear` and `__len__`.
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[float] = 3600,
+        maxsize: Optional[int] = 10000,
+        negative_ttl: Optional[float] = None,
+    ):
+        """
+        Args:
+            ttl:                    seconds after which cached responses expire;
+                                    `None` means responses never expire
+            maxsize:                maximum number of cached responses, least
+                                    recently used are evicted first; `None` means
+                                    cache size is unbounded
+            negative_ttl:           seconds after which cached responses with zero
+                                    hits expire; defaults to `ttl`; 0 disables
+                                    caching of zero hits responses
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _expires(self, response: requests.Response) -> Optional[float]:
+        """
+        Calculates expiration time of a response or returns `None` if
+        the response should not be cached
+        """
+        if response.status_code != 200:
+            return None
+        if ZERO_HITS_PATTERN.search(response.content):
+            ttl = self.negative_ttl
+        else:
+            ttl = self.ttl
+        if ttl is None:
+            return float("inf")
+        if ttl <= 0:
+            return None
+        return time.time() + ttl
+
+    @abstractmethod
+    def _load(self, key: str) -> Optional[CachedResponse]:
+        """Reads entry stored under the key, used by `get`"""
+
+    @abstractmethod
+    def _store(self, key: str, entry: CachedResponse) -> None:
+        """Stores entry under the key, used by `set`"""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Removes all cached responses"""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Returns number of cached responses"""
+
+    def get(self, key: str) -> Optional[requests.Response]:
+        """
+        Retrieves cached response
+
+        Args:
+            key:                    cache key
+
+        Returns:
+            `requests.Response` instance or `None` if not cached or expired
+        """
+        entry = self._load(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        response = requests.Response()
+        response.status_code = entry.status_code
+        response.url = entry.url
+        response.headers.update(entry.headers)
+        response._content = entry.content
+        response._content_consumed = True  # type: ignore[attr-defined]
+        response.encoding = "utf-8"
+        return response
+
+    def set(self, key: str, response: requests.Response) -> None:
+        """
+        Caches response if it is cacheable
+
+        Args:
+            key:                    cache key
+            response:               `requests.Response` instance
+        """
+        expires = self._expires(response)
+        if expires is None:
+            return
+        entry = CachedResponse(
+            response.status_code,
+            response.url,
+            dict(response.headers),
+            response.content,
+            expires,
+        )
+        self._store(key, entry)
+
+    def stats(self) -> Dict[str, int]:
+        """Returns cache hits, misses and number of cached responses"""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self)}
+
+
+class MemoryCache(BaseCache):
+    """
+    In-memory LRU cache with TTL expiration.
+
+    Example:
+        cache = MemoryCache(ttl=600, maxsize=50000)
+        with SolrSession(
+            authorization="your_client_key", endpoint="solr_endpoint", cache=cache
+        ) as session:
+            ...
+        print(cache.stats())
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[float] = 3600,
+        maxsize: Optional[int] = 10000,
+        negative_ttl: Optional[float] = None,
+    ):
+        super().__init__(ttl, maxsize, negative_ttl)
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _store(self, key: str, entry: CachedResponse) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            if self.maxsize is not None:
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCache(BaseCache):
+    """
+    Persistent LRU cache with TTL expiration stored in a SQLite database,
+    so a restarted job can reuse responses retrieved in earlier runs.
+
+    Example:
+        cache = SQLiteCache("solr-cache.db", ttl=86400)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: Optional[float] = 3600,
+        maxsize: Optional[int] = 100000,
+        negative_ttl: Optional[float] = None,
+    ):
+        """
+        Args:
+            path:                   path to SQLite database file
+            ttl:                    seconds after which cached responses expire;
+                                    `None` means responses never expire
+            maxsize:                maximum number of cached responses, least
+                                    recently used are evicted first; `None` means
+                                    cache size is unbounded
+            negative_ttl:           seconds after which cached responses with zero
+                                    hits expire; defaults to `ttl`; 0 disables
+                                    caching of zero hits responses
+        """
+        super().__init__(ttl, maxsize, negative_ttl)
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, status_code INTEGER, url TEXT, "
+                "headers TEXT, content BLOB, expires REAL, accessed REAL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed "
+                "ON responses (accessed)"
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def _load(self, key: str) -> Optional[CachedResponse]:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT status_code, url, headers, content, expires "
+                "FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            if row[4] < now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed = ? WHERE key = ?", (now, key)
+            )
+        return CachedResponse(row[0], row[1], json.loads(row[2]), row[3], row[4])
+
+    def _store(self, key: str, entry: CachedResponse) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    entry.status_code,
+                    entry.url,
+                    json.dumps(entry.headers),
+                    entry.content,
+                    entry.expires,
+                    time.time(),
+                ),
+            )
+            if self.maxsize is not None:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN (SELECT key FROM responses "
+                    "ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                    (self.maxsize,),
+                )
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        """Closes database connection"""
+        self._conn.close()
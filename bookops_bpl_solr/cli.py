@@ -0,0 +1,362 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module provides `bookops-bpl-solr` command-line tool running bulk lookups
+of identifiers read from a file or stdin and streaming results as JSON lines
+or CSV while the lookups run.
+
+Example:
+    bookops-bpl-solr isbns isbns.txt -o results.csv --format csv --workers 8
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from typing import (
+    IO,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from . import __title__, __version__
+from .limiters import AdaptiveLimiter
+from .session import BookopsSolrError, MapResult, SolrSession
+
+
+# query method and whether it accepts a list of identifiers
+LOOKUPS = {
+    "bibs": ("search_bibNos", True),
+    "isbns": ("bulk_search_isbns", True),
+    "upcs": ("bulk_search_upcs", True),
+    "controls": ("search_controlNo", False),
+    "reserves": ("search_reserveId", False),
+}
+
+
+def read_identifiers(file: IO[str]) -> Iterator[str]:
+    """Yields non-empty, stripped lines of a file"""
+    for line in file:
+        identifier = line.strip()
+        if identifier:
+            yield identifier
+
+
+def batched(identifiers: Iterable[str], size: int) -> Iterator[List[str]]:
+    """Groups identifiers into lists of `size` identifiers"""
+    batch: List[str] = []
+    for identifier in identifiers:
+        batch.append(identifier)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def lookup_records(result: MapResult, kind: str) -> List[Dict[str, Any]]:
+    """
+    Converts result of a query method call to one record per looked up
+    identifier
+
+    Args:
+        result:                 `MapResult` of a `SolrSession.map` call
+        kind:                   kind of identifiers (key of `LOOKUPS`)
+
+    Returns:
+        list of dictionaries with `input`, `docs` and `error` keys
+    """
+    keywords = result.request[1]
+    if not isinstance(keywords, list):
+        keywords = [keywords]
+
+    if result.error is not None:
+        error = str(result.error) or type(result.error).__name__
+        return [{"input": k, "docs": [], "error": error} for k in keywords]
+
+    response = result.response
+    if kind == "bibs":
+        invalid = set(response["invalid"])
+        # one record per input line, including repeated bib numbers
+        return [
+            {
+                "input": k,
+                "docs": [] if response["docs"][k] is None else [response["docs"][k]],
+                "error": "Invalid Sierra bib number passed." if k in invalid else None,
+            }
+            for k in keywords
+        ]
+    elif kind in ("isbns", "upcs"):
+        docs = {doc["id"]: doc for doc in response["docs"]}
+        invalid = set(response["invalid"])
+        # one record per input line, including repeated identifiers
+        return [
+            {
+                "input": k,
+                "docs": [docs[bid] for bid in response["matches"].get(k, [])],
+                "error": f"Invalid {kind[:-1].upper()}." if k in invalid else None,
+            }
+            for k in keywords
+        ]
+    else:
+        if response.status_code != 200:
+            error = f"BPL Solr returned unexpected HTTP status: {response.status_code}."
+            return [{"input": keywords[0], "docs": [], "error": error}]
+        docs = response.json()["response"]["docs"]
+        return [{"input": keywords[0], "docs": docs, "error": None}]
+
+
+class JSONLinesWriter:
+    """Writes one JSON object per looked up identifier"""
+
+    def __init__(self, file: IO[str], fields: List[str]):
+        self.file = file
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class CSVWriter:
+    """
+    Writes one row per document matched by a looked up identifier, or a row
+    with empty fields when nothing matched; multiple values of a field are
+    joined with "; "
+    """
+
+    def __init__(self, file: IO[str], fields: List[str]):
+        self.fields = fields
+        self.writer = csv.writer(file)
+        self.writer.writerow(["input"] + fields + ["error"])
+
+    def write(self, record: Dict[str, Any]) -> None:
+        for doc in record["docs"] or [{}]:
+            row = [record["input"]]
+            for field in self.fields:
+                value = doc.get(field, "")
+                if isinstance(value, list):
+                    value = "; ".join(str(v) for v in value)
+                row.append(value)
+            row.append(record["error"] or "")
+            self.writer.writerow(row)
+
+
+class Progress:
+    """Reports number of processed identifiers and throughput on stderr"""
+
+    def __init__(self, stream: IO[str], enabled: bool = True):
+        self.stream = stream
+        self.enabled = enabled
+        self.processed = 0
+        self.found = 0
+        self.errors = 0
+        self.started = time.monotonic()
+
+    def update(self, records: List[Dict[str, Any]]) -> None:
+        self.processed += len(records)
+        self.found += sum(1 for record in records if record["docs"])
+        self.errors += sum(1 for record in records if record["error"])
+        if self.enabled:
+            self.stream.write(f"\r{self.summary()}")
+            self.stream.flush()
+
+    def summary(self) -> str:
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return (
+            f"{self.processed} processed, {self.found} found, {self.errors} errors, "
+            f"{self.processed / elapsed:.1f}/s"
+        )
+
+    def finish(self) -> None:
+        if self.enabled:
+            self.stream.write(f"\r{self.summary()}\n")
+            self.stream.flush()
+
+
+def run(
+    session: SolrSession,
+    kind: str,
+    identifiers: Iterable[str],
+    output: IO[str],
+    output_format: str = "jsonl",
+    workers: int = 4,
+    batch_size: int = 100,
+    fields: Optional[List[str]] = None,
+    progress: Optional[Progress] = None,
+) -> Tuple[int, int]:
+    """
+    Looks up identifiers in parallel and streams results as they complete
+
+    Args:
+        session:                `SolrSession` instance
+        kind:                   kind of identifiers (key of `LOOKUPS`)
+        identifiers:            iterable of identifiers; consumed lazily
+        output:                 text stream results are written to
+        output_format:          'jsonl' or 'csv'
+        workers:                number of concurrent requests
+        batch_size:             number of identifiers looked up in one call
+                                of a bulk query method
+        fields:                 fields returned in results; defaults to
+                                `SolrSession.DEFAULT_RESPONSE_FIELDS`
+        progress:               `Progress` instance
+
+    Returns:
+        tuple of number of processed identifiers and number of errors
+    """
+    method, bulk = LOOKUPS[kind]
+    if fields is None:
+        fields = list(session.DEFAULT_RESPONSE_FIELDS)
+    writer_class = CSVWriter if output_format == "csv" else JSONLinesWriter
+    writer = writer_class(output, fields)
+    if progress is None:
+        progress = Progress(sys.stderr, enabled=False)
+
+    batches: Iterable[Any] = (
+        batched(identifiers, batch_size) if bulk else iter(identifiers)
+    )
+    spec = ((method, batch, False, fields) for batch in batches)
+    for result in session.map(spec, max_workers=workers):
+        _write(writer, output, progress, lookup_records(result, kind))
+    progress.finish()
+    return progress.processed, progress.errors
+
+
+def _write(
+    writer: Any, output: IO[str], progress: Progress, records: List[Dict[str, Any]]
+) -> None:
+    """Writes records, flushes output, and updates progress"""
+    if not records:
+        return
+    for record in records:
+        writer.write(record)
+    output.flush()
+    progress.update(records)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog=__title__,
+        description="Looks up identifiers in BPL Solr and streams found records.",
+    )
+    parser.add_argument("kind", choices=sorted(LOOKUPS), help="kind of identifiers")
+    parser.add_argument(
+        "input",
+        nargs="?",
+        default="-",
+        help="file with one identifier per line; stdin when omitted or '-'",
+    )
+    parser.add_argument(
+        "-o", "--output", default="-", help="output file; stdout by default"
+    )
+    parser.add_argument(
+        "-f", "--format", choices=["jsonl", "csv"], default="jsonl", dest="fmt"
+    )
+    parser.add_argument(
+        "--endpoint",
+        default=os.environ.get("BPL_SOLR_ENDPOINT"),
+        help="BPL Solr endpoint; defaults to BPL_SOLR_ENDPOINT environment variable",
+    )
+    parser.add_argument(
+        "--key",
+        default=os.environ.get("BPL_SOLR_CLIENT_KEY"),
+        help="Client-Key; defaults to BPL_SOLR_CLIENT_KEY environment variable",
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=4, help="concurrent requests"
+    )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="adjust concurrent requests, up to --workers, to the load of BPL Solr",
+    )
+    parser.add_argument(
+        "-b",
+        "--batch-size",
+        type=int,
+        default=100,
+        help="identifiers per request of bibs, isbns and upcs lookups",
+    )
+    parser.add_argument(
+        "--fields", help="comma separated fields to return; default fields if omitted"
+    )
+    parser.add_argument("--timeout", type=float, default=10.0, help="seconds")
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument(
+        "--rate-limit", type=float, default=None, help="maximum requests per second"
+    )
+    parser.add_argument(
+        "-q", "--quiet", action="store_true", help="do not report progress"
+    )
+    parser.add_argument("--version", action="version", version=__version__)
+    args = parser.parse_args(argv)
+
+    if not args.endpoint or not args.key:
+        parser.error("BPL Solr endpoint and Client-Key are required.")
+    if args.workers < 1 or args.batch_size < 1:
+        parser.error("workers and batch size must be positive integers.")
+    return args
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    """Opens file or returns stdin/stdout for '-'"""
+    if path == "-":
+        return sys.stdin if "r" in mode else sys.stdout
+    return open(path, mode, encoding="utf-8", newline="")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Runs `bookops-bpl-solr` command
+
+    Returns:
+        exit status: 0 on success, 1 when any lookup failed, 2 on invalid
+        usage or unrecoverable error
+    """
+    args = parse_args(argv)
+    fields = args.fields.split(",") if args.fields else None
+
+    limiter = None
+    if args.adaptive:
+        limiter = AdaptiveLimiter(
+            initial_limit=min(4, args.workers), max_limit=args.workers
+        )
+
+    infile: Optional[IO[str]] = None
+    outfile: Optional[IO[str]] = None
+    try:
+        infile = _open(args.input, "r")
+        outfile = _open(args.output, "w")
+        with SolrSession(
+            authorization=args.key,
+            endpoint=args.endpoint,
+            timeout=args.timeout,
+            retries=args.retries,
+            rate_limit=args.rate_limit,
+            concurrency_limiter=limiter,
+        ) as session:
+            _, errors = run(
+                session,
+                args.kind,
+                read_identifiers(infile),
+                outfile,
+                output_format=args.fmt,
+                workers=args.workers,
+                batch_size=args.batch_size,
+                fields=fields,
+                progress=Progress(sys.stderr, enabled=not args.quiet),
+            )
+    except (BookopsSolrError, OSError) as exc:
+        sys.stderr.write(f"{__title__}: error: {exc}\n")
+        return 2
+    finally:
+        if infile is not None and infile is not sys.stdin:
+            infile.close()
+        if outfile is not None and outfile is not sys.stdout:
+            outfile.close()
+    return 1 if errors else 0
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module provides coalescing of identical concurrent requests to BPL Solr
+("single-flight"): while a request is in flight, callers sending the same
+request wait for it and receive its response instead of sending their own
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+
+class _Call:
+    """Request in flight shared by all callers with the same key"""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Thread-safe coalescing of identical calls. The first caller with a given
+    key runs the call; callers with the same key arriving before it completes
+    wait and receive the same result (or exception).
+    """
+
+    def __init__(self) -> None:
+        self.shared = 0
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of calls in flight"""
+        return len(self._calls)
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        """
+        Runs `fn` unless a call with the same key is already in flight,
+        in which case waits for it and returns its result
+
+        Args:
+            key:                    key identifying identical calls
+            fn:                     function to call
+
+        Returns:
+            result of `fn`
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                leader = True
+            else:
+                self.shared += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+class AsyncSingleFlight:
+    """
+    Coalescing of identical coroutine calls running on one event loop.
+    See `SingleFlight` for details.
+    """
+
+    def __init__(self) -> None:
+        self.shared = 0
+        self._calls: Dict[str, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        """Number of calls in flight"""
+        return len(self._calls)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Awaits `fn()` unless a call with the same key is already in flight,
+        in which case waits for it and returns its result
+
+        Args:
+            key:                    key identifying identical calls
+            fn:                     coroutine function to call
+
+        Returns:
+            result of `fn()`
+        """
+        future = self._calls.get(key)
+        if future is not None:
+            self.shared += 1
+            # cancelling one of the waiting callers does not cancel the call
+            return await asyncio.shield(future)
+
+        future = self._calls[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # mark exception as retrieved when no other caller waits for it
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
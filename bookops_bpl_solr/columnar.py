@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module provides parsing of BPL Solr responses in CSV format (`wt=csv`)
+into columns: lists, or NumPy arrays or an Arrow table when optional `numpy`
+or `pyarrow` packages are installed
+"""
+
+import csv
+import io
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None  # type: ignore[assignment]
+
+try:
+    import pyarrow  # type: ignore[import-untyped]
+    import pyarrow.compute  # type: ignore[import-untyped]
+    import pyarrow.csv  # type: ignore[import-untyped]
+except ImportError:  # pragma: no cover
+    pyarrow = None  # type: ignore[assignment]
+
+
+ARRAY_TYPES = ("list", "numpy", "arrow")
+
+# separator of values of multivalued fields requested from Solr's CSV writer
+MV_SEPARATOR = "|"
+
+# fields of BPL Solr documents with multiple values
+MULTIVALUED_FIELDS = ("isbn", "language")
+
+# fields of BPL Solr documents with numeric values; values of any other field
+# are kept as strings, so identifiers and call numbers keep leading zeros
+NUMERIC_FIELDS = ("publishYear", "digital_copies_owned")
+
+
+def csv_params(mv_separator: str = MV_SEPARATOR) -> Dict[str, str]:
+    """
+    Returns:
+        query parameters selecting Solr's CSV response writer
+    """
+    return {"wt": "csv", "csv.header": "true", "csv.mv.separator": mv_separator}
+
+
+def parse_csv_columns(
+    content: Union[bytes, str],
+    multivalued: Iterable[str] = MULTIVALUED_FIELDS,
+    array_type: str = "list",
+    mv_separator: str = MV_SEPARATOR,
+    numeric: Iterable[str] = NUMERIC_FIELDS,
+) -> Any:
+    """
+    Parses CSV response body into columns keyed by field names (`fl`
+    parameter). Rows are transposed at once, without creating a dictionary
+    per document. Empty values are returned as `None` (or null), and values
+    of multivalued fields as lists. Only `numeric` fields are converted to
+    numbers; values of other fields stay strings even when they consist of
+    digits.
+
+    Args:
+        content:                response body
+        multivalued:            names of multivalued fields
+        array_type:             'list' returns dictionary of lists of strings,
+                                'numpy' dictionary of NumPy arrays (numeric
+                                fields as integers or floats, other `object`),
+                                'arrow' `pyarrow.Table` with numeric fields
+                                of inferred types and other fields as strings
+        mv_separator:           separator of values of multivalued fields
+        numeric:                names of fields with numeric values
+
+    Returns:
+        columns as dictionary of field names and arrays, or `pyarrow.Table`
+    """
+    if array_type not in ARRAY_TYPES:
+        raise ValueError(f"Unknown array type: {array_type}.")
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    multivalued = set(multivalued)
+    numeric = set(numeric) - multivalued
+
+    if array_type == "arrow":
+        return _arrow_table(content, multivalued, numeric, mv_separator)
+
+    reader = csv.reader(io.StringIO(content.decode("utf-8")))
+    try:
+        fields = next(reader)
+    except StopIteration:
+        return {}
+    rows = list(reader)
+    if rows:
+        values: List[Iterable[str]] = list(zip(*rows))
+    else:
+        values = [() for _ in fields]
+
+    columns: Dict[str, Any] = {}
+    for field, column in zip(fields, values):
+        if field in multivalued:
+            columns[field] = [
+                value.split(mv_separator) if value else None for value in column
+            ]
+        else:
+            columns[field] = [value or None for value in column]
+
+    if array_type == "numpy":
+        return {
+            field: _numpy_array(column, numeric=field in numeric)
+            for field, column in columns.items()
+        }
+    return columns
+
+
+def _numpy_array(column: List[Any], numeric: bool) -> Any:
+    """
+    Converts column to NumPy array of integers or floats when possible,
+    otherwise to one-dimensional array of objects
+    """
+    if numpy is None:
+        raise ValueError("NumPy arrays require numpy package.")
+    if numeric and column and None not in column:
+        for dtype in (numpy.int64, numpy.float64):
+            try:
+                return numpy.array(column, dtype=dtype)
+            except (ValueError, TypeError):
+                continue
+    array = numpy.empty(len(column), dtype=object)
+    # assigned one by one, so lists of equal length do not become a 2D array
+    for position, value in enumerate(column):
+        array[position] = value
+    return array
+
+
+def _arrow_table(
+    content: bytes, multivalued: set, numeric: set, mv_separator: str
+) -> Any:
+    """Reads CSV into `pyarrow.Table` splitting multivalued columns"""
+    if pyarrow is None:
+        raise ValueError("Arrow tables require pyarrow package.")
+    if not content.strip():
+        return pyarrow.table({})
+    # types are inferred for numeric fields only, others are kept as strings
+    header = next(csv.reader(io.StringIO(content.split(b"\n", 1)[0].decode("utf-8"))))
+    column_types = {field: pyarrow.string() for field in header if field not in numeric}
+    table = pyarrow.csv.read_csv(
+        io.BytesIO(content),
+        convert_options=pyarrow.csv.ConvertOptions(
+            column_types=column_types, strings_can_be_null=True
+        ),
+    )
+    for position, field in enumerate(table.column_names):
+        if field in multivalued:
+            table = table.set_column(
+                position,
+                field,
+                pyarrow.compute.split_pattern(table[field], mv_separator),
+            )
+    return table
+
+
+def column_length(columns: Any) -> int:
+    """Returns number of rows of parsed columns"""
+    if pyarrow is not None and isinstance(columns, pyarrow.Table):
+        return columns.num_rows
+    for column in columns.values():
+        return len(column)
+    return 0
+
+
+def last_value(columns: Any, field: str) -> Optional[str]:
+    """Returns value of a field in the last row of parsed columns"""
+    if not column_length(columns):
+        return None
+    column = columns[field]
+    value = column[len(column) - 1]
+    if pyarrow is not None and isinstance(value, pyarrow.Scalar):
+        value = value.as_py()
+    return str(value)
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module provides JSON decoders of BPL Solr responses. Faster decoders are
+used when optional `orjson` or `msgspec` packages are installed:
+
+    python -m pip install "bookops-bpl-solr[speedups]"
+"""
+
+import json
+from typing import Any, Callable, Dict, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover
+    msgspec = None  # type: ignore[assignment]
+
+
+Decoder = Callable[[Union[bytes, str]], Any]
+
+# decoders in order of preference of the "auto" setting
+PREFERRED_DECODERS = ("orjson", "msgspec")
+JSON_DECODERS = ("auto", "json") + PREFERRED_DECODERS
+
+
+def _msgspec_loads(content: Union[bytes, str]) -> Any:
+    """Decodes JSON with msgspec raising `ValueError` like other decoders"""
+    try:
+        return msgspec.json.decode(content)
+    except msgspec.DecodeError as exc:
+        raise ValueError(str(exc))
+
+
+def available_decoders() -> Dict[str, Decoder]:
+    """
+    Returns:
+        dictionary of names and functions of installed JSON decoders
+    """
+    decoders: Dict[str, Decoder] = {"json": json.loads}
+    if orjson is not None:
+        decoders["orjson"] = orjson.loads
+    if msgspec is not None:
+        decoders["msgspec"] = _msgspec_loads
+    return decoders
+
+
+def resolve_decoder(name: str) -> str:
+    """
+    Determines installed decoder used for a setting. "auto" selects the fastest
+    installed decoder; a decoder that is not installed falls back to
+    the standard library `json` module.
+
+    Args:
+        name:                   'auto', 'json', 'orjson' or 'msgspec'
+
+    Returns:
+        name of the decoder
+    """
+    if name not in JSON_DECODERS:
+        raise ValueError(f"Unknown JSON decoder: {name}.")
+    decoders = available_decoders()
+    if name == "auto":
+        for preferred in PREFERRED_DECODERS:
+            if preferred in decoders:
+                return preferred
+        return "json"
+    return name if name in decoders else "json"
+
+
+def get_decoder(name: str = "auto") -> Decoder:
+    """
+    Returns function decoding JSON bytes or string for a decoder setting;
+    see `resolve_decoder`. Decoding errors are raised as `ValueError`.
+
+    Args:
+        name:                   'auto', 'json', 'orjson' or 'msgspec'
+
+    Returns:
+        decoding function
+    """
+    return available_decoders()[resolve_decoder(name)]
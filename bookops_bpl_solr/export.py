@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module provides SolrExport class that dumps all documents matching a query
+to compressed JSON lines or Parquet files. Exports are written in parts and
+checkpointed, so an interrupted export resumes after the last completed part.
+Parquet format requires optional `pyarrow` package:
+
+    python -m pip install "bookops-bpl-solr[parquet]"
+"""
+
+import gzip
+import json
+import os
+from typing import Any, Dict, List, Optional, Union
+
+try:
+    import pyarrow  # type: ignore[import-untyped]
+    import pyarrow.parquet  # type: ignore[import-untyped]
+except ImportError:  # pragma: no cover
+    pyarrow = None  # type: ignore[assignment]
+
+from .session import BookopsSolrError, SolrQuery, SolrSession
+
+
+CHECKPOINT_FILE = "checkpoint.json"
+FORMATS = {"jsonl": ".jsonl.gz", "parquet": ".parquet"}
+
+
+class _JSONLinesPart:
+    """Part file streaming documents to gzip compressed JSON lines"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._file = gzip.open(f"{path}.tmp", "wt", encoding="utf-8")
+
+    def write(self, docs: List[Dict]) -> None:
+        for doc in docs:
+            self._file.write(json.dumps(doc, ensure_ascii=False) + "\n")
+        self.count += len(docs)
+
+    def close(self) -> None:
+        self._file.close()
+        os.replace(f"{self.path}.tmp", self.path)
+
+    def discard(self) -> None:
+        self._file.close()
+        os.remove(f"{self.path}.tmp")
+
+
+class _ParquetPart:
+    """
+    Part file buffering documents and writing them as a Parquet table, so
+    the schema is inferred from all documents of the part
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._docs: List[Dict] = []
+
+    def write(self, docs: List[Dict]) -> None:
+        self._docs.extend(docs)
+        self.count += len(docs)
+
+    def close(self) -> None:
+        table = pyarrow.Table.from_pylist(self._docs)
+        pyarrow.parquet.write_table(table, f"{self.path}.tmp", compression="zstd")
+        os.replace(f"{self.path}.tmp", self.path)
+        self._docs = []
+
+    def discard(self) -> None:
+        self._docs = []
+
+
+class SolrExport:
+    """
+    Exports all documents matching a query to a directory of part files
+    (`part-00000.jsonl.gz`, `part-00001.jsonl.gz`, ...). Results are paged with
+    Solr's `cursorMark`; after each part is written the cursor of the next page
+    is saved to `checkpoint.json` in the directory. Running an export again
+    continues from the checkpoint, discarding any part left unfinished.
+
+    Example:
+        payload = {"q": "material_type:eBook", "rows": 500, "fl": "id,title"}
+        with SolrSession(
+            authorization="your_client_key", endpoint="solr_endpoint"
+        ) as session:
+            export = SolrExport(session, payload, "ebooks", format="parquet")
+            export.run()
+    """
+
+    def __init__(
+        self,
+        session: SolrSession,
+        payload: Union[Dict, SolrQuery],
+        directory: str,
+        format: str = "jsonl",
+        part_size: int = 50000,
+    ):
+        """
+        Args:
+            session:                `SolrSession` instance
+            payload:                query parameters as dictionary or
+                                    `SolrQuery` instance; `rows` sets the number
+                                    of documents per request
+            directory:              directory of part files and checkpoint;
+                                    created if it does not exist
+            format:                 'jsonl' (gzip compressed JSON lines) or
+                                    'parquet'
+            part_size:              approximate number of documents per part
+                                    file; bounds memory use of Parquet exports
+                                    and the amount of work repeated on resume
+        """
+        if not isinstance(session, SolrSession):
+            raise BookopsSolrError("Invalid type of a session argument.")
+        if isinstance(payload, SolrQuery):
+            payload = payload.to_payload()
+        if not isinstance(payload, dict) or not payload:
+            raise BookopsSolrError("Missing or invalid payload argument.")
+        if format not in FORMATS:
+            raise BookopsSolrError("Invalid format argument. Use 'jsonl' or 'parquet'.")
+        if format == "parquet" and pyarrow is None:
+            raise BookopsSolrError(
+                "Parquet export requires pyarrow package. "
+                "Install it with: pip install bookops-bpl-solr[parquet]"
+            )
+        if not isinstance(part_size, int) or part_size < 1:
+            raise BookopsSolrError("Invalid part_size argument.")
+
+        self.session = session
+        self.payload = {k: v for k, v in payload.items() if k != "start"}
+        self.directory = directory
+        self.format = format
+        self.part_size = part_size
+
+    @property
+    def checkpoint_path(self) -> str:
+        return os.path.join(self.directory, CHECKPOINT_FILE)
+
+    def _part_path(self, number: int) -> str:
+        return os.path.join(self.directory, f"part-{number:05d}{FORMATS[self.format]}")
+
+    def _open_part(self, number: int) -> Any:
+        if self.format == "parquet":
+            return _ParquetPart(self._part_path(number))
+        return _JSONLinesPart(self._part_path(number))
+
+    def _new_state(self) -> Dict[str, Any]:
+        return {
+            # payload round-tripped through JSON to compare with saved one
+            "query": json.loads(json.dumps(self.payload)),
+            "format": self.format,
+            "cursor_mark": "*",
+            "parts": 0,
+            "exported": 0,
+            "num_found": None,
+            "done": False,
+        }
+
+    def _remove_unfinished_parts(self, parts: int) -> None:
+        """Removes part files not recorded in the checkpoint"""
+        for name in os.listdir(self.directory):
+            if not name.startswith("part-"):
+                continue
+            number = name[5:10]
+            if name.endswith(".tmp") or not number.isdigit() or int(number) >= parts:
+                os.remove(os.path.join(self.directory, name))
+
+    def _save_checkpoint(self, state: Dict[str, Any]) -> None:
+        """Writes checkpoint atomically"""
+        path = self.checkpoint_path
+        with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+            json.dump(state, file, indent=2)
+        os.replace(f"{path}.tmp", path)
+
+    def load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        """
+        Reads export state saved in the directory
+
+        Returns:
+            state as dictionary or `None` if export has not started
+        """
+        try:
+            with open(self.checkpoint_path, encoding="utf-8") as file:
+                state = json.load(file)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            raise BookopsSolrError(f"Invalid checkpoint file: {self.checkpoint_path}.")
+
+        new_state = self._new_state()
+        if state.get("query") != new_state["query"]:
+            raise BookopsSolrError(
+                "Checkpoint in the export directory belongs to a different query."
+            )
+        if state.get("format") != self.format:
+            raise BookopsSolrError(
+                "Checkpoint in the export directory belongs to a different format."
+            )
+        return state
+
+    def parts(self) -> List[str]:
+        """
+        Returns:
+            paths of completed part files
+        """
+        state = self.load_checkpoint()
+        if state is None:
+            return []
+        return [self._part_path(number) for number in range(state["parts"])]
+
+    def run(self, hooks: Optional[Dict] = None) -> Dict[str, Any]:
+        """
+        Runs the export, or resumes it from the saved checkpoint
+
+        Args:
+            hooks:                  Requests library hook system that can be
+                                    used for signal event handling, see more at:
+                                    https://requests.readthedocs.io/en/master/user/advanced/#event-hooks
+
+        Returns:
+            export state: number of `parts` and `exported` documents, `numFound`
+            reported by Solr and whether the export is `done`
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        state = self.load_checkpoint() or self._new_state()
+        if state["done"]:
+            return state
+        self._remove_unfinished_parts(state["parts"])
+
+        part = None
+        next_cursor_mark = state["cursor_mark"]
+        pages = self.session._iter_cursor_pages(
+            self.payload, hooks, cursor_mark=state["cursor_mark"]
+        )
+        try:
+            for data, next_cursor_mark in pages:
+                state["num_found"] = data["response"]["numFound"]
+                docs = data["response"]["docs"]
+                if docs:
+                    if part is None:
+                        part = self._open_part(state["parts"])
+                    part.write(docs)
+                if part is not None and part.count >= self.part_size:
+                    self._complete_part(state, part, next_cursor_mark)
+                    part = None
+        except BaseException:
+            # documents of unfinished part are requested again on resume
+            if part is not None:
+                part.discard()
+            raise
+
+        if part is not None:
+            self._complete_part(state, part, next_cursor_mark)
+        state["cursor_mark"] = next_cursor_mark
+        state["done"] = True
+        self._save_checkpoint(state)
+        return state
+
+    def _complete_part(
+        self, state: Dict[str, Any], part: Any, next_cursor_mark: str
+    ) -> None:
+        """Closes part file and saves checkpoint pointing after it"""
+        part.close()
+        state["parts"] += 1
+        state["exported"] += part.count
+        state["cursor_mark"] = next_cursor_mark
+        self._save_checkpoint(state)
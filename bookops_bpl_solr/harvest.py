@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module provides DeltaHarvester class that retrieves only documents
+created or updated since the previous harvest, tracking a persisted watermark
+on a date field
+"""
+
+import json
+import os
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from .metrics import instrumented
+from .session import BookopsSolrError, SolrSession
+
+
+class DeltaHarvester:
+    """
+    Harvests documents with a value of `field` at or past the watermark saved
+    by the previous harvest. Results are sorted by `field` and paged with
+    Solr's `cursorMark`, and the watermark (the latest value of `field` seen)
+    is saved to `state_path` after each page has been consumed, so each sync
+    requests only documents changed since the last one and an interrupted sync
+    continues close to where it stopped. Documents with the watermark value
+    already harvested are skipped, so none is returned twice.
+
+    Example:
+        with SolrSession(
+            authorization="your_client_key", endpoint="solr_endpoint"
+        ) as session:
+            harvester = DeltaHarvester(
+                session, "harvest-state.json", query="ss_type:catalog"
+            )
+            for doc in harvester.harvest():
+                print(doc["id"], doc["created_date"])
+            print(harvester.watermark)
+    """
+
+    def __init__(
+        self,
+        session: SolrSession,
+        state_path: str,
+        field: str = "created_date",
+        query: str = "*:*",
+        response_fields: Union[str, List[str], None] = None,
+        rows: int = 100,
+        since: Optional[str] = None,
+    ):
+        """
+        Args:
+            session:                `SolrSession` instance
+            state_path:             path of JSON file the watermark is saved to
+            field:                  indexed date (or other sortable) field
+                                    the watermark is tracked on
+            query:                  query selecting harvested documents
+            response_fields:        fields to be returned as comma separated
+                                    string, or a list of strings; all fields
+                                    if omitted; `id` and `field` are always
+                                    included
+            rows:                   number of retrieved documents per request
+            since:                  initial watermark, for example
+                                    "2024-01-01T00:00:00Z", used when there is
+                                    no saved state; without it the first
+                                    harvest retrieves all documents
+        """
+        if not isinstance(session, SolrSession):
+            raise BookopsSolrError("Invalid type of a session argument.")
+        if not isinstance(field, str) or not field:
+            raise BookopsSolrError("Invalid field argument.")
+        if not isinstance(query, str) or not query:
+            raise BookopsSolrError("Invalid query argument.")
+        if not isinstance(rows, int) or rows < 1:
+            raise BookopsSolrError("Invalid rows argument.")
+
+        self.session = session
+        self.state_path = state_path
+        self.field = field
+        self.query = query
+        self.rows = rows
+        self.since = since
+        self.response_fields = None
+        if response_fields is not None:
+            fields = session._prep_response_fields(response_fields).split(",")
+            for required in ("id", field):
+                if required not in fields:
+                    fields.append(required)
+            self.response_fields = ",".join(fields)
+
+    @property
+    def watermark(self) -> Optional[str]:
+        """Value of `field` the next harvest starts from"""
+        return self.load_state()["watermark"]
+
+    def load_state(self) -> Dict[str, Any]:
+        """
+        Reads harvest state
+
+        Returns:
+            dictionary with `watermark`, `ids` of documents harvested with
+            the watermark value, and total number of `harvested` documents
+        """
+        try:
+            with open(self.state_path, encoding="utf-8") as file:
+                state = json.load(file)
+        except FileNotFoundError:
+            return {
+                "field": self.field,
+                "query": self.query,
+                "watermark": self.since,
+                "ids": [],
+                "harvested": 0,
+            }
+        except ValueError:
+            raise BookopsSolrError(f"Invalid harvest state file: {self.state_path}.")
+
+        if state.get("field") != self.field or state.get("query") != self.query:
+            raise BookopsSolrError(
+                "Harvest state belongs to a different field or query."
+            )
+        return state
+
+    def _save_state(self, state: Dict[str, Any]) -> None:
+        """Writes state atomically"""
+        with open(f"{self.state_path}.tmp", "w", encoding="utf-8") as file:
+            json.dump(state, file, indent=2)
+        os.replace(f"{self.state_path}.tmp", self.state_path)
+
+    def _payload(self, watermark: Optional[str]) -> Dict:
+        """Builds query parameters of documents at or past the watermark"""
+        lower = "*" if watermark is None else json.dumps(watermark)
+        payload: Dict[str, Any] = {
+            "q": self.query,
+            # range filter is added to, not replacing, the catalog filter
+            "fq": [
+                self.session.DEFAULT_FILTER,
+                f"{self.field}:[{lower} TO *]",
+            ],
+            "sort": f"{self.field} asc,id asc",
+            "rows": self.rows,
+        }
+        if self.response_fields is not None:
+            payload["fl"] = self.response_fields
+        return payload
+
+    @instrumented
+    def harvest(self, hooks: Optional[Dict] = None) -> Iterator[Dict]:
+        """
+        Iterates over documents changed since the last harvest
+
+        Args:
+            hooks:                  Requests library hook system that can be
+                                    used for signal event handling, see more at:
+                                    https://requests.readthedocs.io/en/master/user/advanced/#event-hooks
+
+        Yields:
+            documents as dictionaries, oldest first
+        """
+        state = self.load_state()
+        watermark = state["watermark"]
+        seen = set(state["ids"])
+
+        for data, _ in self.session._iter_cursor_pages(self._payload(watermark), hooks):
+            docs = data["response"]["docs"]
+            for doc in docs:
+                value = doc.get(self.field)
+                if value == watermark and doc["id"] in seen:
+                    continue
+                yield doc
+
+                if value != watermark:
+                    watermark = value
+                    seen = set()
+                seen.add(doc["id"])
+                state["harvested"] += 1
+
+            # page consumed by caller
+            if docs:
+                state["watermark"] = watermark
+                state["ids"] = sorted(seen)
+                self._save_state(state)
+
+        if not os.path.exists(self.state_path):
+            self._save_state(state)
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module provides normalization of ISBNs and UPCs to canonical forms
+and mapping of queried identifiers to matching documents
+"""
+
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+def _gtin_check_digit(digits: str) -> str:
+    """
+    Calculates check digit of a GTIN (EAN-13, UPC-A) from all digits but
+    the last one
+    """
+    total = sum(
+        int(digit) * (3 if position % 2 == 0 else 1)
+        for position, digit in enumerate(reversed(digits))
+    )
+    return str((10 - total % 10) % 10)
+
+
+def _isbn10_check_digit(digits: str) -> str:
+    """Calculates check digit of ISBN-10 from its first nine digits"""
+    total = sum(int(digit) * (10 - position) for position, digit in enumerate(digits))
+    check = (11 - total % 11) % 11
+    return "X" if check == 10 else str(check)
+
+
+def _strip_identifier(value: str) -> str:
+    """
+    Removes hyphens and qualifiers (for example "(paperback)") that follow
+    an identifier in MARC data
+    """
+    value = str(value).strip().replace("-", "")
+    if " " in value:
+        value = value.split(" ", 1)[0]
+    return value.upper()
+
+
+def normalize_isbn(isbn: str) -> Optional[str]:
+    """
+    Converts ISBN-10 or ISBN-13, with or without hyphens, to canonical ISBN-13
+
+    Args:
+        isbn:                   ISBN string
+
+    Returns:
+        ISBN-13 or `None` if ISBN is malformed or has incorrect check digit
+    """
+    isbn = _strip_identifier(isbn)
+    if len(isbn) == 10:
+        if not isbn[:9].isdigit() or _isbn10_check_digit(isbn[:9]) != isbn[9]:
+            return None
+        isbn = f"978{isbn[:9]}"
+        return isbn + _gtin_check_digit(isbn)
+    elif len(isbn) == 13:
+        if not isbn.isdigit() or _gtin_check_digit(isbn[:12]) != isbn[12]:
+            return None
+        return isbn
+    return None
+
+
+def normalize_upc(upc: str) -> Optional[str]:
+    """
+    Converts UPC to canonical 12-digit UPC-A form; EAN-13 codes starting with
+    "0" are UPC-A codes, other EAN-13 codes are returned unchanged
+
+    Args:
+        upc:                    UPC or EAN-13 string
+
+    Returns:
+        UPC-A or EAN-13 or `None` if UPC is malformed or has incorrect check digit
+    """
+    upc = _strip_identifier(upc)
+    if len(upc) == 13 and upc.startswith("0"):
+        upc = upc[1:]
+    if len(upc) not in (12, 13) or not upc.isdigit():
+        return None
+    if _gtin_check_digit(upc[:-1]) != upc[-1]:
+        return None
+    return upc
+
+
+def isbn_variants(isbn13: str) -> List[str]:
+    """
+    Returns forms of canonical ISBN-13 that may be indexed by BPL Solr:
+    ISBN-13 and, for 978 prefix, ISBN-10
+    """
+    if not isbn13.startswith("978"):
+        return [isbn13]
+    return [isbn13, isbn13[3:12] + _isbn10_check_digit(isbn13[3:12])]
+
+
+def upc_variants(upc: str) -> List[str]:
+    """
+    Returns forms of canonical UPC that may be indexed by BPL Solr:
+    UPC-A and its EAN-13 form
+    """
+    if len(upc) == 12:
+        return [upc, f"0{upc}"]
+    return [upc]
+
+
+def normalize_identifiers(
+    keywords: Iterable[str], normalizer: Callable[[str], Optional[str]]
+) -> Tuple[Dict[str, str], List[str]]:
+    """
+    Normalizes identifiers
+
+    Args:
+        keywords:               identifiers as provided by the user
+        normalizer:             function returning canonical form of an identifier
+                                or `None` when identifier is invalid
+
+    Returns:
+        tuple of dictionary mapping each valid identifier to its canonical form,
+        and list of invalid identifiers
+    """
+    canonical: Dict[str, str] = {}
+    invalid: Dict[str, None] = {}
+    for keyword in keywords:
+        if keyword in canonical or keyword in invalid:
+            continue
+        normalized = normalizer(keyword)
+        if normalized is None:
+            invalid[keyword] = None
+        else:
+            canonical[keyword] = normalized
+    return canonical, list(invalid)
+
+
+def match_identifiers(
+    keywords: Iterable[str],
+    docs: Iterable[Dict],
+    field: str,
+    normalizer: Optional[Callable[[str], Optional[str]]] = None,
+) -> Dict[str, List[str]]:
+    """
+    Maps each identifier to ids of documents that include it in a field.
+    Documents are scanned once and their values looked up by canonical form,
+    so the cost is proportional to the number of identifiers plus documents.
+
+    Args:
+        keywords:               identifiers as provided by the user
+        docs:                   documents retrieved from BPL Solr
+        field:                  Solr field with identifiers, for example "isbn"
+        normalizer:             function returning canonical form of an identifier,
+                                for example `normalize_isbn`; when `None`
+                                identifiers must match exactly
+
+    Returns:
+        dictionary of identifiers and lists of matching document ids
+
+    Example:
+        response = session.search_isbns(isbns, normalize=True)
+        docs = response.json()["response"]["docs"]
+        matches = match_identifiers(isbns, docs, "isbn", normalize_isbn)
+    """
+    keywords = list(keywords)
+    if normalizer is None:
+        canonical = {keyword: keyword for keyword in keywords}
+    else:
+        canonical, _ = normalize_identifiers(keywords, normalizer)
+
+    found: Dict[str, List[str]] = {value: [] for value in canonical.values()}
+    for doc in docs:
+        values = doc.get(field, [])
+        if not isinstance(values, list):
+            values = [values]
+        for value in values:
+            if normalizer is not None:
+                value = normalizer(value)
+            ids = found.get(value)
+            if ids is not None and doc["id"] not in ids:
+                ids.append(doc["id"])
+
+    # invalid identifiers have no canonical form and match nothing
+    return {
+        keyword: list(found[canonical[keyword]]) if keyword in canonical else []
+        for keyword in keywords
+    }
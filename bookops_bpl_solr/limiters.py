@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module provides client-side rate and concurrency limiting of requests
+to BPL Solr
+"""
+
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter. Tokens are added at `rate` per second
+    up to `burst` tokens; each request takes one token and waits when
+    the bucket is empty.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        """
+        Args:
+            rate:                   number of requests allowed per second
+            burst:                  maximum number of requests that can be sent
+                                    at once after a period of inactivity;
+                                    defaults to 1
+        """
+        self.rate = rate
+        self.burst = burst or 1
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Takes a token from the bucket, waiting until one is available
+
+        Returns:
+            number of seconds spent waiting
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            # negative balance reserves a future token for this caller
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+# HTTP statuses of responses signaling that BPL Solr is overloaded
+OVERLOAD_STATUSES = (429, 503)
+
+
+class AdaptiveLimiter:
+    """
+    Thread-safe limit of requests in flight adjusted to observed capacity of
+    BPL Solr (additive increase, multiplicative decrease). While requests keep
+    the limit busy and their latency and QTime stay healthy, the limit grows
+    by one per `limit` completed requests. It is multiplied by `backoff_ratio`
+    when a request times out or receives 429 or 503 response, when QTime
+    exceeds `max_qtime`, or when the short-term average latency rises above
+    `latency_tolerance` times the long-term one. Only requests sent after
+    the previous decrease can decrease the limit again, so a single overload
+    is not counted once per request in flight.
+
+    Threads wait for a free slot with `acquire`, asyncio tasks poll
+    `try_acquire`; both report outcome of each request with `release`.
+    Releases wake up waiting threads only; `AsyncSolrSession` wakes its own
+    tasks, so a limiter shared with a threaded session would leave async tasks
+    waiting until a request of their session completes. Share a limiter only
+    among sessions of one kind.
+    """
+
+    # weights of the latest response time in short and long-term averages
+    SHORT_DECAY = 0.2
+    LONG_DECAY = 0.02
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        latency_tolerance: float = 2.0,
+        max_qtime: Optional[float] = None,
+        backoff_ratio: float = 0.5,
+    ):
+        """
+        Args:
+            initial_limit:          number of requests in flight allowed
+                                    at start
+            min_limit:              lowest limit the limiter backs off to
+            max_limit:              highest limit the limiter grows to
+            latency_tolerance:      ratio of short to long-term average
+                                    latency considered overload
+            max_qtime:              Solr's QTime in seconds considered
+                                    overload; not checked by default
+            backoff_ratio:          factor the limit is multiplied by
+                                    on overload
+        """
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError(
+                "Limits must satisfy 1 <= min_limit <= initial_limit <= max_limit."
+            )
+        if latency_tolerance <= 1:
+            raise ValueError("latency_tolerance must be greater than 1.")
+        if not 0 < backoff_ratio < 1:
+            raise ValueError("backoff_ratio must be between 0 and 1.")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_tolerance = latency_tolerance
+        self.max_qtime = max_qtime
+        self.backoff_ratio = backoff_ratio
+        self.inflight = 0
+        self.decreases = 0
+        self._limit = float(initial_limit)
+        self._short_latency: Optional[float] = None
+        self._long_latency: Optional[float] = None
+        self._decreased_at = float("-inf")
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """Number of requests currently allowed in flight"""
+        return int(self._limit)
+
+    def try_acquire(self) -> bool:
+        """
+        Takes a slot for a request if the limit allows it
+
+        Returns:
+            True if the slot was taken
+        """
+        with self._condition:
+            if self.inflight >= int(self._limit):
+                return False
+            self.inflight += 1
+            return True
+
+    def acquire(self) -> None:
+        """Takes a slot for a request, waiting until one is free"""
+        with self._condition:
+            while self.inflight >= int(self._limit):
+                self._condition.wait()
+            self.inflight += 1
+
+    def cancel(self) -> None:
+        """Frees slot of a request that was not sent, without adjusting the limit"""
+        with self._condition:
+            self.inflight -= 1
+            self._condition.notify_all()
+
+    def _latency_rising(self, seconds: float) -> bool:
+        """Updates latency averages and compares them"""
+        if self._short_latency is None or self._long_latency is None:
+            self._short_latency = self._long_latency = seconds
+            return False
+        self._short_latency += self.SHORT_DECAY * (seconds - self._short_latency)
+        self._long_latency += self.LONG_DECAY * (seconds - self._long_latency)
+        return self._short_latency > self.latency_tolerance * self._long_latency
+
+    def release(
+        self, seconds: float, overloaded: bool = False, qtime: Optional[float] = None
+    ) -> None:
+        """
+        Frees slot of a completed request and adjusts the limit
+
+        Args:
+            seconds:                duration of the request
+            overloaded:             True if the request timed out or received
+                                    one of `OVERLOAD_STATUSES`
+            qtime:                  Solr's QTime of the response in seconds
+        """
+        with self._condition:
+            self.inflight -= 1
+            if not overloaded:
+                overloaded = self._latency_rising(seconds) or (
+                    self.max_qtime is not None
+                    and qtime is not None
+                    and qtime > self.max_qtime
+                )
+            now = time.monotonic()
+            if overloaded:
+                # requests sent before the previous decrease saw the same overload
+                if now - seconds >= self._decreased_at:
+                    self._limit = max(self.min_limit, self._limit * self.backoff_ratio)
+                    self._decreased_at = now
+                    self.decreases += 1
+            elif (self.inflight + 1) * 2 >= self._limit:
+                # grows only when the limit, not the caller, bounds concurrency
+                self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+            self._condition.notify_all()
@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module provides collection of SolrSession request metrics and their
+export as a dictionary or in Prometheus text exposition format
+"""
+
+from contextvars import ContextVar, Token
+import functools
+import inspect
+import re
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DEFAULT_METHOD = "_send_request"
+QTIME_PATTERN = re.compile(rb'"QTime"\s*:\s*(\d+)')
+
+# name of the session method that sends current request
+current_method: ContextVar[str] = ContextVar("current_method", default=DEFAULT_METHOD)
+
+
+def _set_method(name: str) -> Optional[Token]:
+    """Sets method label unless already set by an outer method"""
+    if current_method.get() != DEFAULT_METHOD:
+        return None
+    return current_method.set(name)
+
+
+def instrumented(fn: Callable) -> Callable:
+    """
+    Labels metrics of requests sent by decorated session method with its name.
+    Requests sent by methods called by another instrumented method are labeled
+    with the name of the outer method.
+    """
+    name = fn.__name__
+
+    if inspect.isgeneratorfunction(fn):
+
+        @functools.wraps(fn)
+        def generator_wrapper(*args: Any, **kwargs: Any) -> Iterator:
+            generator = fn(*args, **kwargs)
+            # label is set only while the generator runs, not while caller
+            # handles yielded items
+            while True:
+                token = _set_method(name)
+                try:
+                    item = next(generator)
+                except StopIteration:
+                    return
+                finally:
+                    if token is not None:
+                        current_method.reset(token)
+                yield item
+
+        return generator_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        token = _set_method(name)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            if token is not None:
+                current_method.reset(token)
+
+    return wrapper
+
+
+def parse_qtime(content: bytes) -> Optional[float]:
+    """
+    Extracts server-side query time from a Solr response header without
+    decoding the whole body
+
+    Args:
+        content:                response body
+
+    Returns:
+        QTime in seconds or `None` if not present
+    """
+    match = QTIME_PATTERN.search(content, 0, 512)
+    if match is None:
+        return None
+    return int(match.group(1)) / 1000
+
+
+class _MethodStats:
+    """Metrics of requests sent by one session method"""
+
+    __slots__ = (
+        "requests",
+        "statuses",
+        "errors",
+        "retries",
+        "latency_buckets",
+        "latency_sum",
+        "qtime_count",
+        "qtime_sum",
+        "qtime_wall_sum",
+        "response_bytes",
+    )
+
+    def __init__(self, buckets: int):
+        self.requests = 0
+        self.statuses: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.retries = 0
+        self.latency_buckets = [0] * buckets
+        self.latency_sum = 0.0
+        self.qtime_count = 0
+        self.qtime_sum = 0.0
+        self.qtime_wall_sum = 0.0
+        self.response_bytes = 0
+
+
+class SessionMetrics:
+    """
+    Thread-safe collector of request metrics of `SolrSession`, labeled by
+    the session method that sent the request. Records request counts by HTTP
+    status, wall-clock latency histogram, server `QTime` compared to wall-clock
+    time of the same requests, downloaded bytes, errors by class, and retries.
+
+    Example:
+        metrics = SessionMetrics()
+        with SolrSession(
+            authorization="your_client_key", endpoint="solr_endpoint", metrics=metrics
+        ) as session:
+            session.search_isbns(["9780810984912"])
+        print(metrics.snapshot())
+        print(metrics.to_prometheus())
+    """
+
+    def __init__(
+        self,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        prefix: str = "bookops_bpl_solr",
+    ):
+        """
+        Args:
+            buckets:                upper bounds of latency histogram buckets
+                                    in seconds
+            prefix:                 prefix of metric names in Prometheus format
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.prefix = prefix
+        self._methods: Dict[str, _MethodStats] = {}
+        self._lock = threading.Lock()
+
+    def _stats(self, method: str) -> _MethodStats:
+        """Returns metrics of a method; must be called with the lock acquired"""
+        stats = self._methods.get(method)
+        if stats is None:
+            stats = self._methods[method] = _MethodStats(len(self.buckets))
+        return stats
+
+    def observe_request(
+        self,
+        method: str,
+        seconds: float,
+        status_code: int,
+        response_bytes: Optional[int] = None,
+        qtime: Optional[float] = None,
+    ) -> None:
+        """
+        Records a completed request
+
+        Args:
+            method:                 name of the session method
+            seconds:                wall-clock duration of the request
+            status_code:            HTTP status code of the response
+            response_bytes:         size of the response body
+            qtime:                  server-side query time in seconds
+        """
+        with self._lock:
+            stats = self._stats(method)
+            stats.requests += 1
+            status = str(status_code)
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            for position, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    stats.latency_buckets[position] += 1
+                    break
+            stats.latency_sum += seconds
+            if response_bytes is not None:
+                stats.response_bytes += response_bytes
+            if qtime is not None:
+                stats.qtime_count += 1
+                stats.qtime_sum += qtime
+                stats.qtime_wall_sum += seconds
+
+    def observe_error(self, method: str, error: BaseException) -> None:
+        """
+        Records a request that failed without response
+
+        Args:
+            method:                 name of the session method
+            error:                  raised exception
+        """
+        name = type(error).__name__
+        with self._lock:
+            stats = self._stats(method)
+            stats.errors[name] = stats.errors.get(name, 0) + 1
+
+    def observe_retry(self, method: str) -> None:
+        """
+        Records a retried request
+
+        Args:
+            method:                 name of the session method
+        """
+        with self._lock:
+            self._stats(method).retries += 1
+
+    def reset(self) -> None:
+        """Discards all recorded metrics"""
+        with self._lock:
+            self._methods.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns recorded metrics
+
+        Returns:
+            dictionary of session method names and their metrics; latency buckets
+            are cumulative and keyed by their upper bound
+        """
+        snapshot = {}
+        with self._lock:
+            for method, stats in sorted(self._methods.items()):
+                snapshot[method] = {
+                    "requests": stats.requests,
+                    "statuses": dict(stats.statuses),
+                    "errors": dict(stats.errors),
+                    "retries": stats.retries,
+                    "latency": {
+                        "count": stats.requests,
+                        "sum": stats.latency_sum,
+                        "buckets": dict(self._cumulative_buckets(stats)),
+                    },
+                    "qtime": {
+                        "count": stats.qtime_count,
+                        "sum": stats.qtime_sum,
+                        "wall_sum": stats.qtime_wall_sum,
+                    },
+                    "response_bytes": stats.response_bytes,
+                }
+        return snapshot
+
+    def _cumulative_buckets(self, stats: _MethodStats) -> List[Tuple[str, int]]:
+        """Returns cumulative latency bucket counts including "+Inf" bucket"""
+        buckets = []
+        total = 0
+        for bound, count in zip(self.buckets, stats.latency_buckets):
+            total += count
+            buckets.append((repr(float(bound)), total))
+        buckets.append(("+Inf", stats.requests))
+        return buckets
+
+    def to_prometheus(self) -> str:
+        """
+        Formats recorded metrics in Prometheus text exposition format
+
+        Returns:
+            metrics as string
+        """
+        families = {
+            "requests": (
+                "requests_total",
+                "counter",
+                "Requests that received a response by HTTP status.",
+            ),
+            "latency": (
+                "request_duration_seconds",
+                "histogram",
+                "Wall-clock duration of requests.",
+            ),
+            "qtime": (
+                "qtime_seconds",
+                "summary",
+                "Server-side query time (QTime) reported by Solr.",
+            ),
+            "wall": (
+                "qtime_wall_seconds",
+                "summary",
+                "Wall-clock duration of requests that reported QTime.",
+            ),
+            "bytes": (
+                "response_bytes_total",
+                "counter",
+                "Bytes of downloaded response bodies.",
+            ),
+            "errors": (
+                "errors_total",
+                "counter",
+                "Requests that failed without response by error class.",
+            ),
+            "retries": ("retries_total", "counter", "Retried requests."),
+        }
+        samples: Dict[str, List[str]] = {key: [] for key in families}
+        names = {key: f"{self.prefix}_{family[0]}" for key, family in families.items()}
+
+        for method, data in self.snapshot().items():
+            label = f'method="{method}"'
+            for status, count in sorted(data["statuses"].items()):
+                samples["requests"].append(
+                    f'{names["requests"]}{{{label},status="{status}"}} {count}'
+                )
+            for bound, count in data["latency"]["buckets"].items():
+                samples["latency"].append(
+                    f'{names["latency"]}_bucket{{{label},le="{bound}"}} {count}'
+                )
+            for suffix in ("sum", "count"):
+                samples["latency"].append(
+                    f'{names["latency"]}_{suffix}{{{label}}} {data["latency"][suffix]}'
+                )
+            for key, field in (("qtime", "sum"), ("wall", "wall_sum")):
+                samples[key].append(
+                    f'{names[key]}_sum{{{label}}} {data["qtime"][field]}'
+                )
+                samples[key].append(
+                    f'{names[key]}_count{{{label}}} {data["qtime"]["count"]}'
+                )
+            samples["bytes"].append(
+                f'{names["bytes"]}{{{label}}} {data["response_bytes"]}'
+            )
+            for error, count in sorted(data["errors"].items()):
+                samples["errors"].append(
+                    f'{names["errors"]}{{{label},error="{error}"}} {count}'
+                )
+            samples["retries"].append(
+                f'{names["retries"]}{{{label}}} {data["retries"]}'
+            )
+
+        lines = []
+        for key, (_, metric_type, description) in families.items():
+            lines.append(f"# HELP {names[key]} {description}")
+            lines.append(f"# TYPE {names[key]} {metric_type}")
+            lines.extend(samples[key])
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module provides compact typed representation of BPL Solr responses
+"""
+
+import codecs
+import json
+import re
+from typing import Any, Dict, Iterator, List, Optional
+
+from .decoders import JSON_DECODERS, get_decoder
+from .session import BookopsSolrError
+
+
+DOCS_START_PATTERN = re.compile(r'"docs"\s*:\s*\[')
+WHITESPACE_AND_COMMAS = " \t\n\r,"
+
+
+class SolrDoc:
+    """
+    Memory-efficient representation of a BPL Solr document. Fields listed in
+    `SolrSession.DEFAULT_RESPONSE_FIELDS` are stored in slots and accessible as
+    attributes (missing fields are `None`); any other returned fields are
+    accessible with `doc["field"]` or `doc.get("field")`.
+    """
+
+    __slots__ = (
+        "id",
+        "title",
+        "author_raw",
+        "publishYear",
+        "created_date",
+        "material_type",
+        "call_number",
+        "isbn",
+        "language",
+        "eprovider",
+        "econtrolnumber",
+        "eurl",
+        "digital_avail_type",
+        "digital_copies_owned",
+        "_extra",
+    )
+
+    id: str
+    title: Optional[str]
+    author_raw: Optional[str]
+    publishYear: Optional[int]
+    created_date: Optional[str]
+    material_type: Optional[str]
+    call_number: Optional[str]
+    isbn: Optional[List[str]]
+    language: Optional[List[str]]
+    eprovider: Optional[str]
+    econtrolnumber: Optional[str]
+    eurl: Optional[str]
+    digital_avail_type: Optional[str]
+    digital_copies_owned: Optional[int]
+    _extra: Optional[Dict[str, Any]]
+
+    FIELDS = __slots__[:-1]
+
+    def __init__(self, data: Dict[str, Any]):
+        """
+        Args:
+            data:                   document as decoded from JSON response
+        """
+        extra = None
+        for field in self.FIELDS:
+            setattr(self, field, None)
+        for field, value in data.items():
+            if field in self.FIELDS:
+                setattr(self, field, value)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[field] = value
+        self._extra = extra
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, SolrDoc):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __getitem__(self, field: str) -> Any:
+        if field in self.FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                return value
+        elif self._extra is not None and field in self._extra:
+            return self._extra[field]
+        raise KeyError(field)
+
+    def __repr__(self) -> str:
+        return f"SolrDoc(id={self.id!r}, title={self.title!r})"
+
+    def get(self, field: str, default: Any = None) -> Any:
+        """Returns value of any field or `default` if not present"""
+        try:
+            return self[field]
+        except KeyError:
+            return default
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns document as a dictionary skipping missing fields"""
+        data = {
+            field: getattr(self, field)
+            for field in self.FIELDS
+            if getattr(self, field) is not None
+        }
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+
+class SolrResult:
+    """
+    Result of a BPL Solr query. Response body is decoded only when any of
+    the attributes is accessed for the first time, and documents are converted
+    to `SolrDoc` instances when `docs` are first accessed.
+
+    Example:
+        result = session.result(session.search_isbns(["9780810984912"]))
+        print(result.numFound)
+        for doc in result:
+            print(doc.id, doc.isbn)
+    """
+
+    __slots__ = ("_response", "_data", "_docs", "_loads")
+
+    def __init__(self, response: Any, json_decoder: str = "auto"):
+        """
+        Args:
+            response:               `requests.Response` (or `httpx.Response`)
+                                    instance returned by a session query method
+            json_decoder:           'auto' (fastest installed), 'json',
+                                    'orjson' or 'msgspec'; `session.result()`
+                                    creates results decoded with the session's
+                                    decoder
+        """
+        if response.status_code != 200:
+            raise BookopsSolrError(
+                f"BPL Solr returned unexpected HTTP status: {response.status_code}."
+            )
+        if json_decoder not in JSON_DECODERS:
+            raise BookopsSolrError("Invalid json_decoder argument.")
+        self._loads = get_decoder(json_decoder)
+        self._response = response
+        self._data: Optional[Dict] = None
+        self._docs: Optional[List[SolrDoc]] = None
+
+    def __iter__(self) -> Iterator[SolrDoc]:
+        return iter(self.docs)
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def __repr__(self) -> str:
+        return f"SolrResult(numFound={self.numFound})"
+
+    @property
+    def data(self) -> Dict:
+        """
+        Decoded response body; documents are removed from it once converted
+        to `SolrDoc` instances
+        """
+        if self._data is None:
+            try:
+                self._data = self._loads(self._response.content)
+            except ValueError:
+                raise BookopsSolrError("Unable to decode BPL Solr response.")
+            # body is no longer needed once decoded
+            self._response = None
+        return self._data
+
+    @property
+    def docs(self) -> List[SolrDoc]:
+        """Retrieved documents as `SolrDoc` instances"""
+        if self._docs is None:
+            raw_docs = self.data["response"]["docs"]
+            self._docs = [SolrDoc(doc) for doc in raw_docs]
+            # release decoded dictionaries of documents
+            self.data["response"]["docs"] = []
+        return self._docs
+
+    @property
+    def numFound(self) -> int:
+        """Total number of documents matching the query"""
+        return self.data["response"]["numFound"]
+
+    @property
+    def start(self) -> int:
+        """Offset of the first retrieved document"""
+        return self.data["response"].get("start", 0)
+
+    @property
+    def QTime(self) -> Optional[int]:
+        """
+        Server-side query time in milliseconds, or `None` if response header
+        was not returned
+        """
+        return self.data.get("responseHeader", {}).get("QTime")
+
+    @property
+    def nextCursorMark(self) -> Optional[str]:
+        """Cursor of the next page of results when paging with `cursorMark`"""
+        return self.data.get("nextCursorMark")
+
+
+def iter_docs(
+    response: Any, chunk_size: int = 65536, json_decoder: str = "auto"
+) -> Iterator[Dict]:
+    """
+    Parses documents incrementally from a response body as it is downloaded.
+    Only the document being parsed is kept in memory, so it is best used with
+    responses of requests sent with `stream=True`. Bodies that were already
+    downloaded are decoded at once with `json_decoder`; incremental parsing
+    always uses the standard library decoder.
+
+    Args:
+        response:               `requests.Response` instance
+        chunk_size:             number of bytes read from the body at a time
+        json_decoder:           'auto' (fastest installed), 'json', 'orjson'
+                                or 'msgspec' decoder of downloaded bodies;
+                                `SolrSession.iter_docs()` uses the session's
+                                decoder
+
+    Yields:
+        documents as dictionaries
+
+    Example:
+        response = session.find_expired_econtent(rows=100, stream=True)
+        for doc in session.iter_docs(response):
+            print(doc["id"])
+    """
+    if response.status_code != 200:
+        raise BookopsSolrError(
+            f"BPL Solr returned unexpected HTTP status: {response.status_code}."
+        )
+
+    # body already downloaded, or rebuilt from a cache without a raw stream
+    if isinstance(getattr(response, "_content", None), bytes):
+        yield from _downloaded_docs(response, json_decoder)
+        return
+
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    in_docs = False
+
+    try:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            buffer += text_decoder.decode(chunk)
+
+            if not in_docs:
+                match = DOCS_START_PATTERN.search(buffer)
+                if match is None:
+                    # keep only enough text to match the pattern split across chunks
+                    buffer = buffer[-32:]
+                    continue
+                buffer = buffer[match.end() :]
+                in_docs = True
+
+            pos = 0
+            while True:
+                while pos < len(buffer) and buffer[pos] in WHITESPACE_AND_COMMAS:
+                    pos += 1
+                if pos == len(buffer):
+                    break
+                if buffer[pos] == "]":
+                    return
+                try:
+                    doc, pos = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    # document is not complete yet
+                    break
+                yield doc
+            buffer = buffer[pos:]
+    finally:
+        response.close()
+
+    if not in_docs:
+        raise BookopsSolrError("BPL Solr response does not include documents.")
+    raise BookopsSolrError("Incomplete BPL Solr response.")
+
+
+def _downloaded_docs(response: Any, json_decoder: str) -> Iterator[Dict]:
+    """Decodes documents of an already downloaded response body"""
+    if json_decoder not in JSON_DECODERS:
+        raise BookopsSolrError("Invalid json_decoder argument.")
+    try:
+        data = get_decoder(json_decoder)(response.content)
+    except ValueError:
+        raise BookopsSolrError("Unable to decode BPL Solr response.")
+    try:
+        docs = data["response"]["docs"]
+    except (KeyError, TypeError):
+        raise BookopsSolrError("BPL Solr response does not include documents.")
+    yield from docs
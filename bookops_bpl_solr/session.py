@@ -4,22 +4,250 @@
 This module provides SolrSession class for requests to BPL Solr platform
 """
 
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+import csv
+from email.utils import parsedate_to_datetime
+import functools
+import json
+import random
 import sys
-from typing import Dict, List, Optional, Tuple, Union
+import threading
+import time
+from urllib.parse import urlencode
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    TYPE_CHECKING,
+    Tuple,
+    Union,
+)
 
 import requests
+from requests.adapters import (
+    DEFAULT_POOLBLOCK,
+    DEFAULT_POOLSIZE,
+    BaseAdapter,
+    HTTPAdapter,
+)
+from urllib3.util.request import ACCEPT_ENCODING
 
 
 from . import __title__, __version__
+from .balancing import STRATEGIES, Endpoint, EndpointPool
+from .cache import BaseCache, cache_key
+from .coalescing import SingleFlight
+from .columnar import (
+    ARRAY_TYPES,
+    MULTIVALUED_FIELDS,
+    NUMERIC_FIELDS,
+    column_length,
+    csv_params,
+    last_value,
+    parse_csv_columns,
+)
+from .decoders import JSON_DECODERS, available_decoders, resolve_decoder
+from .identifiers import (
+    isbn_variants,
+    match_identifiers,
+    normalize_identifiers,
+    normalize_isbn,
+    normalize_upc,
+    upc_variants,
+)
+from .limiters import OVERLOAD_STATUSES, AdaptiveLimiter, TokenBucket
+from .metrics import SessionMetrics, current_method, instrumented, parse_qtime
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .results import SolrResult
 
 
 class BookopsSolrError(Exception):
     pass
 
 
-class SolrSession(requests.Session):
+@functools.lru_cache(maxsize=16)
+def _join_fields(fields: Tuple[str, ...]) -> str:
+    """Returns `fl` parameter of response fields, joined once per fields list"""
+    return ",".join(fields)
+
+
+class MapResult(NamedTuple):
     """
-    A session class that wraps requests to BPL Solr platform.
+    Outcome of a single request run by `SolrSession.map`. Exactly one of
+    `response` and `error` is set.
+    """
+
+    position: int
+    request: Tuple
+    response: Any
+    error: Optional[Exception]
+
+
+class SolrQuery:
+    """
+    Builder of BPL Solr query parameters. Each filter is sent as a separate
+    `fq` parameter, so stable filters (`ss_type:catalog`, `material_type:Book`)
+    are cached independently by Solr's filterCache and reused across queries
+    combining them differently, while one-off filters (lists of identifiers)
+    can be excluded from the cache with `cache=False`. Instances can be passed
+    to `SolrSession._send_request()`, `SolrSession.iter_query()` and their
+    `AsyncSolrSession` counterparts in place of a payload dictionary.
+
+    Example:
+        query = (
+            SolrQuery("title:civil AND war", rows=20)
+            .filter("material_type:Book", "language:English")
+            .fields("id", "title", "author_raw")
+        )
+        response = session._send_request(query)
+    """
+
+    def __init__(
+        self,
+        q: str = "*:*",
+        rows: int = 10,
+        start: int = 0,
+        default_filter: bool = True,
+    ):
+        """
+        Args:
+            q:                      main (scored) query
+            rows:                   number of retrieved documents
+            start:                  offset of the first retrieved document
+            default_filter:         when True results are limited to catalog
+                                    records (`ss_type:catalog` filter)
+        """
+        if not isinstance(q, str) or not q:
+            raise BookopsSolrError("Invalid query argument.")
+        if not isinstance(rows, int) or not isinstance(start, int):
+            raise BookopsSolrError("Invalid type of arguments passed.")
+
+        self.q = q
+        self.rows = rows
+        self.start = start
+        self.filters: List[str] = []
+        self.fl: Optional[str] = None
+        self.params: Dict[str, Any] = {}
+        if default_filter:
+            self.filters.append(_SolrSessionBase.DEFAULT_FILTER)
+
+    def __repr__(self) -> str:
+        return f"SolrQuery({self.to_payload()!r})"
+
+    def filter(self, *queries: str, cache: bool = True) -> "SolrQuery":
+        """
+        Adds filter queries, each as a separate `fq` parameter; filters already
+        added are skipped
+
+        Args:
+            queries:                filter queries
+            cache:                  when False filters are not stored in Solr's
+                                    filterCache, which is best for filters
+                                    unlikely to be repeated
+
+        Returns:
+            the query, to allow chaining calls
+        """
+        for query in queries:
+            if not isinstance(query, str) or not query:
+                raise BookopsSolrError("Invalid filter query.")
+            if not cache:
+                query = f"{{!cache=false}}{query}"
+            if query not in self.filters:
+                self.filters.append(query)
+        return self
+
+    def filter_terms(
+        self, field: str, values: Iterable[str], cache: bool = False
+    ) -> "SolrQuery":
+        """
+        Adds a filter matching any of the values of a field using Solr's terms
+        query parser; not cached by default
+
+        Args:
+            field:                  field name
+            values:                 values to match
+            cache:                  when True the filter is stored in Solr's
+                                    filterCache
+
+        Returns:
+            the query, to allow chaining calls
+        """
+        values = [str(value) for value in values]
+        if not values:
+            raise BookopsSolrError("Missing values of terms filter.")
+        local_params = f"terms f={field}" if cache else f"terms f={field} cache=false"
+        self.filters.append(f"{{!{local_params}}}{','.join(values)}")
+        return self
+
+    def fields(self, *fields: str) -> "SolrQuery":
+        """
+        Sets fields returned in the response; the `fl` parameter is joined once
+        here, not on each request
+
+        Args:
+            fields:                 field names
+
+        Returns:
+            the query, to allow chaining calls
+        """
+        self.fl = ",".join(fields) if fields else None
+        return self
+
+    def sort(self, sort: str) -> "SolrQuery":
+        """
+        Sets sort order of results, for example "publishYear desc"
+
+        Returns:
+            the query, to allow chaining calls
+        """
+        self.params["sort"] = sort
+        return self
+
+    def param(self, name: str, value: Any) -> "SolrQuery":
+        """
+        Sets any other Solr parameter; `None` removes it
+
+        Returns:
+            the query, to allow chaining calls
+        """
+        if value is None:
+            self.params.pop(name, None)
+        else:
+            self.params[name] = value
+        return self
+
+    def to_payload(self) -> Dict:
+        """
+        Returns query parameters as a payload dictionary. A single filter is
+        returned as a string, more filters as a list of repeated `fq` values.
+        """
+        payload: Dict[str, Any] = {"q": self.q, "rows": self.rows}
+        if self.start:
+            payload["start"] = self.start
+        if len(self.filters) == 1:
+            payload["fq"] = self.filters[0]
+        else:
+            # empty list sends no filter and overrides the default one
+            payload["fq"] = list(self.filters)
+        if self.fl is not None:
+            payload["fl"] = self.fl
+        payload.update(self.params)
+        return payload
+
+
+class _SolrSessionBase:
+    """
+    Validation and payload building shared by sync and async BPL Solr sessions.
     """
 
     DEFAULT_RESPONSE_FIELDS = [
@@ -39,51 +267,171 @@ class SolrSession(requests.Session):
         "digital_copies_owned",
     ]
 
-    def __init__(
+    # limits applied when many keywords are packed into a single query;
+    # they keep requests below Solr's maxBooleanClauses (1024 by default)
+    # and well under common URL length limits of web servers
+    MAX_QUERY_CLAUSES = 500
+    MAX_QUERY_LENGTH = 4000
+
+    # requests with longer encoded query strings are sent as form-encoded POST
+    MAX_URL_LENGTH = 6000
+
+    # the terms query parser is not limited by maxBooleanClauses, so identifier
+    # lookups using it can be packed in larger batches
+    MAX_TERMS_KEYWORDS = 5000
+
+    QUERY_PARSERS = ("lucene", "terms")
+
+    # filter applied by default to retrieve only catalog records
+    DEFAULT_FILTER = "ss_type:catalog"
+
+    # Overdrive e-content library has no longer access to
+    EXPIRED_ECONTENT_QUERY = "digital_copies_owned:0 AND digital_avail_type:Normal"
+
+    # HTTP statuses of responses indicating a failing replica; requests
+    # receiving them are sent again to another endpoint when there is one
+    FAILOVER_STATUSES = (500, 502, 503, 504)
+
+    def _bibNo_payload(
         self,
-        authorization: str,
-        endpoint: str,
-        agent: Optional[str] = None,
-        timeout: Union[int, float, Tuple[int, int], Tuple[float, float], None] = (
-            3,
-            3,
-        ),
-    ):
+        keyword: Union[str, int],
+        default_response_fields: bool,
+        response_fields: Union[str, List[str], None],
+    ) -> Dict:
+        """Builds query parameters for a search by Sierra bib number"""
+        if not keyword:
+            raise BookopsSolrError("Missing keyword argument.")
+
+        # verify and prep bib number
+        keyword = self._prep_sierra_number(keyword)
+
+        # determine if pass default, custom, or allow all fields in response
+        response_fields = self._determine_response_fields(
+            default_response_fields, response_fields
+        )
+
+        payload = {"q": f"id:{keyword}", "fl": response_fields}
+
+        return payload
+
+    def _batch_keywords(
+        self,
+        keywords: List[str],
+        max_keywords: Optional[int] = None,
+        max_length: Optional[int] = None,
+    ) -> Iterator[List[str]]:
         """
+        Splits keywords into batches that can be safely combined into one
+        boolean query. Each batch has no more than `max_keywords` keywords
+        and their joined length does not exceed `max_length` characters.
+
         Args:
-            authorization:          Client-Key
-            endpoint:               endpoint's URL
-            agent:                  "User-agent" parameter to be passed in the request
-                                    header; usage strongly encouraged
-            timeout:                how long to wait for server to send data before
-                                    giving up; default value is 3 seconds
+            keywords:               list of keywords to split
+            max_keywords:           maximum number of keywords in a batch;
+                                    defaults to `MAX_QUERY_CLAUSES`
+            max_length:             maximum joined length of keywords in a batch;
+                                    defaults to `MAX_QUERY_LENGTH`
+
+        Yields:
+            list of keywords
         """
-        super().__init__()
-
-        self.authorization = authorization
-        self.endpoint = endpoint
-        self.agent = agent
-        self.timeout = timeout
-
-        # validate passed arguments
-        if not isinstance(self.authorization, str) or not self.authorization:
+        if max_keywords is None:
+            max_keywords = self.MAX_QUERY_CLAUSES
+        if max_length is None:
+            max_length = self.MAX_QUERY_LENGTH
+
+        batch: List[str] = []
+        batch_length = 0
+        for keyword in keywords:
+            # each keyword is joined with " OR " (4 characters)
+            keyword_length = len(keyword) + 4
+            if batch and (
+                len(batch) >= max_keywords or batch_length + keyword_length > max_length
+            ):
+                yield batch
+                batch = []
+                batch_length = 0
+            batch.append(keyword)
+            batch_length += keyword_length
+        if batch:
+            yield batch
+
+    def _columns_payload(
+        self, payload: Union[Dict, SolrQuery], array_type: str
+    ) -> Dict:
+        """
+        Builds query parameters of a request for CSV response; default
+        response fields are requested when `fl` is not given
+        """
+        if isinstance(payload, SolrQuery):
+            payload = payload.to_payload()
+        if not isinstance(payload, dict) or not payload:
+            raise BookopsSolrError("Missing or invalid payload argument.")
+        if array_type not in ARRAY_TYPES:
             raise BookopsSolrError(
-                "Invalid authorization. Argument must be a Client-Key string."
+                "Invalid array_type argument. Use 'list', 'numpy' or 'arrow'."
             )
+        payload = {**payload, **csv_params()}
+        if not payload.get("fl"):
+            payload["fl"] = self._default_fl()
+        else:
+            payload["fl"] = self._prep_response_fields(payload["fl"])
+        return payload
 
-        if not isinstance(self.endpoint, str) or not self.endpoint:
-            raise BookopsSolrError(
-                "Invalid endpoint argument. It must be a Client-Key string."
-            )
+    def _controlNo_payload(
+        self,
+        keyword: str,
+        default_response_fields: bool,
+        response_fields: Union[str, List[str], None],
+    ) -> Dict:
+        """Builds query parameters for a search by control number (001 MARC tag)"""
+        if not isinstance(keyword, str):
+            raise BookopsSolrError("Control number keyword must be a string.")
 
-        if not self.agent:
-            self.agent = f"{__title__}/{__version__}"
-        elif not isinstance(self.agent, str):
-            raise BookopsSolrError("Invalid type of an agent argument.")
+        if not keyword:
+            raise BookopsSolrError("Provided empty string as control number keyword.")
 
-        # set session headers
-        self.headers.update({"Client-Key": self.authorization})
-        self.headers.update({"User-Agent": self.agent})
+        # determine if pass default, custom, or allow all fields in response
+        response_fields = self._determine_response_fields(
+            default_response_fields, response_fields
+        )
+
+        payload = {
+            "q": f"ss_marc_tag_001:{keyword}",
+            "fl": response_fields,
+        }
+
+        return payload
+
+    def _count_payload(self, query: str, filters: Union[str, List[str], None]) -> Dict:
+        """
+        Builds query parameters of a request returning only the number of
+        matching documents
+        """
+        if not isinstance(query, str) or not query:
+            raise BookopsSolrError("Invalid query argument.")
+
+        return {"q": query, "rows": 0, "fq": self._filters(filters)}
+
+    def _cursor_sort(self, sort: Optional[str]) -> str:
+        """
+        Returns sort parameter suitable for cursor paging, which requires
+        the unique key (id) as a tiebreaker
+        """
+        if not sort:
+            return "id asc"
+        clauses = [clause.strip().split(" ")[0] for clause in sort.split(",")]
+        if "id" in clauses:
+            return sort
+        return f"{sort},id asc"
+
+    def _default_fl(self) -> str:
+        """
+        Returns `fl` parameter of default response fields. The joined string
+        is cached per fields list, so sessions overriding
+        `DEFAULT_RESPONSE_FIELDS` get their own.
+        """
+        return _join_fields(tuple(self.DEFAULT_RESPONSE_FIELDS))
 
     def _determine_response_fields(
         self,
@@ -92,22 +440,274 @@ class SolrSession(requests.Session):
     ) -> Union[str, None]:
         """Determines which fields to return in the response"""
         if default_response_fields:
-            response_fields = self._prep_response_fields(self.DEFAULT_RESPONSE_FIELDS)
+            response_fields = self._default_fl()
         elif response_fields is not None and not default_response_fields:
             response_fields = self._prep_response_fields(response_fields)
         return response_fields
 
-    def _merge_with_payload_defaults(self, payload: Dict) -> Dict:
+    def _expired_econtent_payload(
+        self,
+        rows: int,
+        result_page: int,
+        default_response_fields: bool,
+        response_fields: Union[str, List[str], None],
+    ) -> Dict:
+        """Builds query parameters for a search of expired Overdrive e-content"""
+        if not isinstance(rows, int) or not isinstance(result_page, int):
+            raise BookopsSolrError("Invalid type of arguments passed.")
+
+        if rows < 1 or rows > 100:
+            raise BookopsSolrError(
+                "Rows argument must be bigger than 1 and no larger than 100."
+            )
+
+        # determine if pass default, custom, or allow all fields in response
+        response_fields = self._determine_response_fields(
+            default_response_fields, response_fields
+        )
+
+        payload = {
+            "q": self.EXPIRED_ECONTENT_QUERY,
+            "rows": rows,
+            "start": result_page,
+            "fl": response_fields,
+        }
+
+        return payload
+
+    def _facet_payload(
+        self,
+        fields: Union[str, List[str]],
+        query: str,
+        filters: Union[str, List[str], None],
+        limit: int,
+        mincount: int,
+    ) -> Dict:
+        """
+        Builds query parameters of a request returning only facet counts of
+        fields
+        """
+        payload = self._count_payload(query, filters)
+        if not isinstance(limit, int) or not isinstance(mincount, int):
+            raise BookopsSolrError("Invalid type of arguments passed.")
+
+        payload.update(
+            {
+                "facet": "true",
+                "facet.field": self._prep_field_list(fields),
+                "facet.limit": limit,
+                "facet.mincount": mincount,
+            }
+        )
+        return payload
+
+    def _fail_over(self, url: str, failed: Set[str]) -> bool:
+        """
+        Records endpoint that failed a request
+
+        Returns:
+            True when request can be sent to another endpoint not yet tried
+        """
+        failed.add(url)
+        return len(failed) < len(self.endpoints)
+
+    def _filters(self, filters: Union[str, List[str], None]) -> Union[str, List[str]]:
+        """Adds filter queries to the default filter"""
+        if filters is None:
+            return self.DEFAULT_FILTER
+        if isinstance(filters, str):
+            filters = [filters]
+        if not isinstance(filters, list) or not all(
+            isinstance(f, str) and f for f in filters
+        ):
+            raise BookopsSolrError("Invalid filters argument.")
+        return [self.DEFAULT_FILTER] + filters
+
+    def _include_response_field(
+        self, response_fields: Union[str, None], field: str
+    ) -> Union[str, None]:
+        """
+        Makes sure a field needed to process results is present in
+        the response fields. `None` means all fields are returned.
+        """
+        if response_fields is None:
+            return response_fields
+        if field not in response_fields.split(","):
+            response_fields = f"{response_fields},{field}"
+        return response_fields
+
+    def _is_url_too_long(self, payload: Dict) -> bool:
+        """
+        Determines if encoded payload exceeds `MAX_URL_LENGTH` and the request
+        should be sent in a POST body instead of a query string
+        """
+        params = {k: v for k, v in payload.items() if v is not None}
+        return len(urlencode(params, doseq=True)) > self.MAX_URL_LENGTH
+
+    def _isbns_payload(
+        self,
+        keywords: List[str],
+        default_response_fields: bool,
+        response_fields: Union[str, List[str], None],
+        query_parser: str = "lucene",
+        as_filter: bool = False,
+        normalize: bool = False,
+    ) -> Dict:
+        """Builds query parameters for a search by ISBNs"""
+        if not isinstance(keywords, list):
+            raise BookopsSolrError("ISBN keywords argument must be a list.")
+
+        if not keywords:
+            raise BookopsSolrError("ISBN keywords argument is an empty list.")
+
+        if normalize:
+            canonical, _ = normalize_identifiers(keywords, normalize_isbn)
+            keywords = self._identifier_variants(canonical.values(), isbn_variants)
+            if not keywords:
+                raise BookopsSolrError("No valid ISBN keywords provided.")
+
+        # prep multiple ISBNs
+        if query_parser == "lucene" and not as_filter:
+            # ungrouped query kept for backward compatibility of request URLs
+            keywords_str = " OR ".join(keywords)
+            query = f"isbn:{keywords_str}"
+        else:
+            query = self._keywords_query("isbn", keywords, query_parser)
+
+        # determine if pass default, custom, or allow all fields in response
+        response_fields = self._determine_response_fields(
+            default_response_fields, response_fields
+        )
+
+        payload = self._query_or_filter(query, as_filter)
+        payload["fl"] = response_fields
+
+        return payload
+
+    def _keywords_query(
+        self, field: str, keywords: List[str], query_parser: str
+    ) -> str:
+        """
+        Builds query matching any of keywords in a field
+
+        Args:
+            field:                  Solr field to search
+            keywords:               list of keywords
+            query_parser:           'lucene' for a boolean query, or 'terms' for
+                                    Solr's terms query parser (set membership
+                                    without scoring and boolean clause limits)
+
+        Returns:
+            query string
+        """
+        if query_parser == "terms":
+            keywords_str = ",".join(keywords)
+            return f"{{!terms f={field}}}{keywords_str}"
+        elif query_parser == "lucene":
+            keywords_str = " OR ".join(keywords)
+            return f"{field}:({keywords_str})"
+        else:
+            raise BookopsSolrError(
+                "Invalid query_parser argument. Must be 'lucene' or 'terms'."
+            )
+
+    def _identifier_variants(
+        self, canonical: Iterable[str], variants: Callable[[str], List[str]]
+    ) -> List[str]:
+        """
+        Returns deduplicated list of all forms under which canonical identifiers
+        may be indexed
+        """
+        keywords: Dict[str, None] = {}
+        for value in canonical:
+            for variant in variants(value):
+                keywords[variant] = None
+        return list(keywords)
+
+    def _merge_with_payload_defaults(self, payload: Union[Dict, SolrQuery]) -> Dict:
         """
         Merges user's payload with default parameters. User's values
-        overwrite default values.
+        overwrite default values. Multiple filter queries can be passed as
+        a list of `fq` values; repeated filters are sent once.
         """
+        if isinstance(payload, SolrQuery):
+            payload = payload.to_payload()
+
         default_payload = {
             "rows": 10,
-            "fq": "ss_type:catalog",  # to retrieve only catalog records
+            "fq": self.DEFAULT_FILTER,  # to retrieve only catalog records
         }
 
-        return {**default_payload, **payload}
+        payload = {**default_payload, **payload}
+        if isinstance(payload["fq"], (list, tuple)):
+            payload["fq"] = list(dict.fromkeys(payload["fq"]))
+        return payload
+
+    def _parse_response(self, response: Any) -> Dict:
+        """
+        Decodes JSON body of a successful response.
+
+        Args:
+            response:               `requests.Response` or `httpx.Response`
+                                    instance
+
+        Returns:
+            decoded response body as dictionary
+        """
+        if response.status_code != 200:
+            raise BookopsSolrError(
+                f"BPL Solr returned unexpected HTTP status: {response.status_code}."
+            )
+        try:
+            return self._loads(response.content)
+        except ValueError:
+            raise BookopsSolrError("Unable to decode BPL Solr response.")
+
+    def _parse_columns(
+        self,
+        response: Any,
+        multivalued: Iterable[str],
+        array_type: str,
+        numeric: Iterable[str],
+    ) -> Any:
+        """Parses CSV response into columns"""
+        if response.status_code != 200:
+            raise BookopsSolrError(
+                f"BPL Solr returned unexpected HTTP status: {response.status_code}."
+            )
+        try:
+            return parse_csv_columns(
+                response.content, multivalued, array_type, numeric=numeric
+            )
+        except (ValueError, csv.Error) as exc:
+            raise BookopsSolrError(f"Unable to parse BPL Solr CSV response: {exc}")
+
+    def _parse_count(self, response: Any) -> int:
+        """Returns number of matching documents reported in a response"""
+        return self._parse_response(response)["response"]["numFound"]
+
+    def _parse_facets(self, response: Any) -> Dict[str, Dict[str, int]]:
+        """
+        Converts facet counts of a response, returned by Solr as flat lists of
+        alternating values and counts, to dictionaries
+        """
+        data = self._parse_response(response)
+        try:
+            facet_fields = data["facet_counts"]["facet_fields"]
+        except KeyError:
+            raise BookopsSolrError("BPL Solr response is missing facet counts.")
+        return {
+            field: dict(zip(counts[::2], counts[1::2]))
+            for field, counts in facet_fields.items()
+        }
+
+    def _parse_stats(self, response: Any) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Returns statistics of fields reported in a response"""
+        data = self._parse_response(response)
+        try:
+            return data["stats"]["stats_fields"]
+        except KeyError:
+            raise BookopsSolrError("BPL Solr response is missing stats.")
 
     def _prep_response_fields(self, response_fields: Union[str, List[str]]) -> str:
         """
@@ -120,6 +720,18 @@ class SolrSession(requests.Session):
         else:
             raise BookopsSolrError("Invalid type of 'reposponse_format' argument.")
 
+    def _prep_field_list(self, fields: Union[str, List[str]]) -> List[str]:
+        """Validates facet or stats fields and returns them as a list"""
+        if isinstance(fields, str):
+            fields = [fields]
+        if (
+            not isinstance(fields, list)
+            or not fields
+            or not all(isinstance(f, str) and f for f in fields)
+        ):
+            raise BookopsSolrError("Invalid fields argument.")
+        return fields
+
     def _prep_sierra_number(self, bid: Union[str, int]) -> str:
         """
         Strips b prefix and removes last check digit
@@ -134,6 +746,8 @@ class SolrSession(requests.Session):
 
         if isinstance(bid, int):
             bid = str(bid).strip()
+        if not isinstance(bid, str) or not bid:
+            raise BookopsSolrError(err_msg)
 
         if bid.lower()[0] == "b":
             bid = bid[1:]
@@ -149,20 +763,852 @@ class SolrSession(requests.Session):
 
         return bid
 
-    def _send_request(
-        self, payload: Optional[Dict] = None, hooks: Optional[Dict] = None
-    ) -> requests.Response:
+    def _query_or_filter(self, query: str, as_filter: bool) -> Dict:
         """
-        Prepares and sends GET request with given parameters (payload) to BPL Solr.
-        Private method but can be used for ad hoc searches not provided in SolrSession
-        direct query methods.
-        Passed payload overrides default values.
+        Places query in the main query, or when `as_filter` is True in a filter
+        query (`fq`) next to the default filter. Filter queries are not scored
+        and are cached by Solr's filterCache.
+        """
+        if as_filter:
+            return {"q": "*:*", "fq": [self.DEFAULT_FILTER, query]}
+        return {"q": query}
+
+    def _reserveId_payload(
+        self,
+        keyword: str,
+        default_response_fields: bool,
+        response_fields: Union[str, List[str], None],
+    ) -> Dict:
+        """Builds query parameters for a search by Overdrive reserve ID"""
+        if not isinstance(keyword, str):
+            raise BookopsSolrError("Reserve id keyword argument must be a string.")
+
+        if not keyword:
+            raise BookopsSolrError("Missing reserve id keyword argument.")
+
+        # determine if pass default, custom, or allow all fields in response
+        response_fields = self._determine_response_fields(
+            default_response_fields, response_fields
+        )
+
+        payload = {"q": f"econtrolnumber:{keyword}", "fl": response_fields}
+
+        return payload
+
+    def _set_json_decoder(self, json_decoder: str) -> None:
+        """
+        Validates JSON decoder setting and selects installed decoder used to
+        parse responses
+        """
+        if json_decoder not in JSON_DECODERS:
+            raise BookopsSolrError(
+                "Invalid json_decoder argument. "
+                "Use 'auto', 'json', 'orjson' or 'msgspec'."
+            )
+        self.json_decoder = resolve_decoder(json_decoder)
+        self._loads = available_decoders()[self.json_decoder]
+
+    def _set_session_args(
+        self, authorization: str, endpoint: Union[str, List[str]], agent: Optional[str]
+    ) -> None:
+        """
+        Validates and sets arguments shared by all session classes
+        """
+        self.authorization = authorization
+
+        # validate passed arguments
+        if not isinstance(self.authorization, str) or not self.authorization:
+            raise BookopsSolrError(
+                "Invalid authorization. Argument must be a Client-Key string."
+            )
+
+        endpoints = [endpoint] if isinstance(endpoint, str) else endpoint
+        if (
+            not isinstance(endpoints, list)
+            or not endpoints
+            or not all(isinstance(e, str) and e for e in endpoints)
+        ):
+            raise BookopsSolrError(
+                "Invalid endpoint argument. It must be a Client-Key string."
+            )
+        self.endpoints = list(dict.fromkeys(endpoints))
+        # the first endpoint identifies the service, for example in cache keys
+        self.endpoint = self.endpoints[0]
+
+        if not agent:
+            agent = f"{__title__}/{__version__}"
+        elif not isinstance(agent, str):
+            raise BookopsSolrError("Invalid type of an agent argument.")
+        self.agent = agent
+
+    def _release_attempt(
+        self,
+        endpoint: Optional[Endpoint],
+        slot: bool,
+        seconds: float,
+        outcome: Optional[Tuple[bool, bool]],
+        response: Any = None,
+    ) -> None:
+        """
+        Frees endpoint and concurrency limiter slot taken by a request attempt.
+        Outcome of a completed attempt, whether the replica failed and whether
+        BPL Solr was overloaded, is recorded with the endpoint pool and
+        the limiter; QTime is read from the body of `response` when it has
+        been downloaded. Attempts interrupted or failed before a request was
+        sent have no outcome and are not recorded.
+        """
+        if endpoint is not None:
+            if outcome is None:
+                self.balancer.cancel(endpoint)
+            else:
+                self.balancer.release(endpoint, seconds, outcome[0])
+        if slot and self.concurrency_limiter is not None:
+            if outcome is None:
+                self.concurrency_limiter.cancel()
+            else:
+                qtime = (
+                    None if response is None else parse_qtime(response.content or b"")
+                )
+                self.concurrency_limiter.release(seconds, outcome[1], qtime)
+
+    def _set_concurrency_limiter(
+        self, concurrency_limiter: Optional[AdaptiveLimiter]
+    ) -> None:
+        """
+        Validates and sets adaptive limiter of requests in flight
+        """
+        if concurrency_limiter is not None and not isinstance(
+            concurrency_limiter, AdaptiveLimiter
+        ):
+            raise BookopsSolrError("Invalid type of a concurrency_limiter argument.")
+        self.concurrency_limiter = concurrency_limiter
+
+    def _set_balancer(
+        self, balancing: str, eject_after: int, eject_seconds: float
+    ) -> None:
+        """
+        Validates load balancing arguments and creates pool of endpoints
+        """
+        if balancing not in STRATEGIES:
+            raise BookopsSolrError(
+                "Invalid balancing argument. " "Use 'least_outstanding' or 'latency'."
+            )
+        if not isinstance(eject_after, int) or eject_after < 1:
+            raise BookopsSolrError("eject_after argument must be a positive integer.")
+        if not isinstance(eject_seconds, (int, float)) or eject_seconds < 0:
+            raise BookopsSolrError(
+                "eject_seconds argument must be a non-negative number."
+            )
+        self.balancer = EndpointPool(
+            self.endpoints, balancing, eject_after, eject_seconds
+        )
+
+    def endpoint_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Reports load and health of endpoints the session sends requests to
+
+        Returns:
+            dictionary keyed by endpoint with number of outstanding requests,
+            average response time in seconds, number of sent requests and
+            failures, and whether the endpoint is ejected
+        """
+        return self.balancer.stats()
+
+    def result(self, response: Any) -> "SolrResult":
+        """
+        Wraps response of a query method in `SolrResult` decoded with
+        the session's JSON decoder
+
+        Args:
+            response:               `requests.Response` (or `httpx.Response`)
+                                    instance returned by a query method
+
+        Returns:
+            `SolrResult` instance
+        """
+        # imported here, results module depends on this one
+        from .results import SolrResult
+
+        return SolrResult(response, self.json_decoder)
+
+    def _stats_payload(
+        self,
+        fields: Union[str, List[str]],
+        query: str,
+        filters: Union[str, List[str], None],
+    ) -> Dict:
+        """
+        Builds query parameters of a request returning only statistics (min,
+        max, count, missing, etc.) of fields
+        """
+        payload = self._count_payload(query, filters)
+        payload.update({"stats": "true", "stats.field": self._prep_field_list(fields)})
+        return payload
+
+    def _upcs_payload(
+        self,
+        keywords: List[str],
+        default_response_fields: bool,
+        response_fields: Union[str, List[str], None],
+        query_parser: str = "lucene",
+        as_filter: bool = False,
+        normalize: bool = False,
+    ) -> Dict:
+        """Builds query parameters for a search by UPCs"""
+        if not isinstance(keywords, list):
+            raise BookopsSolrError("UPC keywords argument must be a list.")
+
+        if not keywords:
+            raise BookopsSolrError("UPC keywords argument is an empty list.")
+
+        if normalize:
+            canonical, _ = normalize_identifiers(keywords, normalize_upc)
+            keywords = self._identifier_variants(canonical.values(), upc_variants)
+            if not keywords:
+                raise BookopsSolrError("No valid UPC keywords provided.")
+
+        # prep multiple UPCs
+        if query_parser == "lucene" and not as_filter:
+            # ungrouped query kept for backward compatibility of request URLs
+            keywords_str = " OR ".join(keywords)
+            query = f"sm_marc_tag_024_a:{keywords_str}"
+        else:
+            query = self._keywords_query("sm_marc_tag_024_a", keywords, query_parser)
+
+        # determine if pass default, custom, or allow all fields in response
+        response_fields = self._determine_response_fields(
+            default_response_fields, response_fields
+        )
+
+        payload = self._query_or_filter(query, as_filter)
+        payload["fl"] = response_fields
+
+        return payload
+
+
+class SolrSession(_SolrSessionBase, requests.Session):
+    """
+    A session class that wraps requests to BPL Solr platform.
+    """
+
+    # query methods that can be run with `SolrSession.map`
+    MAP_METHODS = (
+        "_send_request",
+        "bulk_search_isbns",
+        "bulk_search_upcs",
+        "count_query",
+        "facet_query",
+        "search_bibNo",
+        "search_bibNos",
+        "search_controlNo",
+        "search_isbns",
+        "search_reserveId",
+        "search_upcs",
+        "find_expired_econtent",
+        "query_columns",
+        "stats_query",
+    )
+
+    # HTTP statuses of responses that are retried
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(
+        self,
+        authorization: str,
+        endpoint: Union[str, List[str]],
+        agent: Optional[str] = None,
+        timeout: Union[int, float, Tuple[int, int], Tuple[float, float], None] = (
+            3,
+            3,
+        ),
+        cache: Optional[BaseCache] = None,
+        retries: int = 0,
+        backoff_factor: float = 0.5,
+        backoff_max: float = 30.0,
+        rate_limit: Optional[float] = None,
+        pool_connections: int = DEFAULT_POOLSIZE,
+        pool_maxsize: int = DEFAULT_POOLSIZE,
+        pool_block: bool = DEFAULT_POOLBLOCK,
+        keep_alive: bool = True,
+        coalesce: bool = False,
+        metrics: Optional[SessionMetrics] = None,
+        transport: Optional[BaseAdapter] = None,
+        json_decoder: str = "auto",
+        balancing: str = "least_outstanding",
+        eject_after: int = 3,
+        eject_seconds: float = 30.0,
+        concurrency_limiter: Optional[AdaptiveLimiter] = None,
+    ):
+        """
+        Args:
+            authorization:          Client-Key
+            endpoint:               endpoint's URL, or a list of URLs of
+                                    replicas requests are spread across
+            agent:                  "User-agent" parameter to be passed in the request
+                                    header; usage strongly encouraged
+            timeout:                how long to wait for server to send data before
+                                    giving up; default value is 3 seconds
+            cache:                  optional response cache (`MemoryCache` or
+                                    `SQLiteCache` instance)
+            retries:                number of times a request is retried after
+                                    a timeout, connection error, or response with
+                                    one of `RETRY_STATUSES`
+            backoff_factor:         base of exponential backoff between retries in
+                                    seconds; actual delay is randomized (jitter)
+                                    between 0 and backoff_factor * 2 ** attempt
+            backoff_max:            maximum backoff delay in seconds; `Retry-After`
+                                    header of a response takes precedence
+            rate_limit:             maximum number of requests per second sent by
+                                    the session; unlimited by default
+            pool_connections:       number of connection pools (one per host)
+                                    to keep
+            pool_maxsize:           maximum number of connections kept open in
+                                    a pool; should be at least the number of
+                                    threads sharing the session
+            pool_block:             when True, threads wait for a free connection
+                                    instead of opening extra connections that are
+                                    discarded afterwards
+            keep_alive:             when False, connections are closed after each
+                                    request
+            coalesce:               when True, identical requests sent concurrently
+                                    by threads sharing the session are sent to
+                                    BPL Solr once and all callers receive the same
+                                    response object
+            metrics:                optional `SessionMetrics` instance recording
+                                    latency, throughput and errors of requests
+            transport:              custom transport adapter mounted instead of
+                                    the default pooled `HTTPAdapter`, for example
+                                    `RecordingAdapter` or `ReplayAdapter`;
+                                    connection pool arguments do not apply to it
+            json_decoder:           JSON decoder of responses parsed by query
+                                    methods: 'auto' (default) uses the fastest
+                                    installed of 'orjson' and 'msgspec', or
+                                    the standard library 'json'; a decoder
+                                    that is not installed falls back to 'json'
+            balancing:              selection of endpoint for each request:
+                                    'least_outstanding' (default) picks the one
+                                    with the fewest requests in flight,
+                                    'latency' the one with the lowest average
+                                    response time weighted by requests in flight
+            eject_after:            number of consecutive failed requests
+                                    (timeouts, connection errors or responses
+                                    with one of `FAILOVER_STATUSES`) after which
+                                    an endpoint is ejected
+            eject_seconds:          how long an ejected endpoint receives no
+                                    requests, unless all endpoints are ejected
+            concurrency_limiter:    optional `AdaptiveLimiter` instance bounding
+                                    requests in flight across threads sharing
+                                    the session to a limit adjusted to
+                                    observed latency, QTime and overload
+                                    responses
+        """
+        super().__init__()
+
+        self._set_session_args(authorization, endpoint, agent)
+        self._set_json_decoder(json_decoder)
+        self._set_balancer(balancing, eject_after, eject_seconds)
+        self._set_concurrency_limiter(concurrency_limiter)
+        self.timeout = timeout
+
+        if cache is not None and not isinstance(cache, BaseCache):
+            raise BookopsSolrError("Invalid type of a cache argument.")
+        self.cache = cache
+
+        if metrics is not None and not isinstance(metrics, SessionMetrics):
+            raise BookopsSolrError("Invalid type of a metrics argument.")
+        self.metrics = metrics
+
+        if not isinstance(retries, int) or retries < 0:
+            raise BookopsSolrError("Retries argument must be a non-negative integer.")
+        if not isinstance(backoff_factor, (int, float)) or backoff_factor < 0:
+            raise BookopsSolrError(
+                "Backoff factor argument must be a non-negative number."
+            )
+        if not isinstance(backoff_max, (int, float)) or backoff_max < 0:
+            raise BookopsSolrError(
+                "Backoff max argument must be a non-negative number."
+            )
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+
+        if rate_limit is None:
+            self.rate_limiter = None
+        elif isinstance(rate_limit, (int, float)) and rate_limit > 0:
+            self.rate_limiter = TokenBucket(rate_limit)
+        else:
+            raise BookopsSolrError("Rate limit argument must be a positive number.")
+
+        for name, value in (
+            ("pool_connections", pool_connections),
+            ("pool_maxsize", pool_maxsize),
+        ):
+            if not isinstance(value, int) or value < 1:
+                raise BookopsSolrError(f"{name} argument must be a positive integer.")
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = bool(pool_block)
+        self.keep_alive = bool(keep_alive)
+
+        if transport is not None and not isinstance(transport, BaseAdapter):
+            raise BookopsSolrError("Invalid type of a transport argument.")
+        self.transport = transport
+        self._mount_adapters()
+        # guards enlarging of connection pools by `map`
+        self._pool_lock = threading.Lock()
+        # adapters replaced by larger pools, closed with the session
+        self._retired_adapters: List[BaseAdapter] = []
+
+        self.single_flight = SingleFlight() if coalesce else None
+
+        # set session headers
+        self.headers.update({"Client-Key": self.authorization})
+        self.headers.update({"User-Agent": self.agent})
+        # all compressions urllib3 can decode, including brotli and zstd
+        # when their optional packages are installed
+        self.headers.update({"Accept-Encoding": ACCEPT_ENCODING})
+        if not self.keep_alive:
+            self.headers.update({"Connection": "close"})
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """
+        Calculates randomized ("full jitter") exponential backoff delay
+        before next retry
+
+        Args:
+            attempt:                number of the failed attempt starting from 0
+
+        Returns:
+            delay in seconds
+        """
+        return random.uniform(
+            0, min(self.backoff_max, self.backoff_factor * 2**attempt)
+        )
+
+    def _bulk_search(
+        self,
+        field: str,
+        keywords: List[str],
+        default_response_fields: bool,
+        response_fields: Union[str, List[str], None],
+        hooks: Optional[Dict],
+        query_parser: str = "lucene",
+        as_filter: bool = False,
+        normalizer: Optional[Callable[[str], Optional[str]]] = None,
+        variants: Optional[Callable[[str], List[str]]] = None,
+    ) -> Dict:
+        """
+        Retrieves documents matching any of given keywords in a field and maps
+        each keyword to ids of documents it matched.
+
+        Args:
+            field:                      Solr field to search
+            keywords:                   list of keyword strings
+            default_response_fields:    when True returns only predetermined fields,
+                                        when False returns all fields unless specified
+                                        in `response_fields` argument
+            response_fields:            fields to be returned as comma separated string,
+                                        or a list of strings
+            hooks:                      Requests library hook system
+            query_parser:               'lucene' or 'terms'
+            as_filter:                  when True keywords are passed in a filter query
+            normalizer:                 function returning canonical form of
+                                        a keyword or `None` if keyword is invalid;
+                                        when `None` keywords are queried as passed
+            variants:                   function returning all forms of a canonical
+                                        keyword that are queried
+
+        Returns:
+            dictionary with `numFound`, `docs`, `matches` and `invalid` keys
+        """
+        # determine if pass default, custom, or allow all fields in response
+        response_fields = self._determine_response_fields(
+            default_response_fields, response_fields
+        )
+        # fields needed to map keywords to documents
+        response_fields = self._include_response_field(response_fields, "id")
+        response_fields = self._include_response_field(response_fields, field)
+
+        if normalizer is None or variants is None:
+            query_keywords = list(dict.fromkeys(keywords))
+            invalid: List[str] = []
+        else:
+            canonical, invalid = normalize_identifiers(keywords, normalizer)
+            query_keywords = self._identifier_variants(canonical.values(), variants)
+
+        docs = {
+            doc["id"]: doc
+            for doc in self._search_keywords(
+                field,
+                query_keywords,
+                response_fields,
+                hooks,
+                query_parser,
+                as_filter,
+            )
+        }
+
+        return {
+            "numFound": len(docs),
+            "docs": list(docs.values()),
+            "matches": match_identifiers(keywords, docs.values(), field, normalizer),
+            "invalid": invalid,
+        }
+
+    def _ensure_pool_size(self, size: int) -> None:
+        """
+        Mounts HTTP adapters with larger connection pools when current pools
+        are smaller than `size`, so connections can be reused by that many threads.
+        Replaced adapters are not closed while the session is open, so requests
+        other threads are sending through them complete.
+        """
+        with self._pool_lock:
+            if size <= self.pool_maxsize or self.transport is not None:
+                return
+            self.pool_maxsize = size
+            for prefix in ("https://", "http://"):
+                old_adapter = self.adapters.get(prefix)
+                if old_adapter is not None:
+                    self._retired_adapters.append(old_adapter)
+                self.mount(
+                    prefix,
+                    HTTPAdapter(
+                        pool_connections=self.pool_connections,
+                        pool_maxsize=self.pool_maxsize,
+                        pool_block=self.pool_block,
+                    ),
+                )
+
+    def close(self) -> None:
+        """Closes connection pools, including pools replaced by larger ones"""
+        super().close()
+        for adapter in self._retired_adapters:
+            adapter.close()
+        self._retired_adapters.clear()
+
+    def _fetch(
+        self, payload: Dict, hooks: Optional[Dict] = None, stream: bool = False
+    ) -> requests.Response:
+        """
+        Sends request with already merged payload to BPL Solr. Payloads
+        that would exceed `MAX_URL_LENGTH` are sent as a form-encoded POST request.
+        When the session has several endpoints, a request failing with
+        a timeout, connection error or one of `FAILOVER_STATUSES` is sent again
+        at once to another endpoint, until each has been tried. Failed requests
+        are then retried with jittered exponential backoff, honoring
+        `Retry-After` header, up to `retries` times.
 
         Args:
             payload:                query parameters as dictionary
+            hooks:                  Requests library hook system
+            stream:                 when True response body is not downloaded
+                                    until accessed
+
+        Returns:
+            `requests.Response` instance
+        """
+        attempt = 0
+        method = current_method.get()
+        # endpoints that failed the current attempt
+        failed: Set[str] = set()
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            slot = False
+            endpoint: Optional[Endpoint] = None
+            # (replica failed, overloaded) of a completed attempt
+            outcome: Optional[Tuple[bool, bool]] = None
+            downloaded = None
+            started = time.perf_counter()
+            try:
+                if self.concurrency_limiter is not None:
+                    self.concurrency_limiter.acquire()
+                    slot = True
+                endpoint = self.balancer.acquire(exclude=failed)
+                started = time.perf_counter()
+                try:
+                    if self._is_url_too_long(payload):
+                        response = self.post(
+                            endpoint.url,
+                            data=payload,
+                            timeout=self.timeout,
+                            hooks=hooks,
+                            stream=stream,
+                        )
+                    else:
+                        response = self.get(
+                            endpoint.url,
+                            params=payload,
+                            timeout=self.timeout,
+                            hooks=hooks,
+                            stream=stream,
+                        )
+                except (
+                    requests.exceptions.Timeout,
+                    requests.exceptions.ConnectionError,
+                ) as exc:
+                    outcome = (True, isinstance(exc, requests.exceptions.Timeout))
+                    if self.metrics is not None:
+                        self.metrics.observe_error(method, exc)
+                    if self._fail_over(endpoint.url, failed):
+                        continue
+                    if attempt >= self.retries:
+                        raise BookopsSolrError(f"Connection error: {sys.exc_info()[0]}")
+                    delay = self._backoff_delay(attempt)
+
+                except Exception as exc:
+                    if self.metrics is not None:
+                        self.metrics.observe_error(method, exc)
+                    raise BookopsSolrError(f"Unexpected error: {sys.exc_info()[0]}")
+
+                else:
+                    elapsed = time.perf_counter() - started
+                    replica_failed = response.status_code in self.FAILOVER_STATUSES
+                    outcome = (
+                        replica_failed,
+                        response.status_code in OVERLOAD_STATUSES,
+                    )
+                    downloaded = None if stream else response
+                    if self.metrics is not None:
+                        self._observe_response(method, response, elapsed, stream)
+                    if replica_failed and self._fail_over(endpoint.url, failed):
+                        response.close()
+                        continue
+                    if (
+                        response.status_code not in self.RETRY_STATUSES
+                        or attempt >= self.retries
+                    ):
+                        return response
+                    retry_after = self._retry_after(response)
+                    if retry_after is None:
+                        delay = self._backoff_delay(attempt)
+                    else:
+                        delay = retry_after
+                    response.close()
+            finally:
+                self._release_attempt(
+                    endpoint,
+                    slot,
+                    time.perf_counter() - started,
+                    outcome,
+                    downloaded,
+                )
+
+            if self.metrics is not None:
+                self.metrics.observe_retry(method)
+            time.sleep(delay)
+            attempt += 1
+            failed.clear()
+
+    def _iter_cursor_pages(
+        self,
+        payload: Dict,
+        hooks: Optional[Dict] = None,
+        cursor_mark: str = "*",
+    ) -> Iterator[Tuple[Dict, str]]:
+        """
+        Pages through all results of a query using Solr's `cursorMark`.
+        Unlike `start` offsets, the cost of each page stays the same
+        regardless how deep the results are paged.
+
+        Args:
+            payload:                query parameters as dictionary
+            hooks:                  Requests library hook system
+            cursor_mark:            cursor to start from; "*" starts from the
+                                    beginning of results
+
+        Yields:
+            tuple of decoded response page and cursor of the next page
+        """
+        payload = {k: v for k, v in payload.items() if k != "start"}
+        payload["sort"] = self._cursor_sort(payload.get("sort"))
+
+        while True:
+            payload["cursorMark"] = cursor_mark
+            data = self._parse_response(self._send_request(payload, hooks))
+            try:
+                next_cursor_mark = data["nextCursorMark"]
+            except KeyError:
+                raise BookopsSolrError("BPL Solr response is missing nextCursorMark.")
+            yield data, next_cursor_mark
+            if next_cursor_mark == cursor_mark:
+                break
+            cursor_mark = next_cursor_mark
+
+    def _mount_adapters(self) -> None:
+        """
+        Mounts HTTP adapters configured with session's connection pool settings,
+        or custom transport adapter when the session has one
+        """
+        for prefix in ("https://", "http://"):
+            old_adapter = self.adapters.get(prefix)
+            if self.transport is not None:
+                adapter = self.transport
+            else:
+                adapter = HTTPAdapter(
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize,
+                    pool_block=self.pool_block,
+                )
+            self.mount(prefix, adapter)
+            if old_adapter is not None and old_adapter is not adapter:
+                old_adapter.close()
+
+    def _observe_response(
+        self, method: str, response: requests.Response, seconds: float, stream: bool
+    ) -> None:
+        """
+        Records metrics of a received response; body of a streamed response
+        is not downloaded yet, so its size and QTime are not recorded
+        """
+        if self.metrics is None:
+            return
+        if stream:
+            self.metrics.observe_request(method, seconds, response.status_code)
+        else:
+            content = response.content or b""
+            self.metrics.observe_request(
+                method,
+                seconds,
+                response.status_code,
+                len(content),
+                parse_qtime(content),
+            )
+
+    def _retry_after(self, response: requests.Response) -> Optional[float]:
+        """
+        Parses `Retry-After` response header given either in seconds or
+        as HTTP date
+
+        Args:
+            response:               `requests.Response` instance
+
+        Returns:
+            delay in seconds or `None` if header is missing or invalid
+        """
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, retry_at.timestamp() - time.time())
+
+    def _run_map_request(self, position: int, request: Tuple) -> MapResult:
+        """
+        Runs a single request of `SolrSession.map` capturing any error
+
+        Args:
+            position:               position of the request in the input
+            request:                tuple of query method name, its positional
+                                    arguments tuple and keyword arguments
+                                    dictionary, or of query method name followed
+                                    by its positional arguments
+
+        Returns:
+            `MapResult` instance
+        """
+        try:
+            if not isinstance(request, tuple) or not request:
+                raise BookopsSolrError("Invalid request specification passed.")
+            if (
+                len(request) == 3
+                and isinstance(request[1], tuple)
+                and isinstance(request[2], dict)
+            ):
+                method, args, kwargs = request
+            else:
+                method, *args = request
+                kwargs = {}
+            if method not in self.MAP_METHODS:
+                raise BookopsSolrError(f"Unsupported query method: {method}.")
+            response = getattr(self, method)(*args, **kwargs)
+            return MapResult(position, request, response, None)
+        except Exception as exc:
+            return MapResult(position, request, None, exc)
+
+    def _search_keywords(
+        self,
+        field: str,
+        keywords: List[str],
+        response_fields: Union[str, None],
+        hooks: Optional[Dict] = None,
+        query_parser: str = "lucene",
+        as_filter: bool = False,
+    ) -> Iterator[Dict]:
+        """
+        Retrieves documents matching any of given keywords in a field.
+        Keywords are split into batches and each batch is sent as a single
+        query. All pages of results for each batch are retrieved.
+
+        Args:
+            field:                  Solr field to search
+            keywords:               list of prepped keywords
+            response_fields:        fields to be returned as comma separated string
+            hooks:                  Requests library hook system
+            query_parser:           'lucene' or 'terms'
+            as_filter:              when True keywords are passed in a filter query
+
+        Yields:
+            matching documents
+        """
+        if query_parser == "terms":
+            # long requests are sent as POST so only the number of terms is limited
+            batches = self._batch_keywords(
+                keywords, self.MAX_TERMS_KEYWORDS, sys.maxsize
+            )
+        else:
+            batches = self._batch_keywords(keywords)
+
+        for batch in batches:
+            payload = self._query_or_filter(
+                self._keywords_query(field, batch, query_parser), as_filter
+            )
+            payload["fl"] = response_fields
+            payload["rows"] = len(batch)
+            start = 0
+            while True:
+                payload["start"] = start
+                data = self._parse_response(self._send_request(payload, hooks))
+                docs = data["response"]["docs"]
+                yield from docs
+                start += len(docs)
+                if not docs or start >= data["response"]["numFound"]:
+                    break
+
+    def _send_request(
+        self,
+        payload: Union[Dict, SolrQuery, None] = None,
+        hooks: Optional[Dict] = None,
+        stream: bool = False,
+    ) -> requests.Response:
+        """
+        Prepares and sends GET request with given parameters (payload) to BPL Solr.
+        Private method but can be used for ad hoc searches not provided in SolrSession
+        direct query methods.
+        Passed payload overrides default values.
+        Payloads that would exceed `MAX_URL_LENGTH` are sent as a form-encoded
+        POST request.
+        When the session has a cache, cached responses are returned without
+        sending a request (hooks are not called for them). When the session
+        coalesces requests, a request identical to one already in flight waits
+        for and returns its response (hooks are called only once).
+        Streamed requests bypass the cache and are never coalesced.
+
+        Args:
+            payload:                query parameters as dictionary or
+                                    `SolrQuery` instance
             hooks:                  Requests library hook system that can be
                                     used for signal event handling, see more at:
                                     https://requests.readthedocs.io/en/master/user/advanced/#event-hooks
+            stream:                 when True response body is not downloaded
+                                    until accessed; use `iter_docs` to parse
+                                    documents incrementally as they arrive
 
         Returns:
             `requests.Response` instance
@@ -179,36 +1625,237 @@ class SolrSession(requests.Session):
             response = session._search(payload)
         """
 
-        if not isinstance(payload, dict) or not payload:
-            raise BookopsSolrError("Missing or invalid payload argument.")
+        if not isinstance(payload, (dict, SolrQuery)) or not payload:
+            raise BookopsSolrError("Missing or invalid payload argument.")
+
+        payload = self._merge_with_payload_defaults(payload)
+
+        if stream or (self.cache is None and self.single_flight is None):
+            return self._fetch(payload, hooks, stream)
+
+        key = cache_key(self.endpoint, payload)
+        if self.cache is not None:
+            response = self.cache.get(key)
+            if response is not None:
+                return response
+
+        def fetch() -> requests.Response:
+            response = self._fetch(payload, hooks)
+            if self.cache is not None:
+                self.cache.set(key, response)
+            return response
+
+        if self.single_flight is None:
+            return fetch()
+        return self.single_flight.do(key, fetch)
+
+    @instrumented
+    def bulk_search_isbns(
+        self,
+        keywords: List[str],
+        default_response_fields: bool = True,
+        response_fields: Union[str, List[str], None] = None,
+        hooks: Optional[Dict] = None,
+        query_parser: str = "lucene",
+        as_filter: bool = False,
+        normalize: bool = True,
+    ) -> Dict:
+        """
+        Retrieves documents matching any number of ISBNs. Large lists are split
+        into batches sent as separate requests and results are merged.
+
+        Args:
+            keywords:                   list of ISBN strings
+            default_response_fields:    when True returns only predetermined fields,
+                                        when False returns all fields unless specified
+                                        in `response_fields` argument
+            response_fields:            fields to be returned as comma separated string,
+                                        or a list of strings
+            hooks:                      Requests library hook system that can be
+                                        used for signal event handling, see more at:
+                                        https://requests.readthedocs.io/en/master/user/advanced/#event-hooks
+            query_parser:               'lucene' (default) sends identifiers as
+                                        a boolean query; 'terms' uses Solr's terms
+                                        query parser, which is faster for large sets
+                                        and not limited by maxBooleanClauses
+            as_filter:                  when True identifiers are sent in a filter
+                                        query (`fq`) that is not scored and is
+                                        cached by Solr; use when relevance ranking
+                                        is not needed
+            normalize:                  when True (default) ISBNs are normalized to
+                                        canonical ISBN-13 (ISBN-10 and hyphenated forms are
+                                        converted, check digits verified),
+                                        deduplicated, and invalid ISBNs are skipped
+
+        Returns:
+            dictionary with number of found documents (`numFound`), deduplicated
+            documents (`docs`), ids of documents matched by each passed ISBN
+            (`matches`), and ISBNs skipped as invalid (`invalid`)
+        """
+        if not isinstance(keywords, list):
+            raise BookopsSolrError("ISBN keywords argument must be a list.")
+
+        if not keywords:
+            raise BookopsSolrError("ISBN keywords argument is an empty list.")
+
+        return self._bulk_search(
+            "isbn",
+            keywords,
+            default_response_fields,
+            response_fields,
+            hooks,
+            query_parser,
+            as_filter,
+            normalize_isbn if normalize else None,
+            isbn_variants,
+        )
+
+    @instrumented
+    def bulk_search_upcs(
+        self,
+        keywords: List[str],
+        default_response_fields: bool = True,
+        response_fields: Union[str, List[str], None] = None,
+        hooks: Optional[Dict] = None,
+        query_parser: str = "lucene",
+        as_filter: bool = False,
+        normalize: bool = True,
+    ) -> Dict:
+        """
+        Retrieves documents matching any number of UPCs. Large lists are split
+        into batches sent as separate requests and results are merged.
+
+        Args:
+            keywords:                   list of UPC strings
+            default_response_fields:    when True returns only predetermined fields,
+                                        when False returns all fields unless specified
+                                        in `response_fields` argument
+            response_fields:            fields to be returned as comma separated string,
+                                        or a list of strings
+            hooks:                      Requests library hook system that can be
+                                        used for signal event handling, see more at:
+                                        https://requests.readthedocs.io/en/master/user/advanced/#event-hooks
+            query_parser:               'lucene' (default) sends identifiers as
+                                        a boolean query; 'terms' uses Solr's terms
+                                        query parser, which is faster for large sets
+                                        and not limited by maxBooleanClauses
+            as_filter:                  when True identifiers are sent in a filter
+                                        query (`fq`) that is not scored and is
+                                        cached by Solr; use when relevance ranking
+                                        is not needed
+            normalize:                  when True (default) UPCs are normalized to
+                                        canonical UPC-A (EAN-13 forms with leading zero
+                                        are converted, check digits verified),
+                                        deduplicated, and invalid UPCs are skipped
+
+        Returns:
+            dictionary with number of found documents (`numFound`), deduplicated
+            documents (`docs`), ids of documents matched by each passed UPC
+            (`matches`), and UPCs skipped as invalid (`invalid`)
+        """
+        if not isinstance(keywords, list):
+            raise BookopsSolrError("UPC keywords argument must be a list.")
+
+        if not keywords:
+            raise BookopsSolrError("UPC keywords argument is an empty list.")
+
+        return self._bulk_search(
+            "sm_marc_tag_024_a",
+            keywords,
+            default_response_fields,
+            response_fields,
+            hooks,
+            query_parser,
+            as_filter,
+            normalize_upc if normalize else None,
+            upc_variants,
+        )
+
+    def pool_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Reports usage of connection pools opened by the session
+
+        Returns:
+            dictionary keyed by "scheme://host:port" with number of opened
+            connections, number of requests sent, number of idle connections,
+            and maximum size of each pool
+        """
+        stats = {}
+        for adapter in self.adapters.values():
+            if not isinstance(adapter, HTTPAdapter):
+                continue
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                stats[f"{pool.scheme}://{pool.host}:{pool.port}"] = {
+                    "num_connections": pool.num_connections,
+                    "num_requests": pool.num_requests,
+                    "idle": pool.pool.qsize() if pool.pool is not None else 0,
+                    "maxsize": (pool.pool.maxsize if pool.pool is not None else 0),
+                }
+        return stats
+
+    @instrumented
+    def search_bibNo(
+        self,
+        keyword: Union[str, int],
+        default_response_fields: bool = True,
+        response_fields: Union[str, List[str], None] = None,
+        hooks: Optional[Dict] = None,
+        stream: bool = False,
+    ) -> requests.Response:
+        """
+        Retrieves documents with matching id (Sierra bib #)
+
+        Args:
+            keyword:                    Sierra bib number as str with or without 'b'
+                                        prefix or last 9th check digit, or as int with
+                                        or without 9th check digit
+            default_response_fields:    when True returns only predetermined fields,
+                                        when False returns all fields unless specified
+                                        in `response_fields` argument
+            response_fields:            fields to be returned as comma separated string,
+                                        or a list of strings
+            hooks:                      Requests library hook system that can be
+                                        used for signal event handling, see more at:
+                                        https://requests.readthedocs.io/en/master/user/advanced/#event-hooks
+            stream:                     when True response body is not downloaded
+                                        until accessed; use `iter_docs` to parse
+                                        documents incrementally
+
+        Returns:
+            `requests.Response` object
+
 
-        payload = self._merge_with_payload_defaults(payload)
+        """
+        payload = self._bibNo_payload(keyword, default_response_fields, response_fields)
 
-        try:
-            response = self.get(
-                self.endpoint, params=payload, timeout=self.timeout, hooks=hooks
-            )
-            return response
-        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
-            raise BookopsSolrError(f"Connection error: {sys.exc_info()[0]}")
+        response = self._send_request(payload, hooks, stream)
 
-        except Exception:
-            raise BookopsSolrError(f"Unexpected error: {sys.exc_info()[0]}")
+        return response
 
-    def search_bibNo(
+    @instrumented
+    def search_bibNos(
         self,
-        keyword: Union[str, int],
+        keywords: Iterable[Union[str, int]],
         default_response_fields: bool = True,
         response_fields: Union[str, List[str], None] = None,
         hooks: Optional[Dict] = None,
-    ) -> requests.Response:
+        query_parser: str = "lucene",
+        as_filter: bool = False,
+    ) -> Dict[str, Any]:
         """
-        Retrieves documents with matching id (Sierra bib #)
+        Retrieves documents for many Sierra bib numbers at once. Bib numbers are
+        deduplicated and packed into as few requests as Solr limits allow;
+        invalid bib numbers are skipped and reported, so they do not fail
+        the whole lookup.
 
         Args:
-            keyword:                    Sierra bib number as str with or without 'b'
-                                        prefix or last 9th check digit, or as int with
-                                        or without 9th check digit
+            keywords:                   iterable of Sierra bib numbers as str with or
+                                        without 'b' prefix or last 9th check digit, or
+                                        as int with or without 9th check digit
             default_response_fields:    when True returns only predetermined fields,
                                         when False returns all fields unless specified
                                         in `response_fields` argument
@@ -217,35 +1864,67 @@ class SolrSession(requests.Session):
             hooks:                      Requests library hook system that can be
                                         used for signal event handling, see more at:
                                         https://requests.readthedocs.io/en/master/user/advanced/#event-hooks
+            query_parser:               'lucene' (default) sends identifiers as
+                                        a boolean query; 'terms' uses Solr's terms
+                                        query parser, which is faster for large sets
+                                        and not limited by maxBooleanClauses
+            as_filter:                  when True identifiers are sent in a filter
+                                        query (`fq`) that is not scored and is
+                                        cached by Solr; use when relevance ranking
+                                        is not needed
 
         Returns:
-            `requests.Response` object
-
-
+            dictionary with `docs`, mapping each passed bib number to its
+            document, or to `None` if the bib was not found or is invalid, and
+            `invalid`, list of skipped invalid bib numbers
         """
-        if not keyword:
-            raise BookopsSolrError("Missing keyword argument.")
-
-        # verify and prep bib number
-        keyword = self._prep_sierra_number(keyword)
+        if keywords is None or isinstance(keywords, (str, int)):
+            raise BookopsSolrError("Bib numbers keywords argument must be an iterable.")
+
+        # verify and prep bib numbers
+        prepped: Dict[Union[str, int], Optional[str]] = {}
+        invalid: List[Union[str, int]] = []
+        for keyword in keywords:
+            if keyword in prepped:
+                continue
+            try:
+                prepped[keyword] = self._prep_sierra_number(keyword)
+            except BookopsSolrError:
+                prepped[keyword] = None
+                invalid.append(keyword)
+
+        if not prepped:
+            raise BookopsSolrError("Bib numbers keywords argument is empty.")
 
         # determine if pass default, custom, or allow all fields in response
         response_fields = self._determine_response_fields(
             default_response_fields, response_fields
         )
+        response_fields = self._include_response_field(response_fields, "id")
+
+        unique_bids = [bid for bid in dict.fromkeys(prepped.values()) if bid]
+        found: Dict[Optional[str], Dict] = {}
+        if unique_bids:
+            found = {
+                doc["id"]: doc
+                for doc in self._search_keywords(
+                    "id", unique_bids, response_fields, hooks, query_parser, as_filter
+                )
+            }
 
-        payload = {"q": f"id:{keyword}", "fl": response_fields}
-
-        response = self._send_request(payload, hooks)
-
-        return response
+        return {
+            "docs": {keyword: found.get(bid) for keyword, bid in prepped.items()},
+            "invalid": invalid,
+        }
 
+    @instrumented
     def search_controlNo(
         self,
         keyword: str,
         default_response_fields: bool = True,
         response_fields: Union[str, List[str], None] = None,
         hooks: Optional[Dict] = None,
+        stream: bool = False,
     ) -> requests.Response:
         """
         Retrieves documents with matching control number (001 MARC tag).
@@ -260,39 +1939,36 @@ class SolrSession(requests.Session):
             hooks:                      Requests library hook system that can be
                                         used for signal event handling, see more at:
                                         https://requests.readthedocs.io/en/master/user/advanced/#event-hooks
+            stream:                     when True response body is not downloaded
+                                        until accessed; use `iter_docs` to parse
+                                        documents incrementally
 
         Returns:
             `requests.Response` object
         """
-        if not isinstance(keyword, str):
-            raise BookopsSolrError("Control number keyword must be a string.")
-
-        if not keyword:
-            raise BookopsSolrError("Provided empty string as control number keyword.")
-
-        # determine if pass default, custom, or allow all fields in response
-        response_fields = self._determine_response_fields(
-            default_response_fields, response_fields
+        payload = self._controlNo_payload(
+            keyword, default_response_fields, response_fields
         )
 
-        payload = {
-            "q": f"ss_marc_tag_001:{keyword}",
-            "fl": response_fields,
-        }
-
-        response = self._send_request(payload, hooks)
+        response = self._send_request(payload, hooks, stream)
 
         return response
 
+    @instrumented
     def search_isbns(
         self,
         keywords: List[str],
         default_response_fields: bool = True,
         response_fields: Union[str, List[str], None] = None,
         hooks: Optional[Dict] = None,
+        query_parser: str = "lucene",
+        as_filter: bool = False,
+        stream: bool = False,
+        normalize: bool = False,
     ) -> requests.Response:
         """
         Retrieves documents with matching ISBNs.
+        Use `bulk_search_isbns` for lists larger than `MAX_QUERY_CLAUSES`.
 
         Args:
             keywords:                   list of ISBN strings
@@ -304,40 +1980,46 @@ class SolrSession(requests.Session):
             hooks:                      Requests library hook system that can be
                                         used for signal event handling, see more at:
                                         https://requests.readthedocs.io/en/master/user/advanced/#event-hooks
+            query_parser:               'lucene' (default) sends identifiers as
+                                        a boolean query; 'terms' uses Solr's terms
+                                        query parser, which is faster for large sets
+                                        and not limited by maxBooleanClauses
+            as_filter:                  when True identifiers are sent in a filter
+                                        query (`fq`) that is not scored and is
+                                        cached by Solr; use when relevance ranking
+                                        is not needed
+            stream:                     when True response body is not downloaded
+                                        until accessed; use `iter_docs` to parse
+                                        documents incrementally
+            normalize:                  when True ISBNs are normalized to canonical
+                                        form, deduplicated, queried in all forms
+                                        they may be indexed under, and invalid
+                                        ISBNs are skipped; see `match_identifiers`
 
         Returns:
             `requests.Response` object
         """
-
-        if not isinstance(keywords, list):
-            raise BookopsSolrError("ISBN keywords argument must be a list.")
-
-        if not keywords:
-            raise BookopsSolrError("ISBN keywords argument is an empty list.")
-
-        # prep multiple ISBNs
-        keywords_str = " OR ".join(keywords)
-
-        # determine if pass default, custom, or allow all fields in response
-        response_fields = self._determine_response_fields(
-            default_response_fields, response_fields
+        payload = self._isbns_payload(
+            keywords,
+            default_response_fields,
+            response_fields,
+            query_parser,
+            as_filter,
+            normalize,
         )
 
-        payload = {
-            "q": f"isbn:{keywords_str}",
-            "fl": response_fields,
-        }
-
-        response = self._send_request(payload, hooks)
+        response = self._send_request(payload, hooks, stream)
 
         return response
 
+    @instrumented
     def search_reserveId(
         self,
         keyword: str,
         default_response_fields: bool = True,
         response_fields: Union[str, List[str], None] = None,
         hooks: Optional[Dict] = None,
+        stream: bool = False,
     ) -> requests.Response:
         """
         Retrieves documents with matching reserve ID
@@ -352,37 +2034,36 @@ class SolrSession(requests.Session):
             hooks:                      Requests library hook system that can be
                                         used for signal event handling, see more at:
                                         https://requests.readthedocs.io/en/master/user/advanced/#event-hooks
+            stream:                     when True response body is not downloaded
+                                        until accessed; use `iter_docs` to parse
+                                        documents incrementally
 
         Returns:
             `requests.Response` object
         """
-
-        if not isinstance(keyword, str):
-            raise BookopsSolrError("Reserve id keyword argument must be a string.")
-
-        if not keyword:
-            raise BookopsSolrError("Missing reserve id keyword argument.")
-
-        # determine if pass default, custom, or allow all fields in response
-        response_fields = self._determine_response_fields(
-            default_response_fields, response_fields
+        payload = self._reserveId_payload(
+            keyword, default_response_fields, response_fields
         )
 
-        payload = {"q": f"econtrolnumber:{keyword}", "fl": response_fields}
-
-        response = self._send_request(payload, hooks)
+        response = self._send_request(payload, hooks, stream)
 
         return response
 
+    @instrumented
     def search_upcs(
         self,
         keywords: List[str],
         default_response_fields: bool = True,
         response_fields: Union[str, List[str], None] = None,
         hooks: Optional[Dict] = None,
+        query_parser: str = "lucene",
+        as_filter: bool = False,
+        stream: bool = False,
+        normalize: bool = False,
     ) -> requests.Response:
         """
         Retrieves documents with matching UPCs.
+        Use `bulk_search_upcs` for lists larger than `MAX_QUERY_CLAUSES`.
 
         Args:
             keywords:                   list of UPC strings
@@ -394,34 +2075,39 @@ class SolrSession(requests.Session):
             hooks:                      Requests library hook system that can be
                                         used for signal event handling, see more at:
                                         https://requests.readthedocs.io/en/master/user/advanced/#event-hooks
+            query_parser:               'lucene' (default) sends identifiers as
+                                        a boolean query; 'terms' uses Solr's terms
+                                        query parser, which is faster for large sets
+                                        and not limited by maxBooleanClauses
+            as_filter:                  when True identifiers are sent in a filter
+                                        query (`fq`) that is not scored and is
+                                        cached by Solr; use when relevance ranking
+                                        is not needed
+            stream:                     when True response body is not downloaded
+                                        until accessed; use `iter_docs` to parse
+                                        documents incrementally
+            normalize:                  when True UPCs are normalized to canonical
+                                        form, deduplicated, queried in all forms
+                                        they may be indexed under, and invalid
+                                        UPCs are skipped; see `match_identifiers`
 
         Returns:
             `requests.Response` object
         """
-
-        if not isinstance(keywords, list):
-            raise BookopsSolrError("UPC keywords argument must be a list.")
-
-        if not keywords:
-            raise BookopsSolrError("UPC keywords argument is an empty list.")
-
-        # prep multiple UPCs
-        keywords_str = " OR ".join(keywords)
-
-        # determine if pass default, custom, or allow all fields in response
-        response_fields = self._determine_response_fields(
-            default_response_fields, response_fields
+        payload = self._upcs_payload(
+            keywords,
+            default_response_fields,
+            response_fields,
+            query_parser,
+            as_filter,
+            normalize,
         )
 
-        payload = {
-            "q": f"sm_marc_tag_024_a:{keywords_str}",
-            "fl": response_fields,
-        }
-
-        response = self._send_request(payload, hooks)
+        response = self._send_request(payload, hooks, stream)
 
         return response
 
+    @instrumented
     def find_expired_econtent(
         self,
         rows: int = 50,
@@ -429,6 +2115,7 @@ class SolrSession(requests.Session):
         default_response_fields: bool = True,
         response_fields: Union[str, List[str], None] = None,
         hooks: Optional[Dict] = None,
+        stream: bool = False,
     ) -> requests.Response:
         """
         Retrieves Overdrive e-content documents that expired and library has no longer
@@ -446,31 +2133,441 @@ class SolrSession(requests.Session):
             hooks:                      Requests library hook system that can be
                                         used for signal event handling, see more at:
                                         https://requests.readthedocs.io/en/master/user/advanced/#event-hooks
+            stream:                     when True response body is not downloaded
+                                        until accessed; use `iter_docs` to parse
+                                        documents incrementally
 
         Returns:
             `requests.Response` object
         """
+        payload = self._expired_econtent_payload(
+            rows, result_page, default_response_fields, response_fields
+        )
 
-        if not isinstance(rows, int) or not isinstance(result_page, int):
-            raise BookopsSolrError("Invalid type of arguments passed.")
+        response = self._send_request(payload, hooks, stream)
 
-        if rows < 1 or rows > 100:
-            raise BookopsSolrError(
-                "Rows argument must be bigger than 1 and no larger than 100."
-            )
+        return response
 
-        # determine if pass default, custom, or allow all fields in response
-        response_fields = self._determine_response_fields(
-            default_response_fields, response_fields
+    @instrumented
+    def iter_expired_econtent(
+        self,
+        rows: int = 100,
+        default_response_fields: bool = True,
+        response_fields: Union[str, List[str], None] = None,
+        hooks: Optional[Dict] = None,
+    ) -> Iterator[Dict]:
+        """
+        Iterates over all Overdrive e-content documents that expired and library
+        has no longer access to. Results are paged with a cursor, so memory use and
+        cost of each request stay flat regardless of the size of the result set.
+
+        Args:
+            rows:                       number of retrieved documents per request
+            default_response_fields:    when True returns only predetermined fields,
+                                        when False returns all fields unless specified
+                                        in `response_fields` argument
+            response_fields:            fields to be returned as comma separated string,
+                                        or a list of strings
+            hooks:                      Requests library hook system that can be
+                                        used for signal event handling, see more at:
+                                        https://requests.readthedocs.io/en/master/user/advanced/#event-hooks
+
+        Yields:
+            documents as dictionaries
+        """
+
+        payload = self._expired_econtent_payload(
+            rows, 0, default_response_fields, response_fields
         )
 
-        payload = {
-            "q": "digital_copies_owned:0 AND digital_avail_type:Normal",
-            "rows": rows,
-            "start": result_page,
-            "fl": response_fields,
-        }
+        yield from self.iter_query(payload, hooks)
+
+    def iter_docs(self, response: Any, chunk_size: int = 65536) -> Iterator[Dict]:
+        """
+        Parses documents of a response incrementally, decoding already
+        downloaded bodies with the session's JSON decoder; see
+        `bookops_bpl_solr.iter_docs`
+
+        Args:
+            response:               `requests.Response` instance returned by
+                                    a query method, best sent with `stream=True`
+            chunk_size:             number of bytes read from the body at a time
+
+        Yields:
+            documents as dictionaries
+        """
+        # imported here, results module depends on this one
+        from .results import iter_docs
+
+        yield from iter_docs(response, chunk_size, self.json_decoder)
+
+    @instrumented
+    def iter_query(
+        self, payload: Union[Dict, SolrQuery], hooks: Optional[Dict] = None
+    ) -> Iterator[Dict]:
+        """
+        Iterates over all documents matching a custom query. Results are paged
+        with Solr's `cursorMark` sorted by id (any passed `sort` is kept, with id
+        added as a tiebreaker); `start` parameter is ignored.
+
+        Args:
+            payload:                query parameters as dictionary or
+                                    `SolrQuery` instance
+            hooks:                  Requests library hook system that can be
+                                    used for signal event handling, see more at:
+                                    https://requests.readthedocs.io/en/master/user/advanced/#event-hooks
+
+        Yields:
+            documents as dictionaries
+
+        Example:
+            payload = {"q": "material_type:eBook", "rows": 100, "fl": "id,title"}
+            for doc in session.iter_query(payload):
+                print(doc["id"])
+        """
+        if isinstance(payload, SolrQuery):
+            payload = payload.to_payload()
+        if not isinstance(payload, dict) or not payload:
+            raise BookopsSolrError("Missing or invalid payload argument.")
+
+        for data, _ in self._iter_cursor_pages(payload, hooks):
+            yield from data["response"]["docs"]
+
+    @instrumented
+    def count_query(
+        self,
+        query: str = "*:*",
+        filters: Union[str, List[str], None] = None,
+        hooks: Optional[Dict] = None,
+    ) -> int:
+        """
+        Counts documents matching a query without retrieving them (`rows=0`)
+
+        Args:
+            query:                  query as string
+            filters:                filter query or list of filter queries
+                                    applied in addition to the default catalog
+                                    records filter
+            hooks:                  Requests library hook system that can be
+                                    used for signal event handling, see more at:
+                                    https://requests.readthedocs.io/en/master/user/advanced/#event-hooks
+
+        Returns:
+            number of matching documents
+
+        Example:
+            session.count_query("material_type:eBook", filters="eprovider:Overdrive")
+        """
+        payload = self._count_payload(query, filters)
+        return self._parse_count(self._send_request(payload, hooks))
+
+    @instrumented
+    def count_expired_econtent(self, hooks: Optional[Dict] = None) -> int:
+        """
+        Counts Overdrive e-content documents that expired and library has no longer
+        access to, without retrieving them
+
+        Args:
+            hooks:                  Requests library hook system that can be
+                                    used for signal event handling, see more at:
+                                    https://requests.readthedocs.io/en/master/user/advanced/#event-hooks
+
+        Returns:
+            number of expired e-content documents
+        """
+        return self.count_query(self.EXPIRED_ECONTENT_QUERY, hooks=hooks)
+
+    @instrumented
+    def facet_query(
+        self,
+        fields: Union[str, List[str]],
+        query: str = "*:*",
+        filters: Union[str, List[str], None] = None,
+        limit: int = 100,
+        mincount: int = 1,
+        hooks: Optional[Dict] = None,
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        Counts documents matching a query by values of one or more fields
+        in a single request without retrieving documents
+
+        Args:
+            fields:                 field or list of fields to facet on
+            query:                  query as string
+            filters:                filter query or list of filter queries
+                                    applied in addition to the default catalog
+                                    records filter
+            limit:                  maximum number of values per field; -1 for
+                                    all values
+            mincount:               minimum count of returned values
+            hooks:                  Requests library hook system that can be
+                                    used for signal event handling, see more at:
+                                    https://requests.readthedocs.io/en/master/user/advanced/#event-hooks
+
+        Returns:
+            dictionary of fields and their values with counts, sorted by count
+
+        Example:
+            session.facet_query(["material_type", "language"], "publishYear:2024")
+        """
+        payload = self._facet_payload(fields, query, filters, limit, mincount)
+        return self._parse_facets(self._send_request(payload, hooks))
+
+    @instrumented
+    def facet_material_types(
+        self,
+        query: str = "*:*",
+        filters: Union[str, List[str], None] = None,
+        hooks: Optional[Dict] = None,
+    ) -> Dict[str, int]:
+        """
+        Counts documents matching a query by `material_type`
+
+        Args:
+            query:                  query as string
+            filters:                filter query or list of filter queries
+            hooks:                  Requests library hook system
 
+        Returns:
+            dictionary of material types and their counts
+        """
+        facets = self.facet_query("material_type", query, filters, -1, hooks=hooks)
+        return facets.get("material_type", {})
+
+    @instrumented
+    def facet_eproviders(
+        self,
+        query: str = "*:*",
+        filters: Union[str, List[str], None] = None,
+        hooks: Optional[Dict] = None,
+    ) -> Dict[str, int]:
+        """
+        Counts documents matching a query by e-content provider (`eprovider`)
+
+        Args:
+            query:                  query as string
+            filters:                filter query or list of filter queries
+            hooks:                  Requests library hook system
+
+        Returns:
+            dictionary of e-content providers and their counts
+        """
+        facets = self.facet_query("eprovider", query, filters, -1, hooks=hooks)
+        return facets.get("eprovider", {})
+
+    @instrumented
+    def stats_query(
+        self,
+        fields: Union[str, List[str]],
+        query: str = "*:*",
+        filters: Union[str, List[str], None] = None,
+        hooks: Optional[Dict] = None,
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Retrieves statistics (min, max, count, missing, sum, mean, etc.) of
+        numeric or date fields of documents matching a query without retrieving
+        documents
+
+        Args:
+            fields:                 field or list of fields
+            query:                  query as string
+            filters:                filter query or list of filter queries
+                                    applied in addition to the default catalog
+                                    records filter
+            hooks:                  Requests library hook system that can be
+                                    used for signal event handling, see more at:
+                                    https://requests.readthedocs.io/en/master/user/advanced/#event-hooks
+
+        Returns:
+            dictionary of fields and their statistics; `None` for fields with
+            no values
+
+        Example:
+            session.stats_query("publishYear", "material_type:Book")["publishYear"]
+        """
+        payload = self._stats_payload(fields, query, filters)
+        return self._parse_stats(self._send_request(payload, hooks))
+
+    @instrumented
+    def query_columns(
+        self,
+        payload: Union[Dict, SolrQuery],
+        multivalued: Iterable[str] = MULTIVALUED_FIELDS,
+        array_type: str = "list",
+        hooks: Optional[Dict] = None,
+        numeric: Iterable[str] = NUMERIC_FIELDS,
+    ) -> Any:
+        """
+        Retrieves documents matching a custom query in Solr's CSV format
+        (`wt=csv`) and returns them as columns of the requested fields (`fl`),
+        without decoding JSON or creating a dictionary per document
+
+        Args:
+            payload:                query parameters as dictionary or
+                                    `SolrQuery` instance; default response
+                                    fields are returned if `fl` is missing
+            multivalued:            fields returned as lists of values
+            array_type:             'list' returns dictionary of lists,
+                                    'numpy' dictionary of NumPy arrays and
+                                    'arrow' `pyarrow.Table`; the last two
+                                    require optional packages
+            hooks:                  Requests library hook system that can be
+                                    used for signal event handling, see more at:
+                                    https://requests.readthedocs.io/en/master/user/advanced/#event-hooks
+            numeric:                fields converted to numbers by 'numpy' and
+                                    'arrow' array types; other fields are kept
+                                    as strings
+
+        Returns:
+            columns as dictionary of field names and arrays, or `pyarrow.Table`
+
+        Example:
+            columns = session.query_columns(
+                {"q": "material_type:Book", "rows": 5000, "fl": "id,publishYear"}
+            )
+            print(columns["publishYear"][:10])
+        """
+        payload = self._columns_payload(payload, array_type)
         response = self._send_request(payload, hooks)
+        return self._parse_columns(response, multivalued, array_type, numeric)
 
-        return response
+    @instrumented
+    def iter_query_columns(
+        self,
+        payload: Union[Dict, SolrQuery],
+        multivalued: Iterable[str] = MULTIVALUED_FIELDS,
+        array_type: str = "list",
+        hooks: Optional[Dict] = None,
+        numeric: Iterable[str] = NUMERIC_FIELDS,
+    ) -> Iterator[Any]:
+        """
+        Iterates over all documents matching a custom query in pages of `rows`
+        documents returned as columns (see `query_columns`). CSV responses do
+        not include a cursor, so pages are sorted by id and each next page
+        starts after the last id of the previous one; `start` and `sort`
+        parameters are ignored. `id` is always included in the columns.
+
+        Args:
+            payload:                query parameters as dictionary or
+                                    `SolrQuery` instance
+            multivalued:            fields returned as lists of values
+            array_type:             'list', 'numpy' or 'arrow'
+            hooks:                  Requests library hook system that can be
+                                    used for signal event handling, see more at:
+                                    https://requests.readthedocs.io/en/master/user/advanced/#event-hooks
+            numeric:                fields converted to numbers; see
+                                    `query_columns`
+
+        Yields:
+            columns of each page of results
+        """
+        payload = self._columns_payload(payload, array_type)
+        payload = self._merge_with_payload_defaults(payload)
+        payload.pop("start", None)
+        payload["sort"] = "id asc"
+        payload["fl"] = self._include_response_field(payload["fl"], "id")
+        rows = payload["rows"]
+        filters = payload["fq"]
+        if not isinstance(filters, list):
+            filters = [filters]
+
+        last_id = None
+        while True:
+            if last_id is not None:
+                # filter changes with each page, so it is not cached
+                after = json.dumps(last_id)
+                payload["fq"] = filters + [f"{{!cache=false}}id:{{{after} TO *]"]
+            response = self._send_request(payload, hooks)
+            columns = self._parse_columns(response, multivalued, array_type, numeric)
+            length = column_length(columns)
+            if length:
+                yield columns
+            if length < rows:
+                break
+            last_id = last_value(columns, "id")
+
+    def map(
+        self,
+        requests_spec: Iterable[Tuple],
+        max_workers: int = 8,
+        ordered: bool = True,
+    ) -> Iterator[MapResult]:
+        """
+        Runs many query method calls in parallel on a thread pool sharing this
+        session's connection pool, which is enlarged to `max_workers` connections
+        if smaller. Errors are captured per request and do not stop the batch.
+        Requests are consumed lazily, so only a bounded number of them is pending
+        at any time.
+
+        Args:
+            requests_spec:          iterable of tuples consisting of query method
+                                    name, tuple of its positional arguments and
+                                    dictionary of keyword arguments, for example
+                                    ("search_bibNo", ("b123",), {"response_fields":
+                                    "id"}), or of query method name followed by
+                                    its positional arguments, for example
+                                    ("search_controlNo", "ocn123")
+            max_workers:            number of threads; with `concurrency_limiter`
+                                    of the session, requests in flight are
+                                    bounded by its adaptive limit as well, so
+                                    `max_workers` can be set to its `max_limit`
+            ordered:                when True results are yielded in input order,
+                                    when False as soon as they complete
+
+        Yields:
+            `MapResult` instances
+
+        Example:
+            spec = [
+                ("search_controlNo", "ocn437048096"),
+                ("search_reserveId", "8CD53ED9-CEBD-4F78-8BEF-20A58F6F3857"),
+                ("search_isbns", ["9780810984912", "0810984911"]),
+                (
+                    "search_bibNo",
+                    ("b11826159",),
+                    {"default_response_fields": False, "response_fields": "id"},
+                ),
+            ]
+            for result in session.map(spec, max_workers=4):
+                if result.error:
+                    print(result.position, result.error)
+        """
+        if not isinstance(max_workers, int) or max_workers < 1:
+            raise BookopsSolrError("Max workers argument must be a positive integer.")
+
+        self._ensure_pool_size(max_workers)
+        return self._map_results(requests_spec, max_workers, ordered)
+
+    def _map_results(
+        self, requests_spec: Iterable[Tuple], max_workers: int, ordered: bool
+    ) -> Iterator[MapResult]:
+        """
+        Runs requests of `SolrSession.map` on a thread pool, keeping at most
+        four times `max_workers` requests pending
+
+        Yields:
+            `MapResult` instances
+        """
+        max_pending = max_workers * 4
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            if ordered:
+                queue: Deque[Future] = deque()
+                for index, request in enumerate(requests_spec):
+                    queue.append(executor.submit(self._run_map_request, index, request))
+                    if len(queue) >= max_pending:
+                        yield queue.popleft().result()
+                while queue:
+                    yield queue.popleft().result()
+            else:
+                pending: Set[Future] = set()
+                for index, request in enumerate(requests_spec):
+                    pending.add(executor.submit(self._run_map_request, index, request))
+                    if len(pending) >= max_pending:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            yield future.result()
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
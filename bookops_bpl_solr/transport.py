@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module provides transport adapters that record requests to BPL Solr and
+their responses to an archive, and replay them later without network access
+"""
+
+import base64
+from collections import defaultdict
+import gzip
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+
+
+def request_key(request: requests.PreparedRequest) -> str:
+    """
+    Identifies request by its query parameters (payload merged with defaults),
+    regardless of their order and whether they were sent with GET or POST
+
+    Args:
+        request:                `requests.PreparedRequest` instance
+
+    Returns:
+        key as string
+    """
+    return json.dumps(request_params(request))
+
+
+def request_params(request: requests.PreparedRequest) -> List[Tuple[str, str]]:
+    """Returns sorted query parameters of a GET or form-encoded POST request"""
+    query = urlsplit(request.url or "").query
+    params = parse_qsl(query, keep_blank_values=True)
+    if request.body:
+        body = request.body
+        if isinstance(body, bytes):
+            body = body.decode("utf-8")
+        params.extend(parse_qsl(body, keep_blank_values=True))
+    return sorted(params)
+
+
+class RecordingAdapter(HTTPAdapter):
+    """
+    HTTP adapter that sends requests over the network and appends each request
+    and its response to a gzip compressed JSON lines archive. Request headers
+    (including Client-Key) are not recorded. The archive is complete once
+    the adapter (or the session it is mounted on) is closed.
+
+    Example:
+        adapter = RecordingAdapter("solr-archive.jsonl.gz")
+        with SolrSession(
+            authorization="your_client_key", endpoint="solr_endpoint", transport=adapter
+        ) as session:
+            session.search_isbns(["9780810984912"])
+    """
+
+    def __init__(self, path: str, **kwargs: Any):
+        """
+        Args:
+            path:                   path of the archive; recordings are appended
+                                    to an existing archive
+            kwargs:                 `HTTPAdapter` arguments (connection pool
+                                    settings)
+        """
+        super().__init__(**kwargs)
+        self.path = path
+        self.recorded = 0
+        self._file = gzip.open(path, "at", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        """Closes connection pools and the archive"""
+        super().close()
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def send(  # type: ignore[override]
+        self, request: requests.PreparedRequest, **kwargs: Any
+    ) -> requests.Response:
+        started = time.perf_counter()
+        response = super().send(request, **kwargs)
+        # body is downloaded here, also for streamed requests
+        content = response.content
+        elapsed = time.perf_counter() - started
+
+        record: Dict[str, Any] = {
+            "method": request.method,
+            "url": urlunsplit(urlsplit(request.url or "")._replace(query="")),
+            "params": request_params(request),
+            "status": response.status_code,
+            "reason": response.reason,
+            "content_type": response.headers.get("Content-Type"),
+            "elapsed": round(elapsed, 6),
+        }
+        try:
+            record["body"] = content.decode("utf-8")
+        except UnicodeDecodeError:
+            record["body_b64"] = base64.b64encode(content).decode("ascii")
+
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+            self.recorded += 1
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """
+    Transport adapter that answers requests with responses from an archive
+    created by `RecordingAdapter`, without network access. Requests are matched
+    by their query parameters; responses recorded for the same parameters
+    several times are returned in turn. Requests missing from the archive get
+    a 404 "Not Recorded" response.
+
+    Example:
+        adapter = ReplayAdapter("solr-archive.jsonl.gz", timing=1.0)
+        with SolrSession(
+            authorization="any", endpoint="solr_endpoint", transport=adapter
+        ) as session:
+            session.search_isbns(["9780810984912"])
+    """
+
+    def __init__(self, path: str, timing: Optional[float] = None):
+        """
+        Args:
+            path:                   path of the archive
+            timing:                 multiplier of recorded response times;
+                                    1.0 replays with original timing, 0.5 twice
+                                    as fast; `None` (default) responds
+                                    immediately
+        """
+        super().__init__()
+        self.path = path
+        self.timing = timing
+        self.replayed = 0
+        self.missed = 0
+        self._records: Dict[str, List[Dict]] = defaultdict(list)
+        self._positions: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                self._records[json.dumps(record["params"])].append(record)
+
+    def __len__(self) -> int:
+        """Number of recorded responses"""
+        return sum(len(records) for records in self._records.values())
+
+    def close(self) -> None:
+        pass
+
+    def send(  # type: ignore[override]
+        self, request: requests.PreparedRequest, **kwargs: Any
+    ) -> requests.Response:
+        key = request_key(request)
+        with self._lock:
+            records = self._records.get(key)
+            if records:
+                position = self._positions[key]
+                self._positions[key] = position + 1
+                record: Optional[Dict] = records[position % len(records)]
+                self.replayed += 1
+            else:
+                record = None
+                self.missed += 1
+
+        response = requests.Response()
+        response.url = request.url or ""
+        response.request = request
+        response.connection = self  # type: ignore[assignment]
+        response.encoding = "utf-8"
+        response._content_consumed = True  # type: ignore[attr-defined]
+
+        if record is None:
+            response.status_code = 404
+            response.reason = "Not Recorded"
+            response._content = b""
+            return response
+
+        if self.timing:
+            time.sleep(record["elapsed"] * self.timing)
+
+        response.status_code = record["status"]
+        response.reason = record["reason"]
+        if record["content_type"]:
+            response.headers["Content-Type"] = record["content_type"]
+        if "body" in record:
+            response._content = record["body"].encode("utf-8")
+        else:
+            response._content = base64.b64decode(record["body_b64"])
+        return response
@@ -1,5 +1,8 @@
 # -*- coding: utf-8 -*-
 
+import json
+import re
+
 import requests
 import pytest
 
@@ -27,6 +30,159 @@ class MockSuccessfulHTTP200SessionResponse:
         self.status_code = 200
 
 
+class MockSolrHTTP200Response:
+    def __init__(self, docs, num_found, next_cursor_mark=None):
+        self.status_code = 200
+        self._data = {
+            "response": {
+                "numFound": num_found,
+                "start": 0,
+                "numFoundExact": True,
+                "docs": docs,
+            }
+        }
+        if next_cursor_mark is not None:
+            self._data["nextCursorMark"] = next_cursor_mark
+
+    @property
+    def content(self):
+        return json.dumps(self._data).encode("utf-8")
+
+    def json(self):
+        return self._data
+
+
+class MockSolr:
+    """
+    Imitates BPL Solr handling of `field:(a OR b)` and `{!terms f=field}a,b`
+    queries (in `q` or `fq`) against a list of documents. Any other query
+    matches all documents.
+    Supports paging with `start` and with `cursorMark` (sorted by id).
+    """
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.requests = []
+
+    def parse_query(self, query):
+        match = re.match(r"(\w+):\((.*)\)$", query)
+        if match:
+            return match.group(1), set(match.group(2).split(" OR "))
+        match = re.match(r"\{!terms f=(\w+)\}(.*)$", query)
+        if match:
+            return match.group(1), set(match.group(2).split(","))
+        return None, None
+
+    def matching_docs(self, params):
+        queries = [params["q"]]
+        if isinstance(params.get("fq"), list):
+            queries.extend(params["fq"])
+        for query in queries:
+            field, keywords = self.parse_query(query)
+            if field:
+                break
+        else:
+            return list(self.docs)
+        found = []
+        for doc in self.docs:
+            values = doc.get(field)
+            if not isinstance(values, list):
+                values = [values]
+            if keywords.intersection(values):
+                found.append(doc)
+        return found
+
+    def get(self, url, params=None, **kwargs):
+        self.requests.append(dict(params))
+        found = self.matching_docs(params)
+        rows = params.get("rows", 10)
+        if "cursorMark" in params:
+            cursor = params["cursorMark"]
+            found = sorted(found, key=lambda d: d["id"])
+            page = [d for d in found if cursor == "*" or d["id"] > cursor][:rows]
+            next_cursor = page[-1]["id"] if page else cursor
+            return MockSolrHTTP200Response(page, len(found), next_cursor)
+        start = params.get("start", 0)
+        return MockSolrHTTP200Response(found[start : start + rows], len(found))
+
+
+@pytest.fixture
+def mock_solr(monkeypatch):
+    def _mock_solr(docs):
+        solr = MockSolr(docs)
+
+        def mock_get(session, *args, **kwargs):
+            return solr.get(*args, **kwargs)
+
+        monkeypatch.setattr(requests.Session, "get", mock_get)
+        return solr
+
+    return _mock_solr
+
+
+@pytest.fixture
+def mock_solr_json(monkeypatch):
+    """
+    Mocks `requests.Session.get` responding with given decoded body;
+    returns list of sent query parameters
+    """
+
+    def _mock_solr_json(data):
+        sent = []
+
+        def mock_get(session, url, params=None, **kwargs):
+            sent.append(params)
+            response = requests.Response()
+            response.status_code = 200
+            response._content = json.dumps(data).encode("utf-8")
+            return response
+
+        monkeypatch.setattr(requests.Session, "get", mock_get)
+        return sent
+
+    return _mock_solr_json
+
+
+@pytest.fixture
+def mock_sequence(monkeypatch):
+    """
+    Mocks consecutive outcomes of `requests.Session.get`; each outcome is
+    an HTTP status code, a tuple of status code and response headers,
+    or an exception class to be raised
+    """
+
+    def _mock_sequence(outcomes):
+        outcomes = iter(outcomes)
+        calls = []
+
+        def mock_get(session, url, **kwargs):
+            calls.append(dict(kwargs, url=url))
+            outcome = next(outcomes)
+            if isinstance(outcome, type):
+                raise outcome
+            headers = {}
+            if isinstance(outcome, tuple):
+                outcome, headers = outcome
+            response = requests.Response()
+            response.status_code = outcome
+            response.headers.update(headers)
+            response._content = b'{"response":{"numFound":0,"docs":[]}}'
+            response._content_consumed = True
+            return response
+
+        monkeypatch.setattr(requests.Session, "get", mock_get)
+        return calls
+
+    return _mock_sequence
+
+
+@pytest.fixture
+def mock_sleep(monkeypatch):
+    delays = []
+    monkeypatch.setattr("time.sleep", lambda delay: delays.append(delay))
+    return delays
+
+
 @pytest.fixture
 def mock_unexpected_error(monkeypatch):
     monkeypatch.setattr("requests.Session.get", MockUnexpectedException)
@@ -50,6 +206,37 @@ def mock_successful_session_get_response(monkeypatch):
     monkeypatch.setattr(requests.Session, "get", mock_api_response)
 
 
+@pytest.fixture
+def local_solr():
+    """
+    Runs a local HTTP server responding to every GET request with an empty
+    Solr response; yields its URL
+    """
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            body = b'{"response":{"numFound":0,"start":0,"docs":[]}}'
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/select"
+    server.shutdown()
+    server.server_close()
+
+
 @pytest.fixture
 def default_payload():
     return {
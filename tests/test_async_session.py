@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tests async_session.py module
+"""
+import asyncio
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from bookops_bpl_solr.async_session import AsyncSolrSession  # noqa: E402
+from bookops_bpl_solr.limiters import AdaptiveLimiter  # noqa: E402
+from bookops_bpl_solr.session import BookopsSolrError  # noqa: E402
+from bookops_bpl_solr import __title__, __version__  # noqa: E402
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def mock_transport(sent, status_code=200):
+    def handler(request):
+        sent.append(request)
+        return httpx.Response(status_code, json={"response": {"numFound": 0}})
+
+    return httpx.MockTransport(handler)
+
+
+def failing_transport(exc):
+    def handler(request):
+        raise exc("error", request=request)
+
+    return httpx.MockTransport(handler)
+
+
+class TestAsyncSolrSession:
+    """
+    Tests AsyncSolrSession class
+    """
+
+    def test_init_headers(self):
+        sent = []
+
+        async def main():
+            async with AsyncSolrSession(
+                "my_client_key", "https://example.com", transport=mock_transport(sent)
+            ) as session:
+                await session.search_bibNo("b123456789")
+
+        run(main())
+        assert sent[0].headers["Client-Key"] == "my_client_key"
+        assert sent[0].headers["User-Agent"] == f"{__title__}/{__version__}"
+
+    @pytest.mark.parametrize("arg", [None, "", 123])
+    def test_init_argument_authorization_exception(self, arg):
+        err_msg = "Invalid authorization. Argument must be a Client-Key string."
+        with pytest.raises(BookopsSolrError) as exc:
+            AsyncSolrSession(authorization=arg, endpoint="example.com")
+        assert err_msg in str(exc.value)
+
+    @pytest.mark.parametrize("arg", [0, -1, "5", None])
+    def test_init_concurrency_exception(self, arg):
+        err_msg = "Concurrency argument must be a positive integer."
+        with pytest.raises(BookopsSolrError) as exc:
+            AsyncSolrSession("my_client_key", "example.com", concurrency=arg)
+        assert err_msg in str(exc.value)
+
+    @pytest.mark.parametrize(
+        "arg,expectation",
+        [
+            ((3, 5), httpx.Timeout(5, connect=3)),
+            (3, httpx.Timeout(3)),
+            (None, httpx.Timeout(None)),
+        ],
+    )
+    def test_prep_timeout(self, arg, expectation):
+        session = AsyncSolrSession("my_client_key", "example.com")
+        assert session._prep_timeout(arg) == expectation
+
+    @pytest.mark.parametrize(
+        "method,args,expectation",
+        [
+            ("search_bibNo", ("b123456789",), "id:12345678"),
+            ("search_controlNo", ("ocn123",), "ss_marc_tag_001:ocn123"),
+            ("search_isbns", (["978123", "978456"],), "isbn:978123 OR 978456"),
+            ("search_reserveId", ("ABC-123",), "econtrolnumber:ABC-123"),
+            ("search_upcs", (["0853912"],), "sm_marc_tag_024_a:0853912"),
+            (
+                "find_expired_econtent",
+                (),
+                "digital_copies_owned:0 AND digital_avail_type:Normal",
+            ),
+        ],
+    )
+    def test_search_methods(self, method, args, expectation):
+        sent = []
+
+        async def main():
+            async with AsyncSolrSession(
+                "my_client_key", "https://example.com", transport=mock_transport(sent)
+            ) as session:
+                return await getattr(session, method)(*args)
+
+        response = run(main())
+        assert response.status_code == 200
+        assert sent[0].method == "GET"
+        assert sent[0].url.params["q"] == expectation
+        assert sent[0].url.params["fq"] == "ss_type:catalog"
+
+    def test_search_isbns_terms_filter(self):
+        sent = []
+
+        async def main():
+            async with AsyncSolrSession(
+                "my_client_key", "https://example.com", transport=mock_transport(sent)
+            ) as session:
+                return await session.search_isbns(
+                    ["978123", "978456"], query_parser="terms", as_filter=True
+                )
+
+        run(main())
+        assert sent[0].url.params["q"] == "*:*"
+        assert sent[0].url.params.get_list("fq") == [
+            "ss_type:catalog",
+            "{!terms f=isbn}978123,978456",
+        ]
+
+    def test_search_bibNo_invalid_keyword(self):
+        session = AsyncSolrSession("my_client_key", "example.com")
+        with pytest.raises(BookopsSolrError) as exc:
+            run(session.search_bibNo(""))
+        assert "Missing keyword argument." in str(exc.value)
+
+    def test_send_request_long_payload_sent_as_post(self, monkeypatch):
+        monkeypatch.setattr(AsyncSolrSession, "MAX_URL_LENGTH", 20)
+        sent = []
+
+        async def main():
+            async with AsyncSolrSession(
+                "my_client_key", "https://example.com", transport=mock_transport(sent)
+            ) as session:
+                await session.search_isbns(["9781680502404", "9781419741890"])
+
+        run(main())
+        assert sent[0].method == "POST"
+        assert b"9781680502404" in sent[0].content
+
+    @pytest.mark.parametrize("arg", [{}, None, "some_str"])
+    def test_send_request_payload_errors(self, arg):
+        session = AsyncSolrSession("my_client_key", "example.com")
+        with pytest.raises(BookopsSolrError) as exc:
+            run(session._send_request(arg))
+        assert "Missing or invalid payload argument." in str(exc.value)
+
+    @pytest.mark.parametrize("arg", [httpx.ReadTimeout, httpx.ConnectError])
+    def test_send_request_connection_errors(self, arg):
+        async def main():
+            async with AsyncSolrSession(
+                "my_client_key", "https://example.com", transport=failing_transport(arg)
+            ) as session:
+                await session.search_bibNo("b123456789")
+
+        with pytest.raises(BookopsSolrError) as exc:
+            run(main())
+        assert "Connection error" in str(exc.value)
+
+    def test_send_request_unexpected_error(self):
+        def handler(request):
+            raise ValueError
+
+        async def main():
+            async with AsyncSolrSession(
+                "my_client_key",
+                "https://example.com",
+                transport=httpx.MockTransport(handler),
+            ) as session:
+                await session.search_bibNo("b123456789")
+
+        with pytest.raises(BookopsSolrError) as exc:
+            run(main())
+        assert "Unexpected error" in str(exc.value)
+
+    def test_coalesce(self):
+        sent = []
+
+        async def handler(request):
+            sent.append(request)
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json={})
+
+        async def main():
+            async with AsyncSolrSession(
+                "my_client_key",
+                "https://example.com",
+                transport=httpx.MockTransport(handler),
+                coalesce=True,
+            ) as session:
+                responses = await asyncio.gather(
+                    *[session.search_bibNo("b123456789") for _ in range(5)],
+                    session.search_bibNo("b234567890"),
+                )
+                return responses, session.single_flight.shared
+
+        responses, shared = run(main())
+        assert len(sent) == 2
+        assert shared == 4
+        assert all(response is responses[0] for response in responses[:5])
+
+    def test_concurrency_limit(self):
+        in_flight = []
+        peak = []
+
+        async def handler(request):
+            in_flight.append(request)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.01)
+            in_flight.pop()
+            return httpx.Response(200, json={})
+
+        async def main():
+            async with AsyncSolrSession(
+                "my_client_key",
+                "https://example.com",
+                concurrency=3,
+                transport=httpx.MockTransport(handler),
+            ) as session:
+                await asyncio.gather(
+                    *[session.search_bibNo(12345678 + n) for n in range(10)]
+                )
+
+        run(main())
+        assert max(peak) == 3
+
+    def test_count_and_facet_queries(self):
+        sent = []
+
+        def handler(request):
+            sent.append(request)
+            return httpx.Response(
+                200,
+                json={
+                    "response": {"numFound": 12, "docs": []},
+                    "facet_counts": {
+                        "facet_fields": {
+                            "eprovider": ["Overdrive", 8, "cloudLibrary", 4]
+                        }
+                    },
+                },
+            )
+
+        async def main():
+            async with AsyncSolrSession(
+                "my_client_key",
+                "https://example.com",
+                transport=httpx.MockTransport(handler),
+            ) as session:
+                return await asyncio.gather(
+                    session.count_expired_econtent(),
+                    session.facet_eproviders(),
+                )
+
+        count, facets = run(main())
+        assert count == 12
+        assert facets == {"Overdrive": 8, "cloudLibrary": 4}
+        assert all(request.url.params["rows"] == "0" for request in sent)
+        assert sent[1].url.params.get_list("facet.field") == ["eprovider"]
+
+    @pytest.mark.parametrize("outcome", [httpx.ConnectError, 503])
+    def test_send_request_fails_over(self, outcome):
+        sent = []
+
+        def handler(request):
+            sent.append(request.url.host)
+            if request.url.host == "a.example.com":
+                if isinstance(outcome, int):
+                    return httpx.Response(outcome)
+                raise outcome("error", request=request)
+            return httpx.Response(200, json={})
+
+        async def main():
+            async with AsyncSolrSession(
+                "my_client_key",
+                ["https://a.example.com", "https://b.example.com"],
+                transport=httpx.MockTransport(handler),
+            ) as session:
+                response = await session.search_bibNo("b123456789")
+                return response, session.endpoint_stats()
+
+        response, stats = run(main())
+        assert response.status_code == 200
+        assert sent == ["a.example.com", "b.example.com"]
+        assert stats["https://a.example.com"]["failures"] == 1
+        assert stats["https://b.example.com"]["outstanding"] == 0
+
+    def test_concurrency_limiter(self):
+        peak = []
+        inflight = [0]
+
+        async def handler(request):
+            inflight[0] += 1
+            peak.append(inflight[0])
+            await asyncio.sleep(0.01)
+            inflight[0] -= 1
+            # first request to complete reports overload
+            status_code = 503 if inflight[0] == 3 and len(peak) == 4 else 200
+            return httpx.Response(status_code, json={})
+
+        limiter = AdaptiveLimiter(initial_limit=4)
+
+        async def main():
+            async with AsyncSolrSession(
+                "my_client_key",
+                "https://example.com",
+                transport=httpx.MockTransport(handler),
+                concurrency_limiter=limiter,
+            ) as session:
+                await asyncio.gather(
+                    *[session.search_bibNo(f"b1234567{i}") for i in range(12)]
+                )
+
+        run(main())
+        assert max(peak) == 4
+        # requests sent after the overload are bounded by the decreased limit
+        assert max(peak[4:]) <= 3
+        assert limiter.decreases == 1
+        assert limiter.inflight == 0
+
+    def test_concurrency_limiter_balancer_error(self, monkeypatch):
+        limiter = AdaptiveLimiter(initial_limit=4)
+
+        def broken(*args, **kwargs):
+            raise RuntimeError("no endpoint")
+
+        async def main():
+            async with AsyncSolrSession(
+                "my_client_key",
+                "https://example.com",
+                transport=httpx.MockTransport(lambda r: httpx.Response(200)),
+                concurrency_limiter=limiter,
+            ) as session:
+                monkeypatch.setattr(session.balancer, "acquire", broken)
+                with pytest.raises(RuntimeError):
+                    await session.search_bibNo("b12345678")
+
+        run(main())
+        assert limiter.inflight == 0
+        assert limiter.limit == 4
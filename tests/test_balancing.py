@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tests balancing.py module
+"""
+import pytest
+
+from bookops_bpl_solr.balancing import EndpointPool
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("time.monotonic", lambda: now[0])
+    return now
+
+
+class TestEndpointPool:
+    def test_invalid_strategy(self):
+        with pytest.raises(ValueError):
+            EndpointPool(["a", "b"], strategy="random")
+
+    def test_least_outstanding(self):
+        pool = EndpointPool(["a", "b", "c"])
+        first = pool.acquire()
+        second = pool.acquire()
+        third = pool.acquire()
+        assert {first.url, second.url, third.url} == {"a", "b", "c"}
+        pool.release(second, 0.1, False)
+        assert pool.acquire().url == second.url
+
+    def test_ties_broken_in_turn(self):
+        pool = EndpointPool(["a", "b"])
+        urls = []
+        for _ in range(4):
+            endpoint = pool.acquire()
+            urls.append(endpoint.url)
+            pool.release(endpoint, 0.1, False)
+        assert urls == ["a", "b", "a", "b"]
+
+    def test_latency(self):
+        pool = EndpointPool(["slow", "fast"], strategy="latency")
+        for url, seconds in (("slow", 1.95), ("fast", 0.1)):
+            endpoint = next(e for e in pool.endpoints if e.url == url)
+            endpoint.outstanding += 1
+            pool.release(endpoint, seconds, False)
+        # fast endpoint is preferred until its requests in flight make
+        # the expected wait longer than on the slow one
+        assert [pool.acquire().url for _ in range(19)] == ["fast"] * 19
+        assert pool.acquire().url == "slow"
+
+    def test_latency_untried_endpoint_first(self):
+        pool = EndpointPool(["a", "b"], strategy="latency")
+        endpoint = pool.acquire()
+        pool.release(endpoint, 0.1, False)
+        assert pool.acquire().url != endpoint.url
+
+    def test_latency_moving_average(self):
+        pool = EndpointPool(["a"])
+        endpoint = pool.acquire()
+        pool.release(endpoint, 1.0, False)
+        assert endpoint.latency == 1.0
+        pool.acquire()
+        pool.release(endpoint, 2.0, False)
+        assert endpoint.latency == pytest.approx(1.3)
+
+    def test_exclude(self):
+        pool = EndpointPool(["a", "b"])
+        assert [pool.acquire(exclude={"a"}).url for _ in range(3)] == ["b"] * 3
+
+    def test_exclude_all(self):
+        pool = EndpointPool(["a", "b"])
+        assert pool.acquire(exclude={"a", "b"}).url in ("a", "b")
+
+    def test_ejection(self, clock):
+        pool = EndpointPool(["a", "b"], eject_after=2, eject_seconds=10)
+        a = pool.endpoints[0]
+        for _ in range(2):
+            pool.acquire(exclude={"b"})
+            pool.release(a, 3.0, True)
+        assert pool.stats()["a"]["ejected"] is True
+        assert [pool.acquire().url for _ in range(3)] == ["b"] * 3
+
+        clock[0] += 10
+        assert pool.stats()["a"]["ejected"] is False
+        assert pool.acquire().url == "a"
+
+    def test_success_resets_failures(self):
+        pool = EndpointPool(["a", "b"], eject_after=2)
+        a = pool.endpoints[0]
+        for failed in (True, False, True):
+            pool.acquire(exclude={"b"})
+            pool.release(a, 0.1, failed)
+        assert pool.stats()["a"]["ejected"] is False
+        assert a.failures == 2
+
+    def test_cancel(self):
+        pool = EndpointPool(["a"], strategy="latency")
+        a = pool.acquire()
+        pool.cancel(a)
+        assert pool.stats()["a"]["outstanding"] == 0
+        assert a.latency is None
+        assert a.failures == 0
+
+    def test_all_ejected_uses_first_to_recover(self, clock):
+        pool = EndpointPool(["a", "b"], eject_after=1, eject_seconds=10)
+        a, b = pool.endpoints
+        pool.acquire(exclude={"a"})
+        pool.release(b, 0.1, True)
+        clock[0] += 1
+        pool.acquire(exclude={"b"})
+        pool.release(a, 0.1, True)
+        assert pool.acquire().url == "b"
+
+    def test_stats(self):
+        pool = EndpointPool(["a", "b"])
+        endpoint = pool.acquire(exclude={"b"})
+        pool.release(endpoint, 0.5, False)
+        pool.acquire(exclude={"b"})
+        assert pool.stats() == {
+            "a": {
+                "outstanding": 1,
+                "latency": 0.5,
+                "requests": 2,
+                "failures": 0,
+                "ejected": False,
+            },
+            "b": {
+                "outstanding": 0,
+                "latency": None,
+                "requests": 0,
+                "failures": 0,
+                "ejected": False,
+            },
+        }
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tests benchmarks harness
+"""
+import pytest
+
+from benchmarks.run_benchmarks import format_table, percentile, run
+from benchmarks.stub_solr import StubSolr, parse_identifiers
+from bookops_bpl_solr import SolrSession
+
+
+@pytest.mark.parametrize(
+    "arg,expectation",
+    [
+        (["isbn:(978123 OR 978456)"], ("isbn", ["978123", "978456"])),
+        (["isbn:978123 OR 978456"], ("isbn", ["978123", "978456"])),
+        (["id:12345678"], ("id", ["12345678"])),
+        (["*:*", "ss_type:catalog", "{!terms f=isbn}1,2"], ("isbn", ["1", "2"])),
+        (["digital_copies_owned:0 AND digital_avail_type:Normal"], (None, [])),
+        (["*:*", "ss_type:catalog"], (None, [])),
+    ],
+)
+def test_parse_identifiers(arg, expectation):
+    assert parse_identifiers(arg) == expectation
+
+
+def test_percentile():
+    values = [float(n) for n in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([1.0], 99) == 1.0
+
+
+def test_stub_solr_responses():
+    with StubSolr(doc_size=300, num_found=25) as endpoint:
+        with SolrSession("my_client_key", endpoint) as session:
+            result = session.bulk_search_isbns(["9781680502404", "9780810984912"])
+            docs = list(session.iter_query({"q": "*:*", "rows": 10}))
+            response = session.search_bibNo("b123456789")
+    assert result["matches"]["9781680502404"]
+    assert len(docs) == 25
+    assert response.json()["response"]["docs"][0]["id"] == "12345678"
+    assert 250 < len(response.content) < 500
+
+
+def test_run():
+    results = run(iterations=2, bulk_size=10, rows=20)
+    assert "bulk_search_isbns" in results
+    assert all(data["docs"] > 0 for data in results.values())
+    assert format_table(results).startswith("method")
+
+
+def test_run_only():
+    assert list(run(iterations=1, only=["search_bibNo"])) == ["search_bibNo"]
@@ -11,3 +11,15 @@ def test_SolrSession_top_import():
 
 def test_BookopsSolrError_import():
     from bookops_bpl_solr import BookopsSolrError  # noqa: F401
+
+
+def test_AsyncSolrSession_top_import():
+    from bookops_bpl_solr import AsyncSolrSession  # noqa: F401
+
+
+def test_caches_top_import():
+    from bookops_bpl_solr import MemoryCache, SQLiteCache  # noqa: F401
+
+
+def test_results_top_import():
+    from bookops_bpl_solr import SolrDoc, SolrResult, iter_docs  # noqa: F401
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tests cache.py module
+"""
+import pytest
+import requests
+
+from bookops_bpl_solr.cache import (
+    BaseCache,
+    MemoryCache,
+    SQLiteCache,
+    cache_key,
+)
+
+
+def make_response(content=b'{"response":{"numFound":1,"docs":[{"id":"1"}]}}', code=200):
+    response = requests.Response()
+    response.status_code = code
+    response.url = "https://example.com?q=id%3A1"
+    response.headers["Content-Type"] = "application/json"
+    response._content = content
+    return response
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def cache_factory(request, tmp_path):
+    def _factory(**kwargs):
+        if request.param == "memory":
+            return MemoryCache(**kwargs)
+        return SQLiteCache(str(tmp_path / "cache.db"), **kwargs)
+
+    return _factory
+
+
+def test_cache_key_sorts_params():
+    assert cache_key("url", {"q": "id:1", "rows": 10}) == cache_key(
+        "url", {"rows": 10, "q": "id:1"}
+    )
+
+
+def test_cache_key_ignores_none_values():
+    assert cache_key("url", {"q": "id:1", "fl": None}) == cache_key(
+        "url", {"q": "id:1"}
+    )
+
+
+def test_cache_key_differs_by_endpoint():
+    assert cache_key("url1", {"q": "id:1"}) != cache_key("url2", {"q": "id:1"})
+
+
+class TestCaches:
+    def test_get_miss(self, cache_factory):
+        cache = cache_factory()
+        assert cache.get("key") is None
+        assert cache.stats() == {"hits": 0, "misses": 1, "size": 0}
+
+    def test_set_and_get(self, cache_factory):
+        cache = cache_factory()
+        cache.set("key", make_response())
+        response = cache.get("key")
+        assert isinstance(response, requests.Response)
+        assert response.status_code == 200
+        assert response.url == "https://example.com?q=id%3A1"
+        assert response.headers["Content-Type"] == "application/json"
+        assert response.json()["response"]["docs"] == [{"id": "1"}]
+        assert cache.stats() == {"hits": 1, "misses": 0, "size": 1}
+
+    def test_unsuccessful_response_not_cached(self, cache_factory):
+        cache = cache_factory()
+        cache.set("key", make_response(b"error", code=500))
+        assert len(cache) == 0
+
+    def test_expired(self, cache_factory, monkeypatch):
+        cache = cache_factory(ttl=10)
+        monkeypatch.setattr("time.time", lambda: 1000.0)
+        cache.set("key", make_response())
+        monkeypatch.setattr("time.time", lambda: 1011.0)
+        assert cache.get("key") is None
+        assert len(cache) == 0
+
+    def test_no_ttl(self, cache_factory):
+        cache = cache_factory(ttl=None)
+        cache.set("key", make_response())
+        assert cache.get("key") is not None
+
+    def test_negative_ttl(self, cache_factory, monkeypatch):
+        cache = cache_factory(ttl=100, negative_ttl=10)
+        monkeypatch.setattr("time.time", lambda: 1000.0)
+        cache.set("hits", make_response())
+        cache.set("no_hits", make_response(b'{"response":{"numFound":0,"docs":[]}}'))
+        monkeypatch.setattr("time.time", lambda: 1050.0)
+        assert cache.get("hits") is not None
+        assert cache.get("no_hits") is None
+
+    def test_negative_caching_disabled(self, cache_factory):
+        cache = cache_factory(negative_ttl=0)
+        cache.set("no_hits", make_response(b'{"response":{"numFound":0,"docs":[]}}'))
+        assert len(cache) == 0
+
+    def test_lru_eviction(self, cache_factory, monkeypatch):
+        cache = cache_factory(maxsize=2)
+        clock = iter(range(1000, 2000))
+        monkeypatch.setattr("time.time", lambda: float(next(clock)))
+        cache.set("a", make_response())
+        cache.set("b", make_response())
+        cache.get("a")
+        cache.set("c", make_response())
+        assert len(cache) == 2
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+
+    def test_clear(self, cache_factory):
+        cache = cache_factory()
+        cache.set("key", make_response())
+        cache.clear()
+        assert len(cache) == 0
+
+
+def test_sqlite_cache_persists(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = SQLiteCache(path)
+    cache.set("key", make_response())
+    cache.close()
+    assert SQLiteCache(path).get("key").json()["response"]["numFound"] == 1
+
+
+def test_base_cache_is_abstract():
+    with pytest.raises(TypeError):
+        BaseCache()
+
+
+def test_incomplete_cache_backend_fails_on_creation():
+    class IncompleteCache(BaseCache):
+        def _load(self, key):
+            return None
+
+        def clear(self):
+            pass
+
+    with pytest.raises(TypeError) as exc:
+        IncompleteCache()
+    assert "_store" in str(exc.value)
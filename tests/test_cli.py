@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tests cli.py module
+"""
+import csv
+import io
+import json
+
+import pytest
+
+from bookops_bpl_solr.cli import batched, main, read_identifiers, run, Progress
+from bookops_bpl_solr.session import SolrSession
+
+
+DOCS = [
+    {"id": "12345678", "title": "Foo", "isbn": ["9781680502404", "1680502409"]},
+    {"id": "23456789", "title": "Bar", "isbn": ["9780810984912"]},
+]
+
+
+@pytest.fixture
+def solr(mock_solr):
+    return mock_solr(DOCS)
+
+
+@pytest.fixture
+def env(monkeypatch):
+    monkeypatch.setenv("BPL_SOLR_ENDPOINT", "https://example.com")
+    monkeypatch.setenv("BPL_SOLR_CLIENT_KEY", "my_client_key")
+
+
+def test_read_identifiers():
+    file = io.StringIO("b123456789\n\n  9781680502404 \n")
+    assert list(read_identifiers(file)) == ["b123456789", "9781680502404"]
+
+
+def test_batched():
+    assert list(batched(iter("abcde"), 2)) == [["a", "b"], ["c", "d"], ["e"]]
+
+
+def test_run_bibs_jsonl(solr):
+    output = io.StringIO()
+    with SolrSession("my_client_key", "example.com") as session:
+        processed, errors = run(
+            session,
+            "bibs",
+            ["b123456789", "bad", "b234567890", "34567890"],
+            output,
+            batch_size=2,
+            fields=["id", "title"],
+        )
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert (processed, errors) == (4, 1)
+    assert {r["input"]: len(r["docs"]) for r in records} == {
+        "b123456789": 1,
+        "bad": 0,
+        "b234567890": 1,
+        "34567890": 0,
+    }
+    assert [r["error"] for r in records if r["input"] == "bad"] == [
+        "Invalid Sierra bib number passed."
+    ]
+    assert [r["q"] for r in solr.requests] == [
+        "id:(12345678)",
+        "id:(23456789 OR 34567890)",
+    ]
+
+
+def test_run_bibs_input_order(solr):
+    output = io.StringIO()
+    with SolrSession("my_client_key", "example.com") as session:
+        processed, errors = run(
+            session,
+            "bibs",
+            ["b123456789", "bad", "b234567890", "b123456789", "worse"],
+            output,
+            workers=2,
+            batch_size=1,
+        )
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert (processed, errors) == (5, 2)
+    assert [r["input"] for r in records] == [
+        "b123456789",
+        "bad",
+        "b234567890",
+        "b123456789",
+        "worse",
+    ]
+    assert [len(r["docs"]) for r in records] == [1, 0, 1, 1, 0]
+    assert len(solr.requests) == 3
+
+
+def test_run_isbns_csv(solr):
+    output = io.StringIO()
+    with SolrSession("my_client_key", "example.com") as session:
+        run(
+            session,
+            "isbns",
+            ["1680502409", "9780810984912", "9781419741890", "foo"],
+            output,
+            output_format="csv",
+            fields=["id", "isbn"],
+        )
+    rows = list(csv.reader(io.StringIO(output.getvalue())))
+    assert rows == [
+        ["input", "id", "isbn", "error"],
+        ["1680502409", "12345678", "9781680502404; 1680502409", ""],
+        ["9780810984912", "23456789", "9780810984912", ""],
+        ["9781419741890", "", "", ""],
+        ["foo", "", "", "Invalid ISBN."],
+    ]
+
+
+def test_run_controls_with_errors(mock_timeout):
+    output = io.StringIO()
+    with SolrSession("my_client_key", "example.com") as session:
+        processed, errors = run(session, "controls", ["ocn1", "ocn2"], output)
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert (processed, errors) == (2, 2)
+    assert [r["input"] for r in records] == ["ocn1", "ocn2"]
+    assert records[0]["error"].startswith("Connection error")
+
+
+def test_progress():
+    stream = io.StringIO()
+    progress = Progress(stream)
+    progress.update([{"docs": [{}], "error": None}, {"docs": [], "error": "x"}])
+    progress.finish()
+    assert stream.getvalue().startswith("\r2 processed, 1 found, 1 errors, ")
+    assert stream.getvalue().endswith("/s\n")
+
+
+def test_main(solr, env, tmp_path, capsys):
+    infile = tmp_path / "isbns.txt"
+    infile.write_text("9781680502404\n9780810984912\n")
+    outfile = tmp_path / "out.jsonl"
+    status = main(["isbns", str(infile), "-o", str(outfile), "-w", "2"])
+    records = [json.loads(line) for line in outfile.read_text().splitlines()]
+    assert status == 0
+    assert [r["docs"][0]["id"] for r in records] == ["12345678", "23456789"]
+    assert "2 processed, 2 found, 0 errors" in capsys.readouterr().err
+
+
+def test_main_adaptive(solr, env, monkeypatch, capsys):
+    monkeypatch.setattr("sys.stdin", io.StringIO("9781680502404\n"))
+    assert main(["isbns", "-q", "--adaptive", "-w", "16"]) == 0
+    assert json.loads(capsys.readouterr().out)["docs"][0]["id"] == "12345678"
+
+
+def test_main_stdin_stdout(solr, env, monkeypatch, capsys):
+    monkeypatch.setattr("sys.stdin", io.StringIO("ocn123\n"))
+    status = main(["controls", "--quiet", "--format", "csv", "--fields", "id"])
+    captured = capsys.readouterr()
+    assert status == 0
+    assert captured.out.splitlines()[0] == "input,id,error"
+    assert captured.err == ""
+
+
+def test_main_returns_error_status(solr, env, monkeypatch, capsys):
+    monkeypatch.setattr("sys.stdin", io.StringIO("bad\n"))
+    assert main(["bibs", "-q"]) == 1
+
+
+def test_main_missing_input_file(env, tmp_path, capsys):
+    assert main(["bibs", str(tmp_path / "missing.txt")]) == 2
+    assert "bookops-bpl-solr: error: " in capsys.readouterr().err
+
+
+def test_main_unwritable_output(env, tmp_path, capsys):
+    infile = tmp_path / "bibs.txt"
+    infile.write_text("b123456789\n")
+    outfile = tmp_path / "missing" / "out.jsonl"
+    assert main(["bibs", str(infile), "-o", str(outfile)]) == 2
+    assert "bookops-bpl-solr: error: " in capsys.readouterr().err
+
+
+def test_main_missing_credentials(monkeypatch, capsys):
+    monkeypatch.delenv("BPL_SOLR_ENDPOINT", raising=False)
+    monkeypatch.delenv("BPL_SOLR_CLIENT_KEY", raising=False)
+    with pytest.raises(SystemExit):
+        main(["bibs"])
+    assert "endpoint and Client-Key are required" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("arg", [["-w", "0"], ["-b", "0"]])
+def test_main_invalid_workers(env, arg):
+    with pytest.raises(SystemExit):
+        main(["bibs"] + arg)
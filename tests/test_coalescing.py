@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tests coalescing.py module
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+import pytest
+
+from bookops_bpl_solr.coalescing import AsyncSingleFlight, SingleFlight
+
+
+class TestSingleFlight:
+    def test_identical_calls_coalesced(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def fn():
+            calls.append(1)
+            release.wait(5)
+            return object()
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            futures = [executor.submit(flight.do, "key", fn) for _ in range(5)]
+            while flight.shared < 4:
+                threading.Event().wait(0.001)
+            release.set()
+            results = [future.result() for future in futures]
+
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+        assert flight.shared == 4
+        assert len(flight) == 0
+
+    def test_different_keys_not_coalesced(self):
+        flight = SingleFlight()
+        assert flight.do("a", lambda: 1) == 1
+        assert flight.do("b", lambda: 2) == 2
+        assert flight.shared == 0
+
+    def test_sequential_calls_not_coalesced(self):
+        flight = SingleFlight()
+        calls = []
+        flight.do("key", lambda: calls.append(1))
+        flight.do("key", lambda: calls.append(1))
+        assert len(calls) == 2
+
+    def test_error_shared(self):
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def fn():
+            release.wait(5)
+            raise ValueError("boom")
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [executor.submit(flight.do, "key", fn) for _ in range(3)]
+            while flight.shared < 2:
+                threading.Event().wait(0.001)
+            release.set()
+            for future in futures:
+                with pytest.raises(ValueError):
+                    future.result()
+        assert len(flight) == 0
+
+
+class TestAsyncSingleFlight:
+    def test_identical_calls_coalesced(self):
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return object()
+
+        async def main():
+            return await asyncio.gather(*[flight.do("key", fn) for _ in range(5)])
+
+        results = asyncio.run(main())
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+        assert flight.shared == 4
+        assert len(flight) == 0
+
+    def test_error_shared(self):
+        flight = AsyncSingleFlight()
+
+        async def fn():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        async def main():
+            return await asyncio.gather(
+                *[flight.do("key", fn) for _ in range(3)], return_exceptions=True
+            )
+
+        results = asyncio.run(main())
+        assert all(isinstance(result, ValueError) for result in results)
+        assert len(flight) == 0
+
+    def test_cancelled_waiter_does_not_cancel_call(self):
+        flight = AsyncSingleFlight()
+
+        async def fn():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        async def main():
+            leader = asyncio.create_task(flight.do("key", fn))
+            await asyncio.sleep(0)
+            waiter = asyncio.create_task(flight.do("key", fn))
+            await asyncio.sleep(0)
+            waiter.cancel()
+            return await leader
+
+        assert asyncio.run(main()) == "done"
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tests columnar.py module and columnar query methods of SolrSession
+"""
+import csv
+import io
+import json
+import re
+
+import pytest
+import requests
+
+from bookops_bpl_solr.columnar import (
+    column_length,
+    csv_params,
+    last_value,
+    parse_csv_columns,
+)
+from bookops_bpl_solr.session import BookopsSolrError, SolrQuery
+
+
+CONTENT = (
+    b"id,title,publishYear,isbn\n"
+    b'12345678,"Civil war, a history",2020,9780810984912|0810984911\n'
+    b"23456789,Tytu\xc5\x82,,\n"
+)
+
+DOCS = [
+    {
+        "id": str(10000000 + n),
+        "title": f"Title {n}",
+        "publishYear": 2000 + n,
+        "isbn": [f"97800000000{n:02d}", f"00000000{n:02d}"],
+    }
+    for n in range(7)
+]
+
+
+def to_csv(docs, fields):
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator="\n")
+    writer.writerow(fields)
+    for doc in docs:
+        row = []
+        for field in fields:
+            value = doc.get(field, "")
+            if isinstance(value, list):
+                value = "|".join(value)
+            row.append(value)
+        writer.writerow(row)
+    return output.getvalue().encode("utf-8")
+
+
+class MockCSVSolr:
+    """Imitates Solr's CSV writer with id range filters sorted by id"""
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.requests = []
+
+    def get(self, url, params=None, **kwargs):
+        self.requests.append(dict(params))
+        found = sorted(self.docs, key=lambda d: d["id"])
+        filters = params["fq"] if isinstance(params["fq"], list) else [params["fq"]]
+        for query in filters:
+            match = re.match(r"\{!cache=false\}id:\{(.*) TO \*\]$", query)
+            if match:
+                after = json.loads(match.group(1))
+                found = [d for d in found if d["id"] > after]
+        page = found[params.get("start", 0) :][: params["rows"]]
+        response = requests.Response()
+        response.status_code = 200
+        response._content = to_csv(page, params["fl"].split(","))
+        return response
+
+
+@pytest.fixture
+def csv_solr(monkeypatch):
+    def _csv_solr(docs):
+        solr = MockCSVSolr(docs)
+        monkeypatch.setattr(
+            requests.Session,
+            "get",
+            lambda session, *args, **kwargs: solr.get(*args, **kwargs),
+        )
+        return solr
+
+    return _csv_solr
+
+
+def test_csv_params():
+    assert csv_params() == {
+        "wt": "csv",
+        "csv.header": "true",
+        "csv.mv.separator": "|",
+    }
+
+
+@pytest.mark.parametrize("content", [CONTENT, CONTENT.decode("utf-8")])
+def test_parse_csv_columns_lists(content):
+    assert parse_csv_columns(content) == {
+        "id": ["12345678", "23456789"],
+        "title": ["Civil war, a history", "Tytuł"],
+        "publishYear": ["2020", None],
+        "isbn": [["9780810984912", "0810984911"], None],
+    }
+
+
+@pytest.mark.parametrize(
+    "content,expectation",
+    [(b"", {}), (b"id,title\n", {"id": [], "title": []})],
+)
+def test_parse_csv_columns_empty(content, expectation):
+    assert parse_csv_columns(content) == expectation
+
+
+def test_parse_csv_columns_numpy():
+    numpy = pytest.importorskip("numpy")
+    content = to_csv(DOCS, ["id", "publishYear", "isbn", "title"])
+    columns = parse_csv_columns(content, array_type="numpy")
+    assert columns["publishYear"].dtype == numpy.int64
+    assert columns["publishYear"].sum() == sum(d["publishYear"] for d in DOCS)
+    assert columns["id"].dtype == object
+    assert columns["id"][0] == "10000000"
+    assert columns["isbn"].shape == (7,)
+    assert columns["isbn"][1] == DOCS[1]["isbn"]
+    assert parse_csv_columns(CONTENT, array_type="numpy")["publishYear"].dtype == object
+
+
+def test_parse_csv_columns_arrow():
+    pyarrow = pytest.importorskip("pyarrow")
+    table = parse_csv_columns(CONTENT, array_type="arrow")
+    assert table.column_names == ["id", "title", "publishYear", "isbn"]
+    assert table.schema.field("id").type == pyarrow.string()
+    assert table.schema.field("publishYear").type == pyarrow.int64()
+    assert table.to_pydict() == {
+        "id": ["12345678", "23456789"],
+        "title": ["Civil war, a history", "Tytuł"],
+        "publishYear": [2020, None],
+        "isbn": [["9780810984912", "0810984911"], None],
+    }
+    assert column_length(table) == 2
+    assert last_value(table, "id") == "23456789"
+    assert parse_csv_columns(b"", array_type="arrow").num_rows == 0
+
+
+LEADING_ZEROS = (
+    b"id,title,call_number,publishYear\n"
+    b"00012345,1984,0012,1949\n"
+    b"00023456,2001,0345,1968\n"
+)
+
+
+def test_parse_csv_columns_numpy_keeps_strings():
+    numpy = pytest.importorskip("numpy")
+    columns = parse_csv_columns(LEADING_ZEROS, array_type="numpy")
+    for field in ("id", "title", "call_number"):
+        assert columns[field].dtype == object
+    assert list(columns["call_number"]) == ["0012", "0345"]
+    assert list(columns["title"]) == ["1984", "2001"]
+    assert columns["publishYear"].dtype == numpy.int64
+
+
+def test_parse_csv_columns_arrow_keeps_strings():
+    pyarrow = pytest.importorskip("pyarrow")
+    table = parse_csv_columns(LEADING_ZEROS, array_type="arrow")
+    for field in ("id", "title", "call_number"):
+        assert table.schema.field(field).type == pyarrow.string()
+    assert table.to_pydict()["call_number"] == ["0012", "0345"]
+    assert table.schema.field("publishYear").type == pyarrow.int64()
+
+
+def test_parse_csv_columns_custom_numeric():
+    pytest.importorskip("numpy")
+    columns = parse_csv_columns(
+        LEADING_ZEROS, array_type="numpy", numeric=["call_number"]
+    )
+    assert list(columns["call_number"]) == [12, 345]
+    assert columns["publishYear"].dtype == object
+
+
+def test_parse_csv_columns_invalid_array_type():
+    with pytest.raises(ValueError):
+        parse_csv_columns(CONTENT, array_type="pandas")
+
+
+def test_column_length_and_last_value():
+    columns = parse_csv_columns(CONTENT)
+    assert column_length(columns) == 2
+    assert last_value(columns, "id") == "23456789"
+    assert column_length({}) == 0
+    assert last_value({"id": []}, "id") is None
+
+
+class TestSolrSessionColumns:
+    """Tests columnar query methods of SolrSession"""
+
+    def test_query_columns(self, stub_session, csv_solr):
+        solr = csv_solr(DOCS)
+        columns = stub_session.query_columns(
+            {"q": "*:*", "rows": 3, "fl": "id,publishYear,isbn"}
+        )
+        assert columns == {
+            "id": ["10000000", "10000001", "10000002"],
+            "publishYear": ["2000", "2001", "2002"],
+            "isbn": [d["isbn"] for d in DOCS[:3]],
+        }
+        assert solr.requests[0]["wt"] == "csv"
+        assert solr.requests[0]["csv.mv.separator"] == "|"
+        assert solr.requests[0]["fq"] == "ss_type:catalog"
+
+    def test_query_columns_default_fields(self, stub_session, csv_solr):
+        solr = csv_solr(DOCS)
+        columns = stub_session.query_columns(SolrQuery(rows=1), multivalued=[])
+        assert solr.requests[0]["fl"] == ",".join(stub_session.DEFAULT_RESPONSE_FIELDS)
+        assert columns["isbn"] == ["9780000000000|0000000000"]
+
+    @pytest.mark.parametrize("array_type", ["list", "numpy", "arrow"])
+    def test_iter_query_columns(self, stub_session, csv_solr, array_type):
+        if array_type != "list":
+            pytest.importorskip(array_type.replace("arrow", "pyarrow"))
+        solr = csv_solr(DOCS)
+        query = SolrQuery(rows=3).filter("material_type:Book").fields("title")
+        pages = list(stub_session.iter_query_columns(query, array_type=array_type))
+        assert [column_length(page) for page in pages] == [3, 3, 1]
+        ids = [last_value(page, "id") for page in pages]
+        assert ids == ["10000002", "10000005", "10000006"]
+        assert solr.requests[0]["fl"] == "title,id"
+        assert solr.requests[0]["sort"] == "id asc"
+        assert solr.requests[0]["fq"] == ["ss_type:catalog", "material_type:Book"]
+        assert solr.requests[2]["fq"] == [
+            "ss_type:catalog",
+            "material_type:Book",
+            '{!cache=false}id:{"10000005" TO *]',
+        ]
+
+    def test_iter_query_columns_exact_pages(self, stub_session, csv_solr):
+        solr = csv_solr(DOCS[:6])
+        pages = list(stub_session.iter_query_columns({"q": "*:*", "rows": 3}))
+        assert len(pages) == 2
+        assert len(solr.requests) == 3
+
+    def test_iter_query_columns_field_list(self, stub_session, csv_solr):
+        solr = csv_solr(DOCS)
+        payload = {"q": "*:*", "rows": 5, "fl": ["title", "publishYear"]}
+        pages = list(stub_session.iter_query_columns(payload))
+        assert [column_length(page) for page in pages] == [5, 2]
+        assert solr.requests[0]["fl"] == "title,publishYear,id"
+        assert solr.requests[1]["fq"][-1] == '{!cache=false}id:{"10000004" TO *]'
+
+    def test_query_columns_http_error(self, stub_session, mock_sequence):
+        mock_sequence([500])
+        with pytest.raises(BookopsSolrError) as exc:
+            stub_session.query_columns({"q": "*:*"})
+        assert "BPL Solr returned unexpected HTTP status: 500." in str(exc.value)
+
+    @pytest.mark.parametrize(
+        "kwargs,msg",
+        [
+            ({"payload": {}}, "Missing or invalid payload argument."),
+            ({"payload": {"q": "*:*"}, "array_type": "pandas"}, "Invalid array_type"),
+        ],
+    )
+    def test_query_columns_invalid_args(self, stub_session, kwargs, msg):
+        with pytest.raises(BookopsSolrError) as exc:
+            stub_session.query_columns(**kwargs)
+        assert msg in str(exc.value)
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tests decoders.py module
+"""
+import json
+
+import pytest
+
+from bookops_bpl_solr.decoders import (
+    available_decoders,
+    get_decoder,
+    resolve_decoder,
+)
+
+
+CONTENT = '{"response":{"numFound":1,"docs":[{"id":"1","title":"Tytuł"}]}}'
+
+
+@pytest.fixture
+def no_fast_decoders(monkeypatch):
+    monkeypatch.setattr("bookops_bpl_solr.decoders.orjson", None)
+    monkeypatch.setattr("bookops_bpl_solr.decoders.msgspec", None)
+
+
+def test_available_decoders_stdlib_only(no_fast_decoders):
+    assert available_decoders() == {"json": json.loads}
+
+
+@pytest.mark.parametrize("name", ["auto", "json", "orjson", "msgspec"])
+def test_resolve_decoder_fallback(no_fast_decoders, name):
+    assert resolve_decoder(name) == "json"
+
+
+def test_resolve_decoder_auto_prefers_orjson():
+    pytest.importorskip("orjson")
+    assert resolve_decoder("auto") == "orjson"
+
+
+def test_resolve_decoder_unknown():
+    with pytest.raises(ValueError):
+        resolve_decoder("ujson")
+
+
+@pytest.mark.parametrize("name", ["auto", "json", "orjson", "msgspec"])
+@pytest.mark.parametrize("content", [CONTENT, CONTENT.encode("utf-8")])
+def test_get_decoder(name, content):
+    assert get_decoder(name)(content) == json.loads(CONTENT)
+
+
+@pytest.mark.parametrize("name", ["json", "orjson", "msgspec"])
+def test_get_decoder_raises_value_error(name):
+    with pytest.raises(ValueError):
+        get_decoder(name)(b"<html>")
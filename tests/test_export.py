@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tests export.py module
+"""
+import gzip
+import json
+import os
+
+import pytest
+
+from bookops_bpl_solr.export import SolrExport
+from bookops_bpl_solr.session import BookopsSolrError
+
+
+DOCS = [{"id": f"{10000000 + n}", "title": f"Title {n}"} for n in range(25)]
+
+
+def read_jsonl(paths):
+    docs = []
+    for path in paths:
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            docs.extend(json.loads(line) for line in file)
+    return docs
+
+
+@pytest.fixture
+def flaky_solr(mock_solr, monkeypatch):
+    """Mock Solr failing on a given request number"""
+
+    def _flaky_solr(fail_on):
+        solr = mock_solr(DOCS)
+        get = solr.get
+
+        def flaky_get(url, params=None, **kwargs):
+            if len(solr.requests) + 1 == fail_on:
+                solr.requests.append(dict(params))
+                raise BookopsSolrError("Interrupted.")
+            return get(url, params, **kwargs)
+
+        monkeypatch.setattr(solr, "get", flaky_get)
+        return solr
+
+    return _flaky_solr
+
+
+class TestSolrExport:
+    """Tests SolrExport class"""
+
+    def test_export_jsonl(self, stub_session, mock_solr, tmp_path):
+        mock_solr(DOCS)
+        export = SolrExport(
+            stub_session,
+            {"q": "*:*", "rows": 4, "start": 8},
+            str(tmp_path),
+            part_size=10,
+        )
+        state = export.run()
+        assert state == {
+            "query": {"q": "*:*", "rows": 4},
+            "format": "jsonl",
+            "cursor_mark": "10000024",
+            "parts": 3,
+            "exported": 25,
+            "num_found": 25,
+            "done": True,
+        }
+        assert [os.path.basename(p) for p in export.parts()] == [
+            "part-00000.jsonl.gz",
+            "part-00001.jsonl.gz",
+            "part-00002.jsonl.gz",
+        ]
+        assert read_jsonl(export.parts()) == DOCS
+        assert export.load_checkpoint() == state
+        assert sorted(os.listdir(tmp_path)) == [
+            "checkpoint.json",
+            "part-00000.jsonl.gz",
+            "part-00001.jsonl.gz",
+            "part-00002.jsonl.gz",
+        ]
+
+    def test_export_no_results(self, stub_session, mock_solr, tmp_path):
+        mock_solr([])
+        export = SolrExport(stub_session, {"q": "*:*"}, str(tmp_path / "empty"))
+        state = export.run()
+        assert state["done"] is True
+        assert state["parts"] == 0
+        assert export.parts() == []
+
+    def test_export_resumes_after_interruption(
+        self, stub_session, flaky_solr, tmp_path
+    ):
+        solr = flaky_solr(fail_on=4)
+        export = SolrExport(
+            stub_session, {"q": "*:*", "rows": 5}, str(tmp_path), part_size=8
+        )
+        with pytest.raises(BookopsSolrError):
+            export.run()
+        state = export.load_checkpoint()
+        assert state["parts"] == 1
+        assert state["exported"] == 10
+        assert state["cursor_mark"] == "10000009"
+        assert state["done"] is False
+        assert sorted(os.listdir(tmp_path)) == [
+            "checkpoint.json",
+            "part-00000.jsonl.gz",
+        ]
+
+        state = export.run()
+        assert solr.requests[4]["cursorMark"] == "10000009"
+        assert state["done"] is True
+        assert state["exported"] == 25
+        assert read_jsonl(export.parts()) == DOCS
+
+    def test_export_removes_unfinished_parts(self, stub_session, mock_solr, tmp_path):
+        mock_solr(DOCS)
+        # left by a killed export
+        (tmp_path / "part-00000.jsonl.gz.tmp").write_text("foo")
+        (tmp_path / "part-00003.jsonl.gz").write_text("foo")
+        export = SolrExport(stub_session, {"q": "*:*", "rows": 10}, str(tmp_path))
+        export.run()
+        assert sorted(os.listdir(tmp_path)) == [
+            "checkpoint.json",
+            "part-00000.jsonl.gz",
+        ]
+        assert read_jsonl(export.parts()) == DOCS
+
+    def test_export_completed_is_not_repeated(self, stub_session, mock_solr, tmp_path):
+        solr = mock_solr(DOCS)
+        export = SolrExport(stub_session, {"q": "*:*", "rows": 10}, str(tmp_path))
+        export.run()
+        sent = len(solr.requests)
+        assert export.run()["done"] is True
+        assert len(solr.requests) == sent
+
+    def test_export_parquet(self, stub_session, mock_solr, tmp_path):
+        pq = pytest.importorskip("pyarrow.parquet")
+        mock_solr(DOCS)
+        export = SolrExport(
+            stub_session,
+            {"q": "*:*", "rows": 10},
+            str(tmp_path),
+            format="parquet",
+            part_size=20,
+        )
+        state = export.run()
+        assert state["parts"] == 2
+        docs = []
+        for path in export.parts():
+            assert path.endswith(".parquet")
+            docs.extend(pq.read_table(path).to_pylist())
+        assert docs == DOCS
+
+    def test_checkpoint_of_different_query(self, stub_session, mock_solr, tmp_path):
+        mock_solr(DOCS)
+        SolrExport(stub_session, {"q": "*:*"}, str(tmp_path)).run()
+        with pytest.raises(BookopsSolrError) as exc:
+            SolrExport(stub_session, {"q": "title:foo"}, str(tmp_path)).run()
+        assert "belongs to a different query" in str(exc.value)
+        with pytest.raises(BookopsSolrError) as exc:
+            SolrExport(stub_session, {"q": "*:*"}, str(tmp_path), "parquet").run()
+        assert "belongs to a different format" in str(exc.value)
+
+    def test_invalid_checkpoint(self, stub_session, tmp_path):
+        (tmp_path / "checkpoint.json").write_text("{")
+        with pytest.raises(BookopsSolrError) as exc:
+            SolrExport(stub_session, {"q": "*:*"}, str(tmp_path)).run()
+        assert "Invalid checkpoint file" in str(exc.value)
+
+    @pytest.mark.parametrize(
+        "kwargs,msg",
+        [
+            ({"session": "foo"}, "Invalid type of a session argument."),
+            ({"payload": {}}, "Missing or invalid payload argument."),
+            ({"format": "csv"}, "Invalid format argument."),
+            ({"part_size": 0}, "Invalid part_size argument."),
+        ],
+    )
+    def test_invalid_arguments(self, stub_session, tmp_path, kwargs, msg):
+        args = {
+            "session": stub_session,
+            "payload": {"q": "*:*"},
+            "directory": str(tmp_path),
+        }
+        args.update(kwargs)
+        with pytest.raises(BookopsSolrError) as exc:
+            SolrExport(**args)
+        assert msg in str(exc.value)
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tests harvest.py module
+"""
+import json
+import re
+
+import pytest
+import requests
+
+from bookops_bpl_solr.harvest import DeltaHarvester
+from bookops_bpl_solr.session import BookopsSolrError
+
+
+def make_doc(bid, created):
+    return {"id": bid, "title": f"Title {bid}", "created_date": created}
+
+
+class MockDeltaSolr:
+    """Imitates range filter query and cursor paging sorted by date and id"""
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.requests = []
+
+    def get(self, url, params=None, **kwargs):
+        self.requests.append(dict(params))
+        field, lower = re.match(r"(\w+):\[(.*) TO \*\]$", params["fq"][-1]).groups()
+        found = [d for d in self.docs if field in d]
+        if lower != "*":
+            found = [d for d in found if d[field] >= json.loads(lower)]
+        found.sort(key=lambda d: (d[field], d["id"]))
+        start = 0 if params["cursorMark"] == "*" else int(params["cursorMark"])
+        page = found[start : start + params["rows"]]
+        data = {
+            "response": {"numFound": len(found), "start": 0, "docs": page},
+            "nextCursorMark": str(start + len(page)),
+        }
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps(data).encode("utf-8")
+        return response
+
+
+@pytest.fixture
+def delta_solr(monkeypatch):
+    def _delta_solr(docs):
+        solr = MockDeltaSolr(docs)
+        monkeypatch.setattr(requests.Session, "get", solr.get)
+        return solr
+
+    return _delta_solr
+
+
+DOCS = [
+    make_doc("10000001", "2024-01-01T00:00:00Z"),
+    make_doc("10000002", "2024-01-02T00:00:00Z"),
+    make_doc("10000003", "2024-01-02T00:00:00Z"),
+    make_doc("10000004", "2024-01-03T00:00:00Z"),
+    {"id": "10000005", "title": "No date"},
+]
+
+
+class TestDeltaHarvester:
+    """Tests DeltaHarvester class"""
+
+    def test_first_harvest(self, stub_session, delta_solr, tmp_path):
+        solr = delta_solr(DOCS)
+        path = str(tmp_path / "state.json")
+        harvester = DeltaHarvester(stub_session, path, rows=2)
+        docs = list(harvester.harvest())
+        assert [d["id"] for d in docs] == [
+            "10000001",
+            "10000002",
+            "10000003",
+            "10000004",
+        ]
+        assert solr.requests[0]["fq"] == ["ss_type:catalog", "created_date:[* TO *]"]
+        assert solr.requests[0]["sort"] == "created_date asc,id asc"
+        assert solr.requests[0]["q"] == "*:*"
+        assert harvester.watermark == "2024-01-03T00:00:00Z"
+        assert harvester.load_state() == {
+            "field": "created_date",
+            "query": "*:*",
+            "watermark": "2024-01-03T00:00:00Z",
+            "ids": ["10000004"],
+            "harvested": 4,
+        }
+
+    def test_payload_keeps_catalog_filter(self, stub_session, tmp_path):
+        harvester = DeltaHarvester(stub_session, str(tmp_path / "state.json"))
+        payload = stub_session._merge_with_payload_defaults(
+            harvester._payload("2024-01-02T00:00:00Z")
+        )
+        assert payload["fq"] == [
+            "ss_type:catalog",
+            'created_date:["2024-01-02T00:00:00Z" TO *]',
+        ]
+
+    def test_delta_harvest(self, stub_session, delta_solr, tmp_path):
+        path = str(tmp_path / "state.json")
+        delta_solr(DOCS[:3])
+        harvester = DeltaHarvester(stub_session, path)
+        assert len(list(harvester.harvest())) == 3
+
+        # new document with the same date as the watermark and a later one
+        solr = delta_solr(DOCS[:3] + [make_doc("10000000", "2024-01-02T00:00:00Z")])
+        solr.docs.append(DOCS[3])
+        docs = list(harvester.harvest())
+        assert [d["id"] for d in docs] == ["10000000", "10000004"]
+        assert solr.requests[0]["fq"] == [
+            "ss_type:catalog",
+            'created_date:["2024-01-02T00:00:00Z" TO *]',
+        ]
+        assert harvester.load_state()["harvested"] == 5
+
+        # nothing changed
+        assert list(harvester.harvest()) == []
+
+    def test_harvest_since(self, stub_session, delta_solr, tmp_path):
+        delta_solr(DOCS)
+        path = tmp_path / "state.json"
+        harvester = DeltaHarvester(
+            stub_session, str(path), since="2024-01-02T00:00:00Z"
+        )
+        assert harvester.watermark == "2024-01-02T00:00:00Z"
+        assert [d["id"] for d in harvester.harvest()] == [
+            "10000002",
+            "10000003",
+            "10000004",
+        ]
+
+    def test_harvest_no_changes_saves_state(self, stub_session, delta_solr, tmp_path):
+        delta_solr([])
+        path = tmp_path / "state.json"
+        harvester = DeltaHarvester(stub_session, str(path), since="2024-01-01")
+        assert list(harvester.harvest()) == []
+        assert json.loads(path.read_text())["watermark"] == "2024-01-01"
+
+    def test_interrupted_harvest_resumes(self, stub_session, delta_solr, tmp_path):
+        delta_solr(DOCS)
+        path = str(tmp_path / "state.json")
+        harvester = DeltaHarvester(stub_session, path, rows=2)
+        for n, doc in enumerate(harvester.harvest()):
+            if n == 2:
+                break
+        # only fully consumed pages are recorded
+        assert harvester.load_state()["ids"] == ["10000002"]
+        docs = list(harvester.harvest())
+        assert [d["id"] for d in docs] == ["10000003", "10000004"]
+
+    def test_response_fields(self, stub_session, delta_solr, tmp_path):
+        solr = delta_solr(DOCS)
+        harvester = DeltaHarvester(
+            stub_session,
+            str(tmp_path / "state.json"),
+            field="created_date",
+            query="ss_type:catalog",
+            response_fields=["title"],
+        )
+        list(harvester.harvest())
+        assert solr.requests[0]["fl"] == "title,id,created_date"
+        assert solr.requests[0]["q"] == "ss_type:catalog"
+
+    def test_state_of_different_query(self, stub_session, delta_solr, tmp_path):
+        delta_solr(DOCS)
+        path = str(tmp_path / "state.json")
+        list(DeltaHarvester(stub_session, path).harvest())
+        with pytest.raises(BookopsSolrError) as exc:
+            list(DeltaHarvester(stub_session, path, query="title:foo").harvest())
+        assert "different field or query" in str(exc.value)
+
+    def test_invalid_state(self, stub_session, tmp_path):
+        path = tmp_path / "state.json"
+        path.write_text("foo")
+        with pytest.raises(BookopsSolrError) as exc:
+            DeltaHarvester(stub_session, str(path)).watermark
+        assert "Invalid harvest state file" in str(exc.value)
+
+    @pytest.mark.parametrize(
+        "kwargs,msg",
+        [
+            ({"session": None}, "Invalid type of a session argument."),
+            ({"field": ""}, "Invalid field argument."),
+            ({"query": None}, "Invalid query argument."),
+            ({"rows": 0}, "Invalid rows argument."),
+        ],
+    )
+    def test_invalid_arguments(self, stub_session, tmp_path, kwargs, msg):
+        args = {"session": stub_session, "state_path": str(tmp_path / "s.json")}
+        args.update(kwargs)
+        with pytest.raises(BookopsSolrError) as exc:
+            DeltaHarvester(**args)
+        assert msg in str(exc.value)
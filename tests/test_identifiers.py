@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tests identifiers.py module
+"""
+import pytest
+
+from bookops_bpl_solr.identifiers import (
+    isbn_variants,
+    match_identifiers,
+    normalize_identifiers,
+    normalize_isbn,
+    normalize_upc,
+    upc_variants,
+)
+
+
+@pytest.mark.parametrize(
+    "arg,expectation",
+    [
+        ("9781680502404", "9781680502404"),
+        ("978-1-68050-240-4", "9781680502404"),
+        ("1680502409", "9781680502404"),
+        ("1-68050-240-9", "9781680502404"),
+        ("1680502409 (paperback)", "9781680502404"),
+        (" 9781680502404 ", "9781680502404"),
+        ("080442957X", "9780804429573"),
+        ("080442957x", "9780804429573"),
+        ("9791032305690", "9791032305690"),
+        ("9781680502405", None),
+        ("1680502408", None),
+        ("168050240", None),
+        ("97816805024044", None),
+        ("978168050240X", None),
+        ("X680502409", None),
+        ("", None),
+    ],
+)
+def test_normalize_isbn(arg, expectation):
+    assert normalize_isbn(arg) == expectation
+
+
+@pytest.mark.parametrize(
+    "arg,expectation",
+    [
+        ("085391200390", "085391200390"),
+        ("0085391200390", "085391200390"),
+        ("0-85391-20039-0", "085391200390"),
+        ("5901234123457", "5901234123457"),
+        ("085391200391", None),
+        ("85391200390", None),
+        ("08539120039A", None),
+        ("", None),
+    ],
+)
+def test_normalize_upc(arg, expectation):
+    assert normalize_upc(arg) == expectation
+
+
+@pytest.mark.parametrize(
+    "arg,expectation",
+    [
+        ("9781680502404", ["9781680502404", "1680502409"]),
+        ("9780804429573", ["9780804429573", "080442957X"]),
+        ("9791032305690", ["9791032305690"]),
+    ],
+)
+def test_isbn_variants(arg, expectation):
+    assert isbn_variants(arg) == expectation
+
+
+@pytest.mark.parametrize(
+    "arg,expectation",
+    [
+        ("085391200390", ["085391200390", "0085391200390"]),
+        ("5901234123457", ["5901234123457"]),
+    ],
+)
+def test_upc_variants(arg, expectation):
+    assert upc_variants(arg) == expectation
+
+
+def test_normalize_identifiers():
+    assert normalize_identifiers(
+        ["1680502409", "foo", "978-1-68050-240-4", "1680502409", "foo"],
+        normalize_isbn,
+    ) == (
+        {"1680502409": "9781680502404", "978-1-68050-240-4": "9781680502404"},
+        ["foo"],
+    )
+
+
+def test_match_identifiers_normalized():
+    docs = [
+        {"id": "1", "isbn": ["9781680502404", "1680502409"]},
+        {"id": "2", "isbn": "1-68050-240-9"},
+        {"id": "3", "isbn": ["bad value"]},
+        {"id": "4"},
+    ]
+    assert match_identifiers(
+        ["978-1680502404", "foo", "1680502409", "9780810984912"],
+        docs,
+        "isbn",
+        normalize_isbn,
+    ) == {
+        "978-1680502404": ["1", "2"],
+        "foo": [],
+        "1680502409": ["1", "2"],
+        "9780810984912": [],
+    }
+
+
+def test_match_identifiers_exact():
+    docs = [{"id": "1", "isbn": ["9781680502404", "1680502409"]}]
+    assert match_identifiers(["1680502409", "168050240-9"], docs, "isbn") == {
+        "1680502409": ["1"],
+        "168050240-9": [],
+    }
+
+
+def test_match_identifiers_lists_not_shared():
+    matches = match_identifiers(
+        ["9781680502404", "1680502409"],
+        [{"id": "1", "isbn": ["9781680502404"]}],
+        "isbn",
+        normalize_isbn,
+    )
+    matches["9781680502404"].append("2")
+    assert matches["1680502409"] == ["1"]
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tests limiters.py module
+"""
+import threading
+
+import pytest
+
+from bookops_bpl_solr.limiters import AdaptiveLimiter, TokenBucket
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    sleeps = []
+
+    def mock_sleep(delay):
+        sleeps.append(delay)
+        now[0] += delay
+
+    monkeypatch.setattr("time.monotonic", lambda: now[0])
+    monkeypatch.setattr("time.sleep", mock_sleep)
+    return now, sleeps
+
+
+class TestTokenBucket:
+    def test_default_burst(self):
+        assert TokenBucket(5).burst == 1
+
+    def test_burst_does_not_wait(self, clock):
+        _, sleeps = clock
+        bucket = TokenBucket(10, burst=3)
+        assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert sleeps == []
+
+    def test_waits_when_empty(self, clock):
+        _, sleeps = clock
+        bucket = TokenBucket(10)
+        bucket.acquire()
+        assert bucket.acquire() == pytest.approx(0.1)
+        assert sleeps == [pytest.approx(0.1)]
+
+    def test_refills_over_time(self, clock):
+        now, sleeps = clock
+        bucket = TokenBucket(2, burst=2)
+        bucket.acquire()
+        bucket.acquire()
+        now[0] += 1.0
+        assert bucket.acquire() == 0.0
+        assert bucket.acquire() == 0.0
+        assert sleeps == []
+
+
+def fill(limiter):
+    while limiter.try_acquire():
+        pass
+
+
+class TestAdaptiveLimiter:
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"min_limit": 0},
+            {"initial_limit": 8, "max_limit": 4},
+            {"min_limit": 5, "initial_limit": 4},
+            {"latency_tolerance": 1},
+            {"backoff_ratio": 1},
+        ],
+    )
+    def test_invalid_arguments(self, kwargs):
+        with pytest.raises(ValueError):
+            AdaptiveLimiter(**kwargs)
+
+    def test_try_acquire_bounded_by_limit(self):
+        limiter = AdaptiveLimiter(initial_limit=2)
+        assert [limiter.try_acquire() for _ in range(3)] == [True, True, False]
+        assert limiter.inflight == 2
+
+    def test_cancel(self):
+        limiter = AdaptiveLimiter(initial_limit=2)
+        fill(limiter)
+        limiter.cancel()
+        assert limiter.inflight == 1
+        assert limiter.limit == 2
+        assert limiter.try_acquire() is True
+
+    def test_additive_increase(self, clock):
+        limiter = AdaptiveLimiter(initial_limit=4)
+        # about a limit's worth of healthy requests grows the limit by one
+        for _ in range(5):
+            fill(limiter)
+            limiter.release(0.1)
+        assert limiter.limit == 5
+
+    def test_increase_capped(self, clock):
+        limiter = AdaptiveLimiter(initial_limit=2, max_limit=3)
+        for _ in range(20):
+            fill(limiter)
+            limiter.release(0.1)
+        assert limiter.limit == 3
+
+    def test_no_increase_when_idle(self, clock):
+        limiter = AdaptiveLimiter(initial_limit=8)
+        for _ in range(20):
+            limiter.try_acquire()
+            limiter.release(0.1)
+        assert limiter.limit == 8
+
+    def test_decrease_on_overload(self, clock):
+        limiter = AdaptiveLimiter(initial_limit=8, min_limit=3)
+        fill(limiter)
+        limiter.release(0.1, overloaded=True)
+        assert limiter.limit == 4
+        assert limiter.decreases == 1
+
+    def test_decrease_once_per_overload(self, clock):
+        now = clock[0]
+        limiter = AdaptiveLimiter(initial_limit=8)
+        fill(limiter)
+        now[0] += 1.0
+        # requests in flight during the first decrease do not decrease again
+        for _ in range(3):
+            limiter.release(0.5, overloaded=True)
+        assert limiter.limit == 4
+        now[0] += 1.0
+        limiter.release(0.5, overloaded=True)
+        assert limiter.limit == 2
+
+    def test_decrease_floor(self, clock):
+        now = clock[0]
+        limiter = AdaptiveLimiter(initial_limit=2, min_limit=2)
+        for _ in range(3):
+            limiter.try_acquire()
+            now[0] += 1.0
+            limiter.release(0.1, overloaded=True)
+        assert limiter.limit == 2
+
+    def test_decrease_on_rising_latency(self, clock):
+        limiter = AdaptiveLimiter(initial_limit=8, latency_tolerance=2.0)
+        for _ in range(10):
+            limiter.try_acquire()
+            limiter.release(0.1)
+        for _ in range(5):
+            limiter.try_acquire()
+            limiter.release(2.0)
+        assert limiter.decreases == 1
+        assert limiter.limit == 4
+
+    def test_decrease_on_qtime(self, clock):
+        limiter = AdaptiveLimiter(initial_limit=8, max_qtime=0.5)
+        limiter.try_acquire()
+        limiter.release(0.1, qtime=0.2)
+        assert limiter.limit == 8
+        limiter.try_acquire()
+        limiter.release(0.1, qtime=0.8)
+        assert limiter.limit == 4
+
+    def test_acquire_waits_for_release(self):
+        limiter = AdaptiveLimiter(initial_limit=1)
+        limiter.acquire()
+        acquired = threading.Event()
+
+        def worker():
+            limiter.acquire()
+            acquired.set()
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        assert not acquired.wait(0.05)
+        limiter.release(0.1)
+        assert acquired.wait(1)
+        thread.join()
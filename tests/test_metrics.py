@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tests metrics.py module
+"""
+import pytest
+
+from bookops_bpl_solr.metrics import (
+    SessionMetrics,
+    current_method,
+    instrumented,
+    parse_qtime,
+)
+
+
+class Client:
+    @instrumented
+    def outer(self):
+        return self.inner()
+
+    @instrumented
+    def inner(self):
+        return current_method.get()
+
+    @instrumented
+    def pages(self):
+        for _ in range(2):
+            yield current_method.get()
+
+
+@pytest.mark.parametrize(
+    "arg,expectation",
+    [
+        (b'{"responseHeader":{"status":0,"QTime":12,"params":{}}}', 0.012),
+        (b'{\n  "responseHeader":{\n    "QTime" : 0}}', 0.0),
+        (b'{"response":{"numFound":0,"docs":[]}}', None),
+        (b"", None),
+    ],
+)
+def test_parse_qtime(arg, expectation):
+    assert parse_qtime(arg) == expectation
+
+
+def test_instrumented_labels_method():
+    assert current_method.get() == "_send_request"
+    assert Client().inner() == "inner"
+    assert current_method.get() == "_send_request"
+
+
+def test_instrumented_outer_method_label():
+    assert Client().outer() == "outer"
+
+
+def test_instrumented_generator_label():
+    labels = []
+    for label in Client().pages():
+        labels.append((label, current_method.get()))
+    assert labels == [("pages", "_send_request"), ("pages", "_send_request")]
+
+
+def test_instrumented_keeps_docstring():
+    assert Client.pages.__name__ == "pages"
+
+
+class TestSessionMetrics:
+    def test_empty(self):
+        metrics = SessionMetrics()
+        assert metrics.snapshot() == {}
+        assert metrics.to_prometheus().startswith(
+            "# HELP bookops_bpl_solr_requests_total"
+        )
+
+    def test_snapshot(self):
+        metrics = SessionMetrics(buckets=(1.0, 0.1))
+        metrics.observe_request("search_isbns", 0.05, 200, 100, 0.01)
+        metrics.observe_request("search_isbns", 0.5, 200, 50, 0.2)
+        metrics.observe_request("search_isbns", 2.0, 503, 10)
+        metrics.observe_error("search_isbns", TimeoutError())
+        metrics.observe_retry("search_isbns")
+        assert metrics.snapshot() == {
+            "search_isbns": {
+                "requests": 3,
+                "statuses": {"200": 2, "503": 1},
+                "errors": {"TimeoutError": 1},
+                "retries": 1,
+                "latency": {
+                    "count": 3,
+                    "sum": pytest.approx(2.55),
+                    "buckets": {"0.1": 1, "1.0": 2, "+Inf": 3},
+                },
+                "qtime": {
+                    "count": 2,
+                    "sum": pytest.approx(0.21),
+                    "wall_sum": pytest.approx(0.55),
+                },
+                "response_bytes": 160,
+            }
+        }
+
+    def test_reset(self):
+        metrics = SessionMetrics()
+        metrics.observe_retry("search_bibNo")
+        metrics.reset()
+        assert metrics.snapshot() == {}
+
+    def test_to_prometheus(self):
+        metrics = SessionMetrics(buckets=(0.1,), prefix="solr")
+        metrics.observe_request("search_bibNo", 0.05, 200, 100, 0.01)
+        metrics.observe_error("search_bibNo", ConnectionError())
+        assert metrics.to_prometheus() == (
+            "# HELP solr_requests_total Requests that received a response "
+            "by HTTP status.\n"
+            "# TYPE solr_requests_total counter\n"
+            'solr_requests_total{method="search_bibNo",status="200"} 1\n'
+            "# HELP solr_request_duration_seconds Wall-clock duration of requests.\n"
+            "# TYPE solr_request_duration_seconds histogram\n"
+            'solr_request_duration_seconds_bucket{method="search_bibNo",le="0.1"} 1\n'
+            'solr_request_duration_seconds_bucket{method="search_bibNo",le="+Inf"} 1\n'
+            'solr_request_duration_seconds_sum{method="search_bibNo"} 0.05\n'
+            'solr_request_duration_seconds_count{method="search_bibNo"} 1\n'
+            "# HELP solr_qtime_seconds Server-side query time (QTime) reported "
+            "by Solr.\n"
+            "# TYPE solr_qtime_seconds summary\n"
+            'solr_qtime_seconds_sum{method="search_bibNo"} 0.01\n'
+            'solr_qtime_seconds_count{method="search_bibNo"} 1\n'
+            "# HELP solr_qtime_wall_seconds Wall-clock duration of requests that "
+            "reported QTime.\n"
+            "# TYPE solr_qtime_wall_seconds summary\n"
+            'solr_qtime_wall_seconds_sum{method="search_bibNo"} 0.05\n'
+            'solr_qtime_wall_seconds_count{method="search_bibNo"} 1\n'
+            "# HELP solr_response_bytes_total Bytes of downloaded response bodies.\n"
+            "# TYPE solr_response_bytes_total counter\n"
+            'solr_response_bytes_total{method="search_bibNo"} 100\n'
+            "# HELP solr_errors_total Requests that failed without response "
+            "by error class.\n"
+            "# TYPE solr_errors_total counter\n"
+            'solr_errors_total{method="search_bibNo",error="ConnectionError"} 1\n'
+            "# HELP solr_retries_total Retried requests.\n"
+            "# TYPE solr_retries_total counter\n"
+            'solr_retries_total{method="search_bibNo"} 0\n'
+        )
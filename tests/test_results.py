@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tests results.py module
+"""
+import io
+import json
+import os
+import sys
+
+import pytest
+import requests
+
+from bookops_bpl_solr.cache import MemoryCache
+from bookops_bpl_solr.results import SolrDoc, SolrResult, iter_docs
+from bookops_bpl_solr.session import BookopsSolrError, SolrSession
+
+
+def load_example(name):
+    fh = os.path.join(os.path.dirname(__file__), name)
+    with open(fh, "rb") as file:
+        return file.read()
+
+
+def make_response(content, status_code=200):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    return response
+
+
+def make_stream_response(content, status_code=200):
+    response = requests.Response()
+    response.status_code = status_code
+    response.raw = io.BytesIO(content)
+    return response
+
+
+@pytest.fixture
+def ebook_doc():
+    content = load_example("response-example-ebok.json")
+    return json.loads(content)["response"]["docs"][0]
+
+
+@pytest.fixture
+def print_doc():
+    content = load_example("response-example-print.json")
+    return json.loads(content)["response"]["docs"][0]
+
+
+class TestSolrDoc:
+    def test_fields_match_default_response_fields(self):
+        assert list(SolrDoc.FIELDS) == SolrSession.DEFAULT_RESPONSE_FIELDS
+
+    def test_attributes(self, ebook_doc):
+        doc = SolrDoc(ebook_doc)
+        assert doc.id == "12141134"
+        assert doc.isbn == ["9781488088933", "978-1488088933", "1488088934"]
+        assert doc.econtrolnumber == "96CDB3B7-FD12-459C-8170-256209159619"
+        assert doc.digital_copies_owned == 0
+        assert doc.created_date is None
+
+    def test_no_instance_dict(self, ebook_doc):
+        doc = SolrDoc(ebook_doc)
+        assert not hasattr(doc, "__dict__")
+        assert sys.getsizeof(doc) < sys.getsizeof(ebook_doc)
+
+    def test_extra_fields(self, print_doc):
+        doc = SolrDoc(print_doc)
+        assert doc["tm_primary_title"] == ["Harry Potter and the half-blood prince"]
+        assert doc.get("tm_primary_title") == doc["tm_primary_title"]
+
+    def test_getitem_missing_field(self, ebook_doc):
+        doc = SolrDoc(ebook_doc)
+        with pytest.raises(KeyError):
+            doc["created_date"]
+        with pytest.raises(KeyError):
+            doc["foo"]
+
+    def test_get_default(self, ebook_doc):
+        doc = SolrDoc(ebook_doc)
+        assert doc.get("foo", "bar") == "bar"
+        assert doc.get("title") == "The Fragile Ordinary"
+
+    @pytest.mark.parametrize("fixture", ["ebook_doc", "print_doc"])
+    def test_to_dict(self, fixture, request):
+        data = request.getfixturevalue(fixture)
+        assert SolrDoc(data).to_dict() == data
+
+    def test_eq(self, ebook_doc, print_doc):
+        assert SolrDoc(ebook_doc) == SolrDoc(dict(ebook_doc))
+        assert SolrDoc(ebook_doc) != SolrDoc(print_doc)
+        assert SolrDoc(ebook_doc) != ebook_doc
+
+    def test_repr(self, ebook_doc):
+        assert repr(SolrDoc(ebook_doc)) == (
+            "SolrDoc(id='12141134', title='The Fragile Ordinary')"
+        )
+
+
+class TestSolrResult:
+    def test_attributes(self):
+        result = SolrResult(make_response(load_example("response-example-ebok.json")))
+        assert result.numFound == 1
+        assert result.start == 0
+        assert result.QTime is None
+        assert result.nextCursorMark is None
+        assert len(result) == 1
+        assert isinstance(result.docs[0], SolrDoc)
+        assert [doc.id for doc in result] == ["12141134"]
+        assert repr(result) == "SolrResult(numFound=1)"
+
+    def test_response_header_and_cursor(self):
+        result = SolrResult(
+            make_response(
+                b'{"responseHeader":{"status":0,"QTime":7},"nextCursorMark":"AoE",'
+                b'"response":{"numFound":0,"start":0,"docs":[]}}'
+            )
+        )
+        assert result.QTime == 7
+        assert result.nextCursorMark == "AoE"
+
+    def test_lazy_decoding(self):
+        result = SolrResult(make_response(b"not json"))
+        with pytest.raises(BookopsSolrError) as exc:
+            result.numFound
+        assert "Unable to decode BPL Solr response." in str(exc.value)
+
+    def test_docs_released_from_data(self):
+        result = SolrResult(make_response(load_example("response-example-ebok.json")))
+        result.docs
+        assert result.data["response"]["docs"] == []
+        assert len(result.docs) == 1
+
+    def test_http_error(self):
+        with pytest.raises(BookopsSolrError) as exc:
+            SolrResult(make_response(b"", status_code=500))
+        assert "BPL Solr returned unexpected HTTP status: 500." in str(exc.value)
+
+    @pytest.mark.parametrize("decoder", ["auto", "json", "orjson", "msgspec"])
+    def test_json_decoder(self, decoder):
+        result = SolrResult(
+            make_response(load_example("response-example-print.json")), decoder
+        )
+        assert result.docs[0].id == "11499389"
+
+    def test_json_decoder_invalid(self):
+        with pytest.raises(BookopsSolrError) as exc:
+            SolrResult(make_response(b"{}"), json_decoder="simplejson")
+        assert "Invalid json_decoder argument." in str(exc.value)
+
+    def test_session_result_uses_session_decoder(self, monkeypatch):
+        used = []
+        monkeypatch.setattr(
+            "bookops_bpl_solr.results.get_decoder",
+            lambda name: used.append(name) or json.loads,
+        )
+        with SolrSession("my_client_key", "example.com", json_decoder="json") as s:
+            result = s.result(
+                make_response(load_example("response-example-print.json"))
+            )
+        assert isinstance(result, SolrResult)
+        assert result.docs[0].id == "11499389"
+        assert used == ["json"]
+
+
+class TestIterDocs:
+    @pytest.mark.parametrize("chunk_size", [1, 7, 64, 65536])
+    @pytest.mark.parametrize(
+        "name", ["response-example-ebok.json", "response-example-print.json"]
+    )
+    def test_examples(self, name, chunk_size):
+        content = load_example(name)
+        expected = json.loads(content)["response"]["docs"]
+        docs = list(iter_docs(make_stream_response(content), chunk_size=chunk_size))
+        assert docs == expected
+
+    @pytest.mark.parametrize("chunk_size", [1, 3, 1024])
+    def test_many_docs_with_header(self, chunk_size):
+        docs = [
+            {"id": str(n), "title": f"Tytuł \u201c{n}\u201d ]}}", "isbn": ["1", "2"]}
+            for n in range(20)
+        ]
+        body = {
+            "responseHeader": {"params": {"q": '"docs":[', "fl": "id"}},
+            "response": {"numFound": 20, "start": 0, "docs": docs},
+        }
+        content = json.dumps(body, ensure_ascii=False, indent=1).encode("utf-8")
+        response = make_stream_response(content)
+        assert list(iter_docs(response, chunk_size=chunk_size)) == docs
+
+    def test_empty_docs(self):
+        content = b'{"response":{"numFound":0,"start":0,"docs":[]}}'
+        assert list(iter_docs(make_stream_response(content))) == []
+
+    def test_is_lazy(self):
+        content = b'{"response":{"docs":[{"id":"1"},{"id":"2"}'
+        docs = iter_docs(make_stream_response(content), chunk_size=8)
+        assert next(docs) == {"id": "1"}
+        assert next(docs) == {"id": "2"}
+        with pytest.raises(BookopsSolrError) as exc:
+            next(docs)
+        assert "Incomplete BPL Solr response." in str(exc.value)
+
+    def test_missing_docs(self):
+        content = b'{"error":{"msg":"undefined field foo","code":400}}'
+        with pytest.raises(BookopsSolrError) as exc:
+            list(iter_docs(make_stream_response(content)))
+        assert "BPL Solr response does not include documents." in str(exc.value)
+
+    def test_cached_response(self, mock_solr_json):
+        mock_solr_json({"response": {"numFound": 1, "docs": [{"id": "12345678"}]}})
+        with SolrSession("my_client_key", "example.com", cache=MemoryCache()) as s:
+            s.search_bibNo("12345678")
+            cached = s.search_bibNo("12345678")
+        assert s.cache.hits == 1
+        assert [doc["id"] for doc in iter_docs(cached)] == ["12345678"]
+
+    def test_cached_response_without_consumed_flag(self):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'{"response":{"docs":[{"id":"1"}]}}'
+        assert response.raw is None
+        assert list(iter_docs(response)) == [{"id": "1"}]
+
+    def test_http_error(self):
+        with pytest.raises(BookopsSolrError) as exc:
+            list(iter_docs(make_stream_response(b"", status_code=503)))
+        assert "BPL Solr returned unexpected HTTP status: 503." in str(exc.value)
+
+    @pytest.mark.parametrize("decoder", ["auto", "json", "orjson", "msgspec"])
+    def test_downloaded_body(self, decoder):
+        content = load_example("response-example-ebok.json")
+        response = make_response(content)
+        response._content_consumed = True
+        expected = json.loads(content)["response"]["docs"]
+        assert list(iter_docs(response, json_decoder=decoder)) == expected
+
+    def test_session_iter_docs_uses_session_decoder(self, monkeypatch):
+        used = []
+        monkeypatch.setattr(
+            "bookops_bpl_solr.results.get_decoder",
+            lambda name: used.append(name) or json.loads,
+        )
+        content = load_example("response-example-ebok.json")
+        expected = json.loads(content)["response"]["docs"]
+        with SolrSession("my_client_key", "example.com", json_decoder="json") as s:
+            assert list(s.iter_docs(make_response(content))) == expected
+            stream = make_stream_response(content)
+            assert list(s.iter_docs(stream, chunk_size=7)) == expected
+        assert used == ["json"]
+
+    @pytest.mark.parametrize(
+        "content,msg",
+        [
+            (b"<html>", "Unable to decode BPL Solr response."),
+            (b'{"error":{}}', "BPL Solr response does not include documents."),
+        ],
+    )
+    def test_downloaded_body_errors(self, content, msg):
+        response = make_response(content)
+        response._content_consumed = True
+        with pytest.raises(BookopsSolrError) as exc:
+            list(iter_docs(response))
+        assert msg in str(exc.value)
@@ -3,10 +3,18 @@
 """
 Tests session.py module
 """
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
 import pytest
+import requests
 
-from bookops_bpl_solr.session import SolrSession, BookopsSolrError
+from bookops_bpl_solr.cache import MemoryCache
+from bookops_bpl_solr.limiters import AdaptiveLimiter
+from bookops_bpl_solr.metrics import SessionMetrics
+from bookops_bpl_solr.session import SolrQuery, SolrSession, BookopsSolrError
 from bookops_bpl_solr import __title__, __version__
+from .conftest import MockSolrHTTP200Response, MockSuccessfulHTTP200SessionResponse
 
 
 class TestSolrSession:
@@ -36,6 +44,35 @@ class TestSolrSession:
             SolrSession(authorization="my_client_key", endpoint=arg)
         assert err_msg in str(exc.value)
 
+    @pytest.mark.parametrize("arg", [[], ["a.com", ""], ["a.com", 1], ("a.com",)])
+    def test_init_argument_endpoint_list_exceptions(self, arg):
+        err_msg = "Invalid endpoint argument. It must be a Client-Key string."
+        with pytest.raises(BookopsSolrError) as exc:
+            SolrSession(authorization="my_client_key", endpoint=arg)
+        assert err_msg in str(exc.value)
+
+    def test_init_endpoint_list(self):
+        session = SolrSession("my_client_key", ["a.com", "b.com", "a.com"])
+        assert session.endpoint == "a.com"
+        assert session.endpoints == ["a.com", "b.com"]
+        assert list(session.endpoint_stats()) == ["a.com", "b.com"]
+
+    @pytest.mark.parametrize(
+        "kwargs,err_msg",
+        [
+            ({"balancing": "random"}, "Invalid balancing argument."),
+            ({"eject_after": 0}, "eject_after argument must be a positive integer."),
+            (
+                {"eject_seconds": -1},
+                "eject_seconds argument must be a non-negative number.",
+            ),
+        ],
+    )
+    def test_init_balancing_argument_exceptions(self, kwargs, err_msg):
+        with pytest.raises(BookopsSolrError) as exc:
+            SolrSession("my_client_key", ["a.com", "b.com"], **kwargs)
+        assert err_msg in str(exc.value)
+
     @pytest.mark.parametrize("arg", [None, "", [], {}])
     def test_init_agent_default_param(self, arg):
         session = SolrSession("my_client_key", "example.com", agent=arg)
@@ -52,10 +89,196 @@ class TestSolrSession:
             SolrSession("my_client_key", "example.com", agent=arg)
         assert err_msg in str(exc.value)
 
+    def test_init_cache_default(self):
+        session = SolrSession("my_client_key", "example.com")
+        assert session.cache is None
+
+    def test_init_cache_argument_exception(self):
+        err_msg = "Invalid type of a cache argument."
+        with pytest.raises(BookopsSolrError) as exc:
+            SolrSession("my_client_key", "example.com", cache={})
+        assert err_msg in str(exc.value)
+
+    @pytest.mark.parametrize("arg", [-1, 1.5, None])
+    def test_init_retries_argument_exception(self, arg):
+        err_msg = "Retries argument must be a non-negative integer."
+        with pytest.raises(BookopsSolrError) as exc:
+            SolrSession("my_client_key", "example.com", retries=arg)
+        assert err_msg in str(exc.value)
+
+    @pytest.mark.parametrize("arg", [-1, "1", None])
+    def test_init_backoff_factor_argument_exception(self, arg):
+        err_msg = "Backoff factor argument must be a non-negative number."
+        with pytest.raises(BookopsSolrError) as exc:
+            SolrSession("my_client_key", "example.com", backoff_factor=arg)
+        assert err_msg in str(exc.value)
+
+    @pytest.mark.parametrize("arg", [-1, -0.5, "30", None])
+    def test_init_backoff_max_argument_exception(self, arg):
+        err_msg = "Backoff max argument must be a non-negative number."
+        with pytest.raises(BookopsSolrError) as exc:
+            SolrSession("my_client_key", "example.com", backoff_max=arg)
+        assert err_msg in str(exc.value)
+
+    def test_init_rate_limit(self):
+        session = SolrSession("my_client_key", "example.com", rate_limit=5)
+        assert session.rate_limiter.rate == 5
+
+    @pytest.mark.parametrize("arg", [0, -1, "5"])
+    def test_init_rate_limit_argument_exception(self, arg):
+        err_msg = "Rate limit argument must be a positive number."
+        with pytest.raises(BookopsSolrError) as exc:
+            SolrSession("my_client_key", "example.com", rate_limit=arg)
+        assert err_msg in str(exc.value)
+
+    def test_init_pool_defaults(self):
+        session = SolrSession("my_client_key", "example.com")
+        adapter = session.get_adapter("https://example.com")
+        assert session.pool_connections == 10
+        assert session.pool_maxsize == 10
+        assert session.pool_block is False
+        assert session.keep_alive is True
+        assert adapter._pool_maxsize == 10
+        assert session.headers["Connection"] == "keep-alive"
+
+    def test_init_pool_custom(self):
+        session = SolrSession(
+            "my_client_key",
+            "example.com",
+            pool_connections=2,
+            pool_maxsize=32,
+            pool_block=True,
+        )
+        for prefix in ("https://", "http://"):
+            adapter = session.get_adapter(f"{prefix}example.com")
+            assert adapter._pool_connections == 2
+            assert adapter._pool_maxsize == 32
+            assert adapter._pool_block is True
+
+    @pytest.mark.parametrize("arg", ["pool_connections", "pool_maxsize"])
+    @pytest.mark.parametrize("value", [0, -1, "5", None])
+    def test_init_pool_argument_exceptions(self, arg, value):
+        err_msg = f"{arg} argument must be a positive integer."
+        with pytest.raises(BookopsSolrError) as exc:
+            SolrSession("my_client_key", "example.com", **{arg: value})
+        assert err_msg in str(exc.value)
+
+    def test_init_keep_alive_disabled(self):
+        session = SolrSession("my_client_key", "example.com", keep_alive=False)
+        assert session.headers["Connection"] == "close"
+
+    def test_init_accept_encoding(self):
+        session = SolrSession("my_client_key", "example.com")
+        encodings = session.headers["Accept-Encoding"].split(",")
+        assert {"gzip", "deflate"}.issubset(encodings)
+
+    def test_init_json_decoder_default(self):
+        session = SolrSession("my_client_key", "example.com")
+        assert session.json_decoder in ("orjson", "msgspec", "json")
+
+    @pytest.mark.parametrize("arg", ["json", "orjson", "msgspec"])
+    def test_init_json_decoder(self, arg, mock_solr):
+        pytest.importorskip(arg)
+        mock_solr([{"id": "12345678"}])
+        with SolrSession("my_client_key", "example.com", json_decoder=arg) as session:
+            assert session.json_decoder == arg
+            assert session.search_bibNos(["b123456789"]) == {
+                "docs": {"b123456789": {"id": "12345678"}},
+                "invalid": [],
+            }
+
+    def test_init_json_decoder_fallback(self, monkeypatch):
+        monkeypatch.setattr("bookops_bpl_solr.decoders.orjson", None)
+        monkeypatch.setattr("bookops_bpl_solr.decoders.msgspec", None)
+        for arg in ("auto", "orjson"):
+            session = SolrSession("my_client_key", "example.com", json_decoder=arg)
+            assert session.json_decoder == "json"
+
+    @pytest.mark.parametrize("arg", [None, "ujson"])
+    def test_init_json_decoder_argument_exception(self, arg):
+        err_msg = "Invalid json_decoder argument."
+        with pytest.raises(BookopsSolrError) as exc:
+            SolrSession("my_client_key", "example.com", json_decoder=arg)
+        assert err_msg in str(exc.value)
+
+    def test_pool_stats(self, local_solr):
+        with SolrSession("my_client_key", local_solr) as session:
+            assert session.pool_stats() == {}
+            session.search_bibNo("b123456789")
+            session.search_bibNo("b123456789")
+            host = local_solr.split("/select")[0]
+            assert session.pool_stats() == {
+                host: {
+                    "num_connections": 1,
+                    "num_requests": 2,
+                    "idle": 10,
+                    "maxsize": 10,
+                }
+            }
+
     def test_authorization_in_header(self):
         session = SolrSession("my_client_key", "example.com")
         assert session.headers["Client-Key"] == "my_client_key"
 
+    def test_batch_keywords_max_clauses(self, stub_session, monkeypatch):
+        monkeypatch.setattr(SolrSession, "MAX_QUERY_CLAUSES", 2)
+        assert list(stub_session._batch_keywords(["a", "b", "c", "d", "e"])) == [
+            ["a", "b"],
+            ["c", "d"],
+            ["e"],
+        ]
+
+    def test_batch_keywords_max_length(self, stub_session, monkeypatch):
+        monkeypatch.setattr(SolrSession, "MAX_QUERY_LENGTH", 20)
+        assert list(
+            stub_session._batch_keywords(["12345678", "23456789", "34567890"])
+        ) == [["12345678"], ["23456789"], ["34567890"]]
+
+    def test_batch_keywords_empty(self, stub_session):
+        assert list(stub_session._batch_keywords([])) == []
+
+    @pytest.mark.parametrize(
+        "query_parser,expectation",
+        [
+            ("lucene", "isbn:(978123 OR 978456)"),
+            ("terms", "{!terms f=isbn}978123,978456"),
+        ],
+    )
+    def test_keywords_query(self, stub_session, query_parser, expectation):
+        assert (
+            stub_session._keywords_query("isbn", ["978123", "978456"], query_parser)
+            == expectation
+        )
+
+    @pytest.mark.parametrize("arg", [None, "", "dismax"])
+    def test_keywords_query_invalid_query_parser(self, stub_session, arg):
+        err_msg = "Invalid query_parser argument. Must be 'lucene' or 'terms'."
+        with pytest.raises(BookopsSolrError) as exc:
+            stub_session._keywords_query("isbn", ["978123"], arg)
+        assert err_msg in str(exc.value)
+
+    @pytest.mark.parametrize(
+        "as_filter,expectation",
+        [
+            (False, {"q": "id:1"}),
+            (True, {"q": "*:*", "fq": ["ss_type:catalog", "id:1"]}),
+        ],
+    )
+    def test_query_or_filter(self, stub_session, as_filter, expectation):
+        assert stub_session._query_or_filter("id:1", as_filter) == expectation
+
+    @pytest.mark.parametrize(
+        "arg,expectation",
+        [
+            (None, "id asc"),
+            ("", "id asc"),
+            ("created_date desc", "created_date desc,id asc"),
+            ("created_date desc, id desc", "created_date desc, id desc"),
+        ],
+    )
+    def test_cursor_sort(self, stub_session, arg, expectation):
+        assert stub_session._cursor_sort(arg) == expectation
+
     @pytest.mark.parametrize(
         "arg_def,arg_field,expectation",
         [
@@ -82,6 +305,24 @@ class TestSolrSession:
             == expectation
         )
 
+    def test_determine_response_fields_changed_defaults(self, stub_session):
+        stub_session.DEFAULT_RESPONSE_FIELDS = ["id", "title"]
+        assert stub_session._determine_response_fields(True, None) == "id,title"
+
+    def test_default_fl_joined_once(self, stub_session):
+        assert stub_session._default_fl() is stub_session._default_fl()
+
+    @pytest.mark.parametrize(
+        "arg,expectation",
+        [
+            (None, None),
+            ("id,title", "id,title"),
+            ("title", "title,id"),
+        ],
+    )
+    def test_include_response_field(self, stub_session, arg, expectation):
+        assert stub_session._include_response_field(arg, "id") == expectation
+
     @pytest.mark.parametrize(
         "arg,expectation",
         [
@@ -101,6 +342,14 @@ class TestSolrSession:
                     "fl": "id,title,author_raw",
                 },
             ),
+            (
+                {"q": "*:*", "fq": ["ss_type:catalog", "a:1", "ss_type:catalog"]},
+                {"q": "*:*", "rows": 10, "fq": ["ss_type:catalog", "a:1"]},
+            ),
+            (
+                SolrQuery("foo", rows=5).filter("a:1"),
+                {"q": "foo", "rows": 5, "fq": ["ss_type:catalog", "a:1"]},
+            ),
         ],
     )
     def test_merge_payload_with_defaults(self, stub_session, arg, expectation):
@@ -119,6 +368,21 @@ class TestSolrSession:
             stub_session._prep_response_fields(arg)
         assert err_msg in str(exc.value)
 
+    def test_parse_response_http_error(self, stub_session):
+        response = MockSuccessfulHTTP200SessionResponse()
+        response.status_code = 500
+        with pytest.raises(BookopsSolrError) as exc:
+            stub_session._parse_response(response)
+        assert "BPL Solr returned unexpected HTTP status: 500." in str(exc.value)
+
+    def test_parse_response_decode_error(self, stub_session):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b"<html>"
+        with pytest.raises(BookopsSolrError) as exc:
+            stub_session._parse_response(response)
+        assert "Unable to decode BPL Solr response." in str(exc.value)
+
     @pytest.mark.parametrize("arg", [({}, None, "some_str")])
     def test_send_request_payload_errors(self, stub_session, arg):
         err_msg = "Missing or invalid payload argument."
@@ -132,6 +396,394 @@ class TestSolrSession:
         response = stub_session._send_request({"q": "zendegi"})
         assert response.status_code == 200
 
+    def test_send_request_long_payload_sent_as_post(self, stub_session, monkeypatch):
+        monkeypatch.setattr(SolrSession, "MAX_URL_LENGTH", 50)
+        sent = {}
+
+        def mock_post(session, url, data=None, **kwargs):
+            sent["data"] = data
+            return MockSuccessfulHTTP200SessionResponse()
+
+        monkeypatch.setattr(requests.Session, "post", mock_post)
+        response = stub_session._send_request(
+            {"q": "isbn:9781680502404 OR 9781419741890 OR 9780810984912"}
+        )
+        assert response.status_code == 200
+        assert sent["data"]["q"] == (
+            "isbn:9781680502404 OR 9781419741890 OR 9780810984912"
+        )
+
+    @pytest.mark.parametrize(
+        "arg,expectation",
+        [
+            ({"q": "id:12345678", "fl": None}, False),
+            ({"q": "id:12345678", "fl": "id,title"}, False),
+            ({"q": "id:12345678", "fl": "x" * 6000}, True),
+        ],
+    )
+    def test_is_url_too_long(self, stub_session, arg, expectation):
+        assert stub_session._is_url_too_long(arg) is expectation
+
+    def test_send_request_cached(self, monkeypatch):
+        calls = []
+
+        def mock_get(session, url, params=None, **kwargs):
+            calls.append(params)
+            response = requests.Response()
+            response.status_code = 200
+            response._content = b'{"response":{"numFound":1,"docs":[{"id":"1"}]}}'
+            return response
+
+        monkeypatch.setattr(requests.Session, "get", mock_get)
+        cache = MemoryCache()
+        session = SolrSession("my_client_key", "example.com", cache=cache)
+        first = session._send_request({"q": "id:1", "rows": 10})
+        second = session._send_request({"rows": 10, "q": "id:1"})
+        session._send_request({"q": "id:2"})
+        assert len(calls) == 2
+        assert first.json() == second.json()
+        assert cache.stats() == {"hits": 1, "misses": 2, "size": 2}
+
+    def test_init_metrics_argument_exception(self):
+        err_msg = "Invalid type of a metrics argument."
+        with pytest.raises(BookopsSolrError) as exc:
+            SolrSession("my_client_key", "example.com", metrics={})
+        assert err_msg in str(exc.value)
+
+    def test_metrics_recorded(self, mock_solr):
+        mock_solr([{"id": "12345678", "isbn": ["9781680502404"]}])
+        metrics = SessionMetrics()
+        session = SolrSession("my_client_key", "example.com", metrics=metrics)
+        session.search_bibNo("b123456789")
+        session.bulk_search_isbns(["9781680502404"])
+        session._send_request({"q": "id:1"})
+        snapshot = metrics.snapshot()
+        assert list(snapshot) == ["_send_request", "bulk_search_isbns", "search_bibNo"]
+        assert snapshot["bulk_search_isbns"]["requests"] == 1
+        assert snapshot["search_bibNo"]["statuses"] == {"200": 1}
+
+    def test_metrics_qtime_and_bytes(self, monkeypatch):
+        content = b'{"responseHeader":{"QTime":7},"response":{"numFound":0,"docs":[]}}'
+
+        def mock_get(session, url, params=None, **kwargs):
+            response = requests.Response()
+            response.status_code = 200
+            response._content = content
+            return response
+
+        monkeypatch.setattr(requests.Session, "get", mock_get)
+        metrics = SessionMetrics()
+        SolrSession("my_client_key", "example.com", metrics=metrics).search_isbns(
+            ["9781680502404"]
+        )
+        data = metrics.snapshot()["search_isbns"]
+        assert data["response_bytes"] == len(content)
+        assert data["qtime"]["sum"] == 0.007
+        assert data["qtime"]["count"] == 1
+
+    def test_metrics_errors_and_retries(self, mock_sequence, mock_sleep):
+        mock_sequence([requests.exceptions.Timeout, 503, 200])
+        metrics = SessionMetrics()
+        session = SolrSession(
+            "my_client_key", "example.com", retries=2, metrics=metrics
+        )
+        session.search_controlNo("ocn123")
+        data = metrics.snapshot()["search_controlNo"]
+        assert data["errors"] == {"Timeout": 1}
+        assert data["retries"] == 2
+        assert data["statuses"] == {"503": 1, "200": 1}
+
+    def test_metrics_iter_query(self, mock_solr):
+        mock_solr([{"id": "1"}, {"id": "2"}])
+        metrics = SessionMetrics()
+        session = SolrSession("my_client_key", "example.com", metrics=metrics)
+        for _ in session.iter_query({"q": "*:*", "rows": 1}):
+            session.search_bibNo("b123456789")
+        assert metrics.snapshot()["search_bibNo"]["requests"] == 2
+        assert "iter_query" in metrics.snapshot()
+
+    def test_init_coalesce_default(self):
+        assert SolrSession("my_client_key", "example.com").single_flight is None
+
+    def test_send_request_coalesced(self, monkeypatch):
+        calls = []
+        release = threading.Event()
+
+        def mock_get(session, url, params=None, **kwargs):
+            calls.append(params)
+            release.wait(5)
+            response = requests.Response()
+            response.status_code = 200
+            response._content = b'{"response":{"numFound":1,"docs":[{"id":"1"}]}}'
+            return response
+
+        monkeypatch.setattr(requests.Session, "get", mock_get)
+        cache = MemoryCache()
+        session = SolrSession(
+            "my_client_key", "example.com", cache=cache, coalesce=True
+        )
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [
+                executor.submit(session.search_bibNo, "b123456789") for _ in range(4)
+            ]
+            while session.single_flight.shared < 3:
+                threading.Event().wait(0.001)
+            release.set()
+            responses = [future.result() for future in futures]
+        assert len(calls) == 1
+        assert all(response is responses[0] for response in responses)
+        assert cache.stats()["size"] == 1
+
+    def test_send_request_stream_not_coalesced(self, mock_sequence):
+        calls = mock_sequence([200, 200])
+        session = SolrSession("my_client_key", "example.com", coalesce=True)
+        session._send_request({"q": "id:1"}, stream=True)
+        session._send_request({"q": "id:1"}, stream=True)
+        assert len(calls) == 2
+        assert session.single_flight.shared == 0
+
+    def test_send_request_retries_statuses(self, mock_sequence, mock_sleep):
+        calls = mock_sequence([503, 429, 200])
+        session = SolrSession("my_client_key", "example.com", retries=3)
+        response = session._send_request({"q": "zendegi"})
+        assert response.status_code == 200
+        assert len(calls) == 3
+        assert len(mock_sleep) == 2
+
+    def test_send_request_retries_exhausted(self, mock_sequence, mock_sleep):
+        calls = mock_sequence([500, 502, 504])
+        session = SolrSession("my_client_key", "example.com", retries=2)
+        response = session._send_request({"q": "zendegi"})
+        assert response.status_code == 504
+        assert len(calls) == 3
+
+    def test_send_request_no_retries_by_default(self, mock_sequence, mock_sleep):
+        calls = mock_sequence([503, 200])
+        response = SolrSession("my_client_key", "example.com")._send_request(
+            {"q": "zendegi"}
+        )
+        assert response.status_code == 503
+        assert len(calls) == 1
+        assert mock_sleep == []
+
+    def test_send_request_retries_connection_errors(self, mock_sequence, mock_sleep):
+        calls = mock_sequence(
+            [requests.exceptions.ConnectionError, requests.exceptions.Timeout, 200]
+        )
+        session = SolrSession("my_client_key", "example.com", retries=2)
+        assert session._send_request({"q": "zendegi"}).status_code == 200
+        assert len(calls) == 3
+
+    def test_send_request_connection_errors_exhausted(self, mock_sequence, mock_sleep):
+        mock_sequence([requests.exceptions.Timeout, requests.exceptions.Timeout])
+        session = SolrSession("my_client_key", "example.com", retries=1)
+        with pytest.raises(BookopsSolrError) as exc:
+            session._send_request({"q": "zendegi"})
+        assert "Connection error" in str(exc.value)
+
+    def test_send_request_honors_retry_after(self, mock_sequence, mock_sleep):
+        mock_sequence([(429, {"Retry-After": "7"}), 200])
+        session = SolrSession("my_client_key", "example.com", retries=1)
+        session._send_request({"q": "zendegi"})
+        assert mock_sleep == [7.0]
+
+    def test_send_request_backoff_delays(self, mock_sequence, mock_sleep):
+        mock_sequence([503, 503, 503, 200])
+        session = SolrSession(
+            "my_client_key", "example.com", retries=3, backoff_factor=1, backoff_max=3
+        )
+        session._send_request({"q": "zendegi"})
+        assert len(mock_sleep) == 3
+        assert 0 <= mock_sleep[0] <= 1
+        assert 0 <= mock_sleep[1] <= 2
+        assert 0 <= mock_sleep[2] <= 3
+
+    def test_send_request_rate_limited(self, mock_sequence, monkeypatch):
+        mock_sequence([200, 200])
+        acquired = []
+        session = SolrSession("my_client_key", "example.com", rate_limit=10)
+        monkeypatch.setattr(session.rate_limiter, "acquire", lambda: acquired.append(1))
+        session._send_request({"q": "zendegi"})
+        session._send_request({"q": "zendegi"})
+        assert len(acquired) == 2
+
+    def test_send_request_spreads_endpoints(self, mock_sequence):
+        calls = mock_sequence([200, 200, 200, 200])
+        session = SolrSession("my_client_key", ["a.com", "b.com"])
+        for _ in range(4):
+            session._send_request({"q": "zendegi"})
+        assert [call["url"] for call in calls] == ["a.com", "b.com", "a.com", "b.com"]
+
+    @pytest.mark.parametrize(
+        "outcome",
+        [requests.exceptions.ConnectionError, requests.exceptions.Timeout, 503],
+    )
+    def test_send_request_fails_over(self, mock_sequence, mock_sleep, outcome):
+        calls = mock_sequence([outcome, 200])
+        session = SolrSession("my_client_key", ["a.com", "b.com"])
+        assert session._send_request({"q": "zendegi"}).status_code == 200
+        assert [call["url"] for call in calls] == ["a.com", "b.com"]
+        assert mock_sleep == []
+        assert session.endpoint_stats()["a.com"]["failures"] == 1
+
+    def test_send_request_fail_over_exhausted(self, mock_sequence, mock_sleep):
+        calls = mock_sequence([requests.exceptions.Timeout] * 2)
+        session = SolrSession("my_client_key", ["a.com", "b.com"])
+        with pytest.raises(BookopsSolrError) as exc:
+            session._send_request({"q": "zendegi"})
+        assert "Connection error" in str(exc.value)
+        assert [call["url"] for call in calls] == ["a.com", "b.com"]
+
+    def test_send_request_fail_over_then_retries(self, mock_sequence, mock_sleep):
+        calls = mock_sequence([503, 503, 200])
+        session = SolrSession("my_client_key", ["a.com", "b.com"], retries=1)
+        assert session._send_request({"q": "zendegi"}).status_code == 200
+        assert len(calls) == 3
+        assert len(mock_sleep) == 1
+
+    def test_send_request_no_fail_over_on_rate_limit(self, mock_sequence, mock_sleep):
+        calls = mock_sequence([429, 200])
+        session = SolrSession("my_client_key", ["a.com", "b.com"])
+        assert session._send_request({"q": "zendegi"}).status_code == 429
+        assert len(calls) == 1
+
+    def test_send_request_ejects_failing_endpoint(self, mock_sequence, mock_sleep):
+        calls = mock_sequence([503, 200, 503, 200, 200, 200])
+        session = SolrSession(
+            "my_client_key", ["a.com", "b.com"], eject_after=2, eject_seconds=60
+        )
+        for _ in range(4):
+            session._send_request({"q": "zendegi"})
+        assert [call["url"] for call in calls] == [
+            "a.com",
+            "b.com",
+            "a.com",
+            "b.com",
+            "b.com",
+            "b.com",
+        ]
+        assert session.endpoint_stats()["a.com"]["ejected"] is True
+
+    def test_init_concurrency_limiter_argument_exception(self):
+        err_msg = "Invalid type of a concurrency_limiter argument."
+        with pytest.raises(BookopsSolrError) as exc:
+            SolrSession("my_client_key", "example.com", concurrency_limiter=4)
+        assert err_msg in str(exc.value)
+
+    def test_send_request_concurrency_limiter(self, mock_sequence, mock_sleep):
+        mock_sequence([200, 503, 200])
+        limiter = AdaptiveLimiter(initial_limit=8)
+        session = SolrSession(
+            "my_client_key", "example.com", retries=1, concurrency_limiter=limiter
+        )
+        session._send_request({"q": "zendegi"})
+        session._send_request({"q": "zendegi"})
+        assert limiter.inflight == 0
+        assert limiter.decreases == 1
+        assert limiter.limit == 4
+
+    def test_send_request_concurrency_limiter_timeout(self, mock_sequence):
+        mock_sequence([requests.exceptions.Timeout])
+        limiter = AdaptiveLimiter(initial_limit=8)
+        session = SolrSession(
+            "my_client_key", "example.com", concurrency_limiter=limiter
+        )
+        with pytest.raises(BookopsSolrError):
+            session._send_request({"q": "zendegi"})
+        assert limiter.inflight == 0
+        assert limiter.limit == 4
+
+    def test_send_request_concurrency_limiter_balancer_error(self, monkeypatch):
+        limiter = AdaptiveLimiter(initial_limit=8)
+        session = SolrSession(
+            "my_client_key", "example.com", concurrency_limiter=limiter
+        )
+
+        def broken(*args, **kwargs):
+            raise RuntimeError("no endpoint")
+
+        monkeypatch.setattr(session.balancer, "acquire", broken)
+        with pytest.raises(RuntimeError):
+            session._send_request({"q": "zendegi"})
+        assert limiter.inflight == 0
+        assert limiter.limit == 8
+
+    @pytest.mark.parametrize(
+        "arg,expectation",
+        [
+            (None, None),
+            ("5", 5.0),
+            ("-5", 0.0),
+            ("foo", None),
+            ("Wed, 21 Oct 2015 07:28:00 GMT", 0.0),
+        ],
+    )
+    def test_retry_after(self, stub_session, arg, expectation):
+        response = requests.Response()
+        if arg is not None:
+            response.headers["Retry-After"] = arg
+        assert stub_session._retry_after(response) == expectation
+
+    def test_retry_after_future_date(self, stub_session, monkeypatch):
+        monkeypatch.setattr("time.time", lambda: 1445412470.0)
+        response = requests.Response()
+        response.headers["Retry-After"] = "Wed, 21 Oct 2015 07:28:00 GMT"
+        assert stub_session._retry_after(response) == 10.0
+
+    def test_send_request_stream(self, stub_session, monkeypatch):
+        sent = {}
+
+        def mock_get(session, url, params=None, **kwargs):
+            sent.update(kwargs)
+            return MockSuccessfulHTTP200SessionResponse()
+
+        monkeypatch.setattr(requests.Session, "get", mock_get)
+        stub_session._send_request({"q": "zendegi"}, stream=True)
+        assert sent["stream"] is True
+
+    def test_send_request_stream_bypasses_cache(self, monkeypatch):
+        monkeypatch.setattr(
+            requests.Session,
+            "get",
+            lambda *args, **kwargs: MockSuccessfulHTTP200SessionResponse(),
+        )
+        cache = MemoryCache()
+        session = SolrSession("my_client_key", "example.com", cache=cache)
+        session._send_request({"q": "zendegi"}, stream=True)
+        assert cache.stats() == {"hits": 0, "misses": 0, "size": 0}
+
+    @pytest.mark.parametrize(
+        "method,arg",
+        [
+            ("search_bibNo", "b123456789"),
+            ("search_controlNo", "ocn123"),
+            ("search_isbns", ["9781680502404"]),
+            ("search_reserveId", "some_string"),
+            ("search_upcs", ["085391200390"]),
+        ],
+    )
+    def test_search_methods_stream(self, stub_session, monkeypatch, method, arg):
+        sent = {}
+
+        def mock_get(session, url, params=None, **kwargs):
+            sent.update(kwargs)
+            return MockSuccessfulHTTP200SessionResponse()
+
+        monkeypatch.setattr(requests.Session, "get", mock_get)
+        getattr(stub_session, method)(arg, stream=True)
+        assert sent["stream"] is True
+
+    def test_find_expired_econtent_stream(self, stub_session, monkeypatch):
+        sent = {}
+
+        def mock_get(session, url, params=None, **kwargs):
+            sent.update(kwargs)
+            return MockSuccessfulHTTP200SessionResponse()
+
+        monkeypatch.setattr(requests.Session, "get", mock_get)
+        stub_session.find_expired_econtent(rows=100, stream=True)
+        assert sent["stream"] is True
+
     def test_send_request_timeout_error(self, stub_session, mock_timeout):
         with pytest.raises(BookopsSolrError):
             stub_session._send_request({"q": "zendegi"})
@@ -167,6 +819,153 @@ class TestSolrSession:
             stub_session._prep_sierra_number(arg)
         assert err_msg in str(exc.value)
 
+    def test_bulk_search_isbns_success(self, stub_session, mock_solr, monkeypatch):
+        monkeypatch.setattr(SolrSession, "MAX_QUERY_CLAUSES", 1)
+        solr = mock_solr(
+            [
+                {"id": "12345678", "isbn": ["9781680502404", "1680502409"]},
+                {"id": "23456789", "isbn": ["9781680502404"]},
+                {"id": "34567890", "isbn": ["9780810984912"]},
+            ]
+        )
+        result = stub_session.bulk_search_isbns(
+            ["9781680502404", "1680502409", "9781680502404", "9781419741890"],
+            normalize=False,
+        )
+        assert len(solr.requests) == 4
+        assert result["numFound"] == 2
+        assert [doc["id"] for doc in result["docs"]] == ["12345678", "23456789"]
+        assert result["matches"] == {
+            "9781680502404": ["12345678", "23456789"],
+            "1680502409": ["12345678"],
+            "9781419741890": [],
+        }
+
+    def test_bulk_search_isbns_pages_results(self, stub_session, mock_solr):
+        solr = mock_solr(
+            [
+                {"id": "12345678", "isbn": ["9781680502404"]},
+                {"id": "23456789", "isbn": ["9781680502404"]},
+            ]
+        )
+        result = stub_session.bulk_search_isbns(["9781680502404"], normalize=False)
+        assert [r["start"] for r in solr.requests] == [0, 1]
+        assert result["matches"] == {"9781680502404": ["12345678", "23456789"]}
+
+    def test_bulk_search_isbns_normalized(self, stub_session, mock_solr):
+        solr = mock_solr(
+            [
+                {"id": "12345678", "isbn": ["978-1-68050-240-4", "1680502409"]},
+                {"id": "23456789", "isbn": ["1680502409"]},
+                {"id": "34567890", "isbn": ["9780810984912"]},
+            ]
+        )
+        result = stub_session.bulk_search_isbns(
+            ["9781680502404", "168050240-9", "1680502409", "9781419741890", "123"]
+        )
+        assert len(solr.requests) == 1
+        assert solr.requests[0]["q"] == (
+            "isbn:(9781680502404 OR 1680502409 OR 9781419741890 OR 1419741896)"
+        )
+        assert result["matches"] == {
+            "9781680502404": ["12345678", "23456789"],
+            "168050240-9": ["12345678", "23456789"],
+            "1680502409": ["12345678", "23456789"],
+            "9781419741890": [],
+            "123": [],
+        }
+        assert result["invalid"] == ["123"]
+
+    def test_bulk_search_isbns_all_invalid(self, stub_session, mock_solr):
+        solr = mock_solr([])
+        result = stub_session.bulk_search_isbns(["9781680502405", "foo"])
+        assert solr.requests == []
+        assert result == {
+            "numFound": 0,
+            "docs": [],
+            "matches": {"9781680502405": [], "foo": []},
+            "invalid": ["9781680502405", "foo"],
+        }
+
+    def test_bulk_search_isbns_terms_query_parser(
+        self, stub_session, mock_solr, monkeypatch
+    ):
+        monkeypatch.setattr(SolrSession, "MAX_QUERY_CLAUSES", 1)
+        monkeypatch.setattr(SolrSession, "MAX_TERMS_KEYWORDS", 2)
+        solr = mock_solr([{"id": "12345678", "isbn": ["9781680502404"]}])
+        result = stub_session.bulk_search_isbns(
+            ["9781680502404", "1680502409", "9781419741890"],
+            query_parser="terms",
+            as_filter=True,
+            normalize=False,
+        )
+        assert [r["fq"] for r in solr.requests] == [
+            ["ss_type:catalog", "{!terms f=isbn}9781680502404,1680502409"],
+            ["ss_type:catalog", "{!terms f=isbn}9781419741890"],
+        ]
+        assert all(r["q"] == "*:*" for r in solr.requests)
+        assert result["matches"] == {
+            "9781680502404": ["12345678"],
+            "1680502409": [],
+            "9781419741890": [],
+        }
+
+    def test_bulk_search_isbns_invalid_query_parser(self, stub_session):
+        with pytest.raises(BookopsSolrError):
+            stub_session.bulk_search_isbns(["9781680502404"], query_parser="foo")
+
+    @pytest.mark.parametrize("arg", [None, "", "9781680502404"])
+    def test_bulk_search_isbns_invalid_keywords_type(self, stub_session, arg):
+        err_msg = "ISBN keywords argument must be a list."
+        with pytest.raises(BookopsSolrError) as exc:
+            stub_session.bulk_search_isbns(arg)
+        assert err_msg in str(exc.value)
+
+    def test_bulk_search_isbns_empty_list(self, stub_session):
+        err_msg = "ISBN keywords argument is an empty list."
+        with pytest.raises(BookopsSolrError) as exc:
+            stub_session.bulk_search_isbns([])
+        assert err_msg in str(exc.value)
+
+    def test_bulk_search_upcs_success(self, stub_session, mock_solr):
+        solr = mock_solr([{"id": "12345678", "sm_marc_tag_024_a": ["085391200390"]}])
+        result = stub_session.bulk_search_upcs(
+            ["085391200390", "085391200391"], normalize=False
+        )
+        assert solr.requests[0]["q"] == (
+            "sm_marc_tag_024_a:(085391200390 OR 085391200391)"
+        )
+        assert solr.requests[0]["fl"].endswith(",sm_marc_tag_024_a")
+        assert result["matches"] == {
+            "085391200390": ["12345678"],
+            "085391200391": [],
+        }
+
+    def test_bulk_search_upcs_normalized(self, stub_session, mock_solr):
+        solr = mock_solr([{"id": "12345678", "sm_marc_tag_024_a": ["0085391200390"]}])
+        result = stub_session.bulk_search_upcs(["085391200390", "085391200391"])
+        assert solr.requests[0]["q"] == (
+            "sm_marc_tag_024_a:(085391200390 OR 0085391200390)"
+        )
+        assert result["matches"] == {
+            "085391200390": ["12345678"],
+            "085391200391": [],
+        }
+        assert result["invalid"] == ["085391200391"]
+
+    @pytest.mark.parametrize("arg", [None, "", "085391200390"])
+    def test_bulk_search_upcs_invalid_keywords_type(self, stub_session, arg):
+        err_msg = "UPC keywords argument must be a list."
+        with pytest.raises(BookopsSolrError) as exc:
+            stub_session.bulk_search_upcs(arg)
+        assert err_msg in str(exc.value)
+
+    def test_bulk_search_upcs_empty_list(self, stub_session):
+        err_msg = "UPC keywords argument is an empty list."
+        with pytest.raises(BookopsSolrError) as exc:
+            stub_session.bulk_search_upcs([])
+        assert err_msg in str(exc.value)
+
     def test_search_bibNo_success(
         self, stub_session, mock_successful_session_get_response
     ):
@@ -192,6 +991,89 @@ class TestSolrSession:
         with pytest.raises(BookopsSolrError):
             stub_session.search_bibNo("b123456789")
 
+    def test_search_bibNos_success(self, stub_session, mock_solr):
+        mock_solr([{"id": "12345678"}, {"id": "23456789"}])
+        assert stub_session.search_bibNos(
+            ["b123456789", 234567890, "b12345678a", "34567890"]
+        ) == {
+            "docs": {
+                "b123456789": {"id": "12345678"},
+                234567890: {"id": "23456789"},
+                "b12345678a": {"id": "12345678"},
+                "34567890": None,
+            },
+            "invalid": [],
+        }
+
+    def test_search_bibNos_deduplicates_and_batches(
+        self, stub_session, mock_solr, monkeypatch
+    ):
+        monkeypatch.setattr(SolrSession, "MAX_QUERY_CLAUSES", 2)
+        solr = mock_solr([{"id": "12345678"}])
+        stub_session.search_bibNos(
+            ["b123456789", "12345678", "23456789", "34567890", "45678901"]
+        )
+        assert [r["q"] for r in solr.requests] == [
+            "id:(12345678 OR 23456789)",
+            "id:(34567890 OR 45678901)",
+        ]
+        assert solr.requests[0]["rows"] == 2
+
+    def test_search_bibNos_terms_filter(self, stub_session, mock_solr):
+        solr = mock_solr([{"id": "12345678"}])
+        assert stub_session.search_bibNos(
+            ["b123456789", "23456789"], query_parser="terms", as_filter=True
+        )["docs"] == {"b123456789": {"id": "12345678"}, "23456789": None}
+        assert solr.requests[0]["fq"][1] == "{!terms f=id}12345678,23456789"
+
+    def test_search_bibNos_response_fields_include_id(self, stub_session, mock_solr):
+        solr = mock_solr([])
+        stub_session.search_bibNos(
+            ["12345678"], default_response_fields=False, response_fields="title"
+        )
+        assert solr.requests[0]["fl"] == "title,id"
+
+    @pytest.mark.parametrize("arg", [None, "b123456789", 123456789])
+    def test_search_bibNos_invalid_keywords_type(self, stub_session, arg):
+        err_msg = "Bib numbers keywords argument must be an iterable."
+        with pytest.raises(BookopsSolrError) as exc:
+            stub_session.search_bibNos(arg)
+        assert err_msg in str(exc.value)
+
+    def test_search_bibNos_empty_keywords(self, stub_session):
+        err_msg = "Bib numbers keywords argument is empty."
+        with pytest.raises(BookopsSolrError) as exc:
+            stub_session.search_bibNos([])
+        assert err_msg in str(exc.value)
+
+    def test_search_bibNos_invalid_keywords(self, stub_session, mock_solr):
+        solr = mock_solr([{"id": "12345678"}])
+        assert stub_session.search_bibNos(
+            ["b123456789", "", "bad", None, "b12345", "bad"]
+        ) == {
+            "docs": {
+                "b123456789": {"id": "12345678"},
+                "": None,
+                "bad": None,
+                None: None,
+                "b12345": None,
+            },
+            "invalid": ["", "bad", None, "b12345"],
+        }
+        assert [r["q"] for r in solr.requests] == ["id:(12345678)"]
+
+    def test_search_bibNos_only_invalid_keywords(self, stub_session, mock_solr):
+        solr = mock_solr([])
+        assert stub_session.search_bibNos(["bad"]) == {
+            "docs": {"bad": None},
+            "invalid": ["bad"],
+        }
+        assert solr.requests == []
+
+    def test_search_bibNos_timeout(self, stub_session, mock_timeout):
+        with pytest.raises(BookopsSolrError):
+            stub_session.search_bibNos(["b123456789"])
+
     def test_search_controlNo_success(
         self, mock_successful_session_get_response, stub_session
     ):
@@ -232,6 +1114,33 @@ class TestSolrSession:
         response = stub_session.search_isbns(["9781680502404"])
         assert response.status_code == 200
 
+    @pytest.mark.parametrize(
+        "method,field", [("search_isbns", "isbn"), ("search_upcs", "sm_marc_tag_024_a")]
+    )
+    def test_search_identifiers_terms_filter(
+        self, stub_session, mock_solr, method, field
+    ):
+        solr = mock_solr([])
+        getattr(stub_session, method)(["123", "456"], query_parser="terms")
+        getattr(stub_session, method)(["123", "456"], as_filter=True)
+        assert solr.requests[0]["q"] == f"{{!terms f={field}}}123,456"
+        assert solr.requests[0]["fq"] == "ss_type:catalog"
+        assert solr.requests[1]["q"] == "*:*"
+        assert solr.requests[1]["fq"] == ["ss_type:catalog", f"{field}:(123 OR 456)"]
+
+    def test_search_isbns_normalize(self, stub_session, mock_solr):
+        solr = mock_solr([])
+        stub_session.search_isbns(
+            ["978-1-68050-240-4", "1680502409", "foo"], normalize=True
+        )
+        assert solr.requests[0]["q"] == "isbn:9781680502404 OR 1680502409"
+
+    def test_search_isbns_normalize_no_valid_keywords(self, stub_session):
+        err_msg = "No valid ISBN keywords provided."
+        with pytest.raises(BookopsSolrError) as exc:
+            stub_session.search_isbns(["foo"], normalize=True)
+        assert err_msg in str(exc.value)
+
     @pytest.mark.parametrize("arg", [None, ""])
     def test_search_isbns_invalid_keywords_type(self, stub_session, arg):
         err_msg = "ISBN keywords argument must be a list."
@@ -298,6 +1207,13 @@ class TestSolrSession:
         response = stub_session.search_upcs(["9781680502404"])
         assert response.status_code == 200
 
+    def test_search_upcs_normalize(self, stub_session, mock_solr):
+        solr = mock_solr([])
+        stub_session.search_upcs(["0085391200390"], normalize=True)
+        assert (
+            solr.requests[0]["q"] == "sm_marc_tag_024_a:085391200390 OR 0085391200390"
+        )
+
     @pytest.mark.parametrize("arg", [None, ""])
     def test_search_upcs_invalid_keywords_type(self, stub_session, arg):
         err_msg = "UPC keywords argument must be a list."
@@ -368,6 +1284,372 @@ class TestSolrSession:
         with pytest.raises(BookopsSolrError):
             stub_session.find_expired_econtent()
 
+    def test_iter_expired_econtent_success(self, stub_session, mock_solr):
+        solr = mock_solr([{"id": str(n)} for n in range(12345670, 12345675)])
+        docs = list(stub_session.iter_expired_econtent(rows=2))
+        assert [d["id"] for d in docs] == [str(n) for n in range(12345670, 12345675)]
+        assert [r["cursorMark"] for r in solr.requests] == [
+            "*",
+            "12345671",
+            "12345673",
+            "12345674",
+        ]
+        assert solr.requests[0]["q"] == (
+            "digital_copies_owned:0 AND digital_avail_type:Normal"
+        )
+        assert solr.requests[0]["sort"] == "id asc"
+        assert "start" not in solr.requests[0]
+
+    @pytest.mark.parametrize("arg", [None, "foo"])
+    def test_iter_expired_econtent_invalid_args(self, stub_session, arg):
+        err_msg = "Invalid type of arguments passed."
+        with pytest.raises(BookopsSolrError) as exc:
+            next(stub_session.iter_expired_econtent(rows=arg))
+        assert err_msg in str(exc.value)
+
+    @pytest.mark.parametrize("arg", [0, 101])
+    def test_iter_expired_econtent_too_many_rows(self, stub_session, arg):
+        err_msg = "Rows argument must be bigger than 1 and no larger than 100."
+        with pytest.raises(BookopsSolrError) as exc:
+            next(stub_session.iter_expired_econtent(rows=arg))
+        assert err_msg in str(exc.value)
+
+    def test_iter_query_success(self, stub_session, mock_solr):
+        solr = mock_solr([{"id": "2"}, {"id": "1"}, {"id": "3"}])
+        docs = list(
+            stub_session.iter_query(
+                {"q": "material_type:eBook", "rows": 2, "start": 10}
+            )
+        )
+        assert [d["id"] for d in docs] == ["1", "2", "3"]
+        assert "start" not in solr.requests[0]
+
+    @pytest.mark.parametrize("arg", [{}, None, "some_str"])
+    def test_iter_query_payload_errors(self, stub_session, arg):
+        err_msg = "Missing or invalid payload argument."
+        with pytest.raises(BookopsSolrError) as exc:
+            next(stub_session.iter_query(arg))
+        assert err_msg in str(exc.value)
+
+    def test_iter_query_missing_cursor_mark(self, stub_session, monkeypatch):
+        monkeypatch.setattr(
+            requests.Session,
+            "get",
+            lambda *args, **kwargs: MockSolrHTTP200Response([], 0),
+        )
+        with pytest.raises(BookopsSolrError) as exc:
+            next(stub_session.iter_query({"q": "*:*"}))
+        assert "BPL Solr response is missing nextCursorMark." in str(exc.value)
+
+    def test_count_query(self, stub_session, mock_solr_json):
+        sent = mock_solr_json({"response": {"numFound": 1234, "docs": []}})
+        assert stub_session.count_query("material_type:eBook") == 1234
+        assert sent[0] == {
+            "q": "material_type:eBook",
+            "rows": 0,
+            "fq": "ss_type:catalog",
+        }
+
+    @pytest.mark.parametrize(
+        "arg,expectation",
+        [
+            ("eprovider:Overdrive", ["ss_type:catalog", "eprovider:Overdrive"]),
+            (["a:1", "b:2"], ["ss_type:catalog", "a:1", "b:2"]),
+        ],
+    )
+    def test_count_query_filters(self, stub_session, mock_solr_json, arg, expectation):
+        sent = mock_solr_json({"response": {"numFound": 0, "docs": []}})
+        stub_session.count_query(filters=arg)
+        assert sent[0]["q"] == "*:*"
+        assert sent[0]["fq"] == expectation
+
+    @pytest.mark.parametrize(
+        "kwargs,msg",
+        [
+            ({"query": ""}, "Invalid query argument."),
+            ({"query": None}, "Invalid query argument."),
+            ({"filters": [""]}, "Invalid filters argument."),
+            ({"filters": 1}, "Invalid filters argument."),
+        ],
+    )
+    def test_count_query_invalid_args(self, stub_session, kwargs, msg):
+        with pytest.raises(BookopsSolrError) as exc:
+            stub_session.count_query(**kwargs)
+        assert msg in str(exc.value)
+
+    def test_count_expired_econtent(self, stub_session, mock_solr_json):
+        sent = mock_solr_json({"response": {"numFound": 7, "docs": []}})
+        assert stub_session.count_expired_econtent() == 7
+        assert sent[0]["q"] == "digital_copies_owned:0 AND digital_avail_type:Normal"
+        assert sent[0]["rows"] == 0
+
+    def test_facet_query(self, stub_session, mock_solr_json):
+        sent = mock_solr_json(
+            {
+                "response": {"numFound": 30, "docs": []},
+                "facet_counts": {
+                    "facet_fields": {
+                        "material_type": ["Book", 20, "eBook", 10],
+                        "language": ["English", 30],
+                    }
+                },
+            }
+        )
+        facets = stub_session.facet_query(
+            ["material_type", "language"], "publishYear:2024", limit=5, mincount=2
+        )
+        assert facets == {
+            "material_type": {"Book": 20, "eBook": 10},
+            "language": {"English": 30},
+        }
+        assert list(facets["material_type"]) == ["Book", "eBook"]
+        assert sent[0] == {
+            "q": "publishYear:2024",
+            "rows": 0,
+            "fq": "ss_type:catalog",
+            "facet": "true",
+            "facet.field": ["material_type", "language"],
+            "facet.limit": 5,
+            "facet.mincount": 2,
+        }
+
+    @pytest.mark.parametrize(
+        "method,field",
+        [("facet_material_types", "material_type"), ("facet_eproviders", "eprovider")],
+    )
+    def test_facet_shortcuts(self, stub_session, mock_solr_json, method, field):
+        sent = mock_solr_json(
+            {"facet_counts": {"facet_fields": {field: ["foo", 2, "bar", 1]}}}
+        )
+        assert getattr(stub_session, method)(filters="publishYear:2024") == {
+            "foo": 2,
+            "bar": 1,
+        }
+        assert sent[0]["facet.field"] == [field]
+        assert sent[0]["facet.limit"] == -1
+        assert sent[0]["fq"] == ["ss_type:catalog", "publishYear:2024"]
+
+    @pytest.mark.parametrize(
+        "kwargs,msg",
+        [
+            ({"fields": []}, "Invalid fields argument."),
+            ({"fields": [None]}, "Invalid fields argument."),
+            ({"fields": "language", "limit": "10"}, "Invalid type of arguments"),
+        ],
+    )
+    def test_facet_query_invalid_args(self, stub_session, kwargs, msg):
+        with pytest.raises(BookopsSolrError) as exc:
+            stub_session.facet_query(**kwargs)
+        assert msg in str(exc.value)
+
+    def test_facet_query_missing_facets(self, stub_session, mock_solr_json):
+        mock_solr_json({"response": {"numFound": 0, "docs": []}})
+        with pytest.raises(BookopsSolrError) as exc:
+            stub_session.facet_query("language")
+        assert "BPL Solr response is missing facet counts." in str(exc.value)
+
+    def test_stats_query(self, stub_session, mock_solr_json):
+        stats = {"min": 1901.0, "max": 2024.0, "count": 10, "missing": 2}
+        sent = mock_solr_json(
+            {
+                "response": {"numFound": 12, "docs": []},
+                "stats": {"stats_fields": {"publishYear": stats, "foo": None}},
+            }
+        )
+        assert stub_session.stats_query(["publishYear", "foo"]) == {
+            "publishYear": stats,
+            "foo": None,
+        }
+        assert sent[0]["stats"] == "true"
+        assert sent[0]["stats.field"] == ["publishYear", "foo"]
+        assert sent[0]["rows"] == 0
+
+    def test_stats_query_missing_stats(self, stub_session, mock_solr_json):
+        mock_solr_json({"response": {"numFound": 0, "docs": []}})
+        with pytest.raises(BookopsSolrError) as exc:
+            stub_session.stats_query("publishYear")
+        assert "BPL Solr response is missing stats." in str(exc.value)
+
+    def test_map_count_queries(self, stub_session, mock_solr_json):
+        mock_solr_json({"response": {"numFound": 3, "docs": []}})
+        spec = [("count_query", "material_type:Book"), ("count_query", "foo:bar")]
+        assert [r.response for r in stub_session.map(spec)] == [3, 3]
+
+    def test_map_ordered(self, stub_session, mock_solr):
+        solr = mock_solr([{"id": "12345678"}])
+        spec = [
+            ("search_controlNo", "ocn123"),
+            ("search_bibNo", "b123456789"),
+            ("search_controlNo", 123),
+            ("not_a_method", "foo"),
+            "search_bibNo",
+            ("search_bibNos", ["b123456789"]),
+        ]
+        results = list(stub_session.map(spec, max_workers=3))
+        assert [r.position for r in results] == [0, 1, 2, 3, 4, 5]
+        assert [r.request for r in results] == spec
+        assert results[0].response.status_code == 200
+        assert results[0].error is None
+        assert str(results[2].error) == "Control number keyword must be a string."
+        assert results[2].response is None
+        assert str(results[3].error) == "Unsupported query method: not_a_method."
+        assert str(results[4].error) == "Invalid request specification passed."
+        assert results[5].response["docs"] == {"b123456789": {"id": "12345678"}}
+        assert len(solr.requests) == 3
+
+    def test_map_keyword_arguments(self, stub_session, mock_solr_json):
+        sent = mock_solr_json({"response": {"numFound": 0, "docs": []}})
+        spec = [
+            (
+                "search_bibNo",
+                ("b123456789",),
+                {"default_response_fields": False, "response_fields": "id"},
+            ),
+            ("search_controlNo", (), {"keyword": "ocn123"}),
+            ("search_bibNo", (), {"keyword": "b123456789", "foo": "bar"}),
+        ]
+        results = list(stub_session.map(spec))
+        assert [r.error for r in results[:2]] == [None, None]
+        assert sent[0]["fl"] == "id"
+        assert sent[1]["q"] == "ss_marc_tag_001:ocn123"
+        assert isinstance(results[2].error, TypeError)
+
+    def test_map_unordered(self, stub_session, mock_solr):
+        mock_solr([])
+        spec = [("search_controlNo", f"ocn{n}") for n in range(50)]
+        results = list(stub_session.map(spec, max_workers=2, ordered=False))
+        assert sorted(r.position for r in results) == list(range(50))
+        assert all(r.error is None for r in results)
+
+    def test_map_captures_connection_errors(self, stub_session, mock_timeout):
+        results = list(stub_session.map([("search_bibNo", "b123456789")]))
+        assert isinstance(results[0].error, BookopsSolrError)
+
+    def test_map_enlarges_connection_pool(self, stub_session, mock_solr):
+        mock_solr([])
+        list(stub_session.map([("search_controlNo", "ocn1")], max_workers=32))
+        assert stub_session.get_adapter("https://example.com")._pool_maxsize == 32
+
+    def test_map_enlarges_connection_pool_at_call_time(self, stub_session):
+        results = stub_session.map([], max_workers=32)
+        assert stub_session.get_adapter("https://example.com")._pool_maxsize == 32
+        assert list(results) == []
+
+    def test_map_keeps_larger_connection_pool(self, stub_session, mock_solr):
+        mock_solr([])
+        adapter = stub_session.get_adapter("https://example.com")
+        list(stub_session.map([("search_controlNo", "ocn1")], max_workers=2))
+        assert stub_session.get_adapter("https://example.com") is adapter
+
+    def test_map_keeps_replaced_pool_open(self, stub_session, mock_solr):
+        mock_solr([])
+        adapter = stub_session.get_adapter("https://example.com")
+        adapter.poolmanager.connection_from_url("https://example.com")
+        list(stub_session.map([("search_controlNo", "ocn1")], max_workers=32))
+        list(stub_session.map([("search_controlNo", "ocn1")], max_workers=16))
+        assert len(adapter.poolmanager.pools) == 1
+        assert stub_session.get_adapter("https://example.com")._pool_maxsize == 32
+        stub_session.close()
+        assert len(adapter.poolmanager.pools) == 0
+
+    @pytest.mark.parametrize("arg", [0, -1, None, "4"])
+    def test_map_invalid_max_workers(self, stub_session, arg):
+        err_msg = "Max workers argument must be a positive integer."
+        with pytest.raises(BookopsSolrError) as exc:
+            stub_session.map([], max_workers=arg)
+        assert err_msg in str(exc.value)
+
+
+class TestSolrQuery:
+    """Tests SolrQuery class"""
+
+    def test_defaults(self):
+        assert SolrQuery().to_payload() == {
+            "q": "*:*",
+            "rows": 10,
+            "fq": "ss_type:catalog",
+        }
+
+    def test_builder(self):
+        query = (
+            SolrQuery("title:civil AND war", rows=20, start=40)
+            .filter("material_type:Book", "language:English")
+            .filter("material_type:Book")
+            .filter("publishYear:2024", cache=False)
+            .fields("id", "title")
+            .sort("publishYear desc")
+            .param("defType", "edismax")
+        )
+        assert query.to_payload() == {
+            "q": "title:civil AND war",
+            "rows": 20,
+            "start": 40,
+            "fq": [
+                "ss_type:catalog",
+                "material_type:Book",
+                "language:English",
+                "{!cache=false}publishYear:2024",
+            ],
+            "fl": "id,title",
+            "sort": "publishYear desc",
+            "defType": "edismax",
+        }
+        assert query.param("defType", None).fields().to_payload().keys() == {
+            "q",
+            "rows",
+            "start",
+            "fq",
+            "sort",
+        }
+
+    def test_filter_terms(self):
+        query = SolrQuery(default_filter=False).filter_terms("isbn", ["978123", 978456])
+        query.filter_terms("id", ["1"], cache=True)
+        assert query.to_payload()["fq"] == [
+            "{!terms f=isbn cache=false}978123,978456",
+            "{!terms f=id}1",
+        ]
+
+    def test_no_filters(self):
+        assert SolrQuery(default_filter=False).to_payload()["fq"] == []
+
+    def test_repr(self):
+        assert repr(SolrQuery("foo")) == (
+            "SolrQuery({'q': 'foo', 'rows': 10, 'fq': 'ss_type:catalog'})"
+        )
+
+    @pytest.mark.parametrize(
+        "call,msg",
+        [
+            (lambda: SolrQuery(""), "Invalid query argument."),
+            (lambda: SolrQuery(rows="10"), "Invalid type of arguments passed."),
+            (lambda: SolrQuery().filter(""), "Invalid filter query."),
+            (lambda: SolrQuery().filter_terms("isbn", []), "Missing values"),
+        ],
+    )
+    def test_invalid_arguments(self, call, msg):
+        with pytest.raises(BookopsSolrError) as exc:
+            call()
+        assert msg in str(exc.value)
+
+    def test_send_request(self, stub_session, mock_solr):
+        solr = mock_solr([{"id": "12345678", "isbn": "9780810984912"}])
+        query = SolrQuery().filter_terms("isbn", ["9780810984912"]).fields("id")
+        response = stub_session._send_request(query)
+        assert response.json()["response"]["numFound"] == 1
+        assert solr.requests[0]["fq"] == [
+            "ss_type:catalog",
+            "{!terms f=isbn cache=false}9780810984912",
+        ]
+        assert solr.requests[0]["fl"] == "id"
+
+    def test_iter_query(self, stub_session, mock_solr):
+        solr = mock_solr([{"id": str(n)} for n in range(12345670, 12345675)])
+        query = SolrQuery(rows=2).filter("material_type:Book")
+        assert len(list(stub_session.iter_query(query))) == 5
+        assert solr.requests[0]["fq"] == ["ss_type:catalog", "material_type:Book"]
+        assert solr.requests[0]["cursorMark"] == "*"
+
 
 @pytest.mark.webtest
 class TestSolrSessionLiveService:
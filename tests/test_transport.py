@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tests transport.py module
+"""
+import gzip
+import json
+
+import pytest
+import requests
+
+from bookops_bpl_solr.session import BookopsSolrError, SolrSession
+from bookops_bpl_solr.transport import (
+    RecordingAdapter,
+    ReplayAdapter,
+    request_key,
+    request_params,
+)
+
+
+def prepare(method, url, params=None, data=None):
+    return requests.Request(method, url, params=params, data=data).prepare()
+
+
+def write_archive(path, records):
+    with gzip.open(path, "wt", encoding="utf-8") as file:
+        for record in records:
+            file.write(json.dumps(record) + "\n")
+
+
+def make_record(params, body='{"response":{"numFound":0,"docs":[]}}', **kwargs):
+    record = {
+        "method": "GET",
+        "url": "https://example.com/select",
+        "params": params,
+        "status": 200,
+        "reason": "OK",
+        "content_type": "application/json",
+        "elapsed": 0.25,
+        "body": body,
+    }
+    record.update(kwargs)
+    return record
+
+
+def test_request_params_get_and_post_equal():
+    params = {"q": "id:1", "fq": ["b", "a"], "rows": 10}
+    get = prepare("GET", "https://example.com/select", params=params)
+    post = prepare("POST", "https://example.com/select", data=params)
+    assert request_params(get) == [
+        ("fq", "a"),
+        ("fq", "b"),
+        ("q", "id:1"),
+        ("rows", "10"),
+    ]
+    assert request_key(get) == request_key(post)
+
+
+def test_record_and_replay(local_solr, tmp_path):
+    path = str(tmp_path / "archive.jsonl.gz")
+    adapter = RecordingAdapter(path)
+    with SolrSession("my_client_key", local_solr, transport=adapter) as session:
+        recorded = session.search_bibNo("b123456789")
+        session.search_isbns(["9781680502404"])
+    assert adapter.recorded == 2
+
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        records = [json.loads(line) for line in file]
+    assert records[0]["url"] == local_solr
+    assert ["q", "id:12345678"] in records[0]["params"]
+    assert "my_client_key" not in json.dumps(records)
+
+    replay = ReplayAdapter(path)
+    with SolrSession("other_key", "https://example.com", transport=replay) as session:
+        replayed = session.search_bibNo("b123456789")
+        missing = session.search_bibNo("b234567890")
+    assert len(replay) == 2
+    assert replayed.status_code == 200
+    assert replayed.json() == recorded.json()
+    assert replayed.headers["Content-Type"] == "application/json"
+    assert missing.status_code == 404
+    assert missing.reason == "Not Recorded"
+    assert (replay.replayed, replay.missed) == (1, 1)
+
+
+def test_replay_cycles_responses(tmp_path):
+    path = str(tmp_path / "archive.jsonl.gz")
+    params = [["fq", "ss_type:catalog"], ["q", "id:1"], ["rows", "10"]]
+    write_archive(path, [make_record(params, "1"), make_record(params, "2")])
+    session = SolrSession("key", "https://example.com", transport=ReplayAdapter(path))
+    bodies = [session._send_request({"q": "id:1"}).text for _ in range(3)]
+    assert bodies == ["1", "2", "1"]
+
+
+@pytest.mark.parametrize(
+    "timing,expectation", [(None, []), (1.0, [0.25]), (0.5, [0.125])]
+)
+def test_replay_timing(tmp_path, mock_sleep, timing, expectation):
+    path = str(tmp_path / "archive.jsonl.gz")
+    params = [["fq", "ss_type:catalog"], ["q", "id:1"], ["rows", "10"]]
+    write_archive(path, [make_record(params)])
+    adapter = ReplayAdapter(path, timing=timing)
+    response = SolrSession(
+        "key", "https://example.com", transport=adapter
+    )._send_request({"q": "id:1"})
+    assert mock_sleep == expectation
+    assert response.status_code == 200
+
+
+def test_replay_binary_body(tmp_path):
+    path = str(tmp_path / "archive.jsonl.gz")
+    params = [["fq", "ss_type:catalog"], ["q", "id:1"], ["rows", "10"]]
+    record = make_record(params, content_type=None, body_b64="/wA=")
+    del record["body"]
+    write_archive(path, [record])
+    session = SolrSession("key", "https://example.com", transport=ReplayAdapter(path))
+    response = session._send_request({"q": "id:1"})
+    assert response.content == b"\xff\x00"
+    assert "Content-Type" not in response.headers
+
+
+def test_replay_long_payload_sent_as_post(tmp_path):
+    path = str(tmp_path / "archive.jsonl.gz")
+    query = "id:(" + " OR ".join(str(n) for n in range(10000000, 10001000)) + ")"
+    params = [["fq", "ss_type:catalog"], ["q", query], ["rows", "10"]]
+    write_archive(path, [make_record(params)])
+    session = SolrSession("key", "https://example.com", transport=ReplayAdapter(path))
+    response = session._send_request({"q": query})
+    assert response.request.method == "POST"
+    assert response.status_code == 200
+
+
+def test_session_transport_mounted(tmp_path):
+    path = str(tmp_path / "archive.jsonl.gz")
+    write_archive(path, [])
+    adapter = ReplayAdapter(path)
+    session = SolrSession("key", "https://example.com", transport=adapter)
+    session._ensure_pool_size(50)
+    assert session.get_adapter("https://example.com") is adapter
+    assert session.get_adapter("http://example.com") is adapter
+    assert session.pool_stats() == {}
+
+
+def test_session_transport_argument_exception():
+    err_msg = "Invalid type of a transport argument."
+    with pytest.raises(BookopsSolrError) as exc:
+        SolrSession("key", "https://example.com", transport="archive.jsonl.gz")
+    assert err_msg in str(exc.value)